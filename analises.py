@@ -0,0 +1,59 @@
+import threading
+
+from historico import obter_backend, periodo_mes_ref
+
+# ============================================================
+# ANÁLISES DO HISTÓRICO (COM CACHE)
+# ============================================================
+# As agregações da página de Relatórios são calculadas uma vez por versão
+# do histórico (ver HistoricoBackend.versao) e compartilhadas por todas
+# as sessões do processo. Enquanto ninguém grava, abrir a página não lê
+# nem agrega o histórico de novo. Os objetos devolvidos são compartilhados:
+# quem os usa não deve alterá-los.
+COLUNAS_MENSAL = ["mes_ref", "rota", "mensalidade_media"]
+
+_lock = threading.Lock()
+_cache = {}
+
+
+def resumo_mensal(historico):
+    """Mensalidade média por (mes_ref, rota), em ordem cronológica."""
+    if historico.empty:
+        return historico
+    mensal = historico.groupby(["mes_ref", "rota"])["mensalidade_media"].mean().reset_index()
+    mensal["periodo"] = mensal["mes_ref"].map(periodo_mes_ref)
+    # Meses em formato não reconhecido vão para o fim, em ordem alfabética.
+    return mensal.sort_values(["periodo", "mes_ref", "rota"], na_position="last", kind="stable").reset_index(drop=True)
+
+
+def obter_analises(backend=None) -> dict:
+    backend = backend or obter_backend()
+    versao = backend.versao()
+    with _lock:
+        dados = _cache.get("dados")
+        if dados is not None and dados["versao"] == versao:
+            return dados
+
+    # Só as colunas do gráfico; o histórico completo é lido sob demanda.
+    dados = {
+        "versao": versao,
+        "backend": backend,
+        "mensal": resumo_mensal(backend.carregar(COLUNAS_MENSAL)),
+        "opcoes_filtro": backend.opcoes_filtro(),
+        "csv": None,
+        "lock_csv": threading.Lock(),
+    }
+    with _lock:
+        _cache["dados"] = dados
+    return dados
+
+
+def csv_historico(dados: dict) -> bytes:
+    """CSV completo do histórico, gerado só no primeiro pedido de cada versão."""
+    # A trava é só desta versão: uma exportação grande não segura _lock,
+    # então obter_analises segue atendendo as outras sessões; pedidos
+    # simultâneos do mesmo CSV esperam a mesma geração.
+    with dados["lock_csv"]:
+        if dados["csv"] is None:
+            dados["csv"] = dados["backend"].carregar().to_csv(index=False).encode("utf-8")
+        return dados["csv"]
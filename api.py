@@ -0,0 +1,364 @@
+"""
+API HTTP local (JSON) com o mesmo cálculo do app.
+
+    python api.py                      # http://127.0.0.1:8600
+    python api.py --host 0.0.0.0 --porta 8600
+
+Endpoints:
+    GET  /saude
+    POST /calcular          lote de rotas-mês (ver _tabelas_do_corpo)
+    POST /distribuir        {"aux_total": 10000 | [...], "diarias": [...] | [[...]], "centavos": true}
+    GET  /historico         ?rota=...&de=AAAA-MM&ate=AAAA-MM&faixa=coluna:min:max
+                            &ordenar_por=...&decrescente=1&limite=50&deslocamento=0
+    POST /pdf               mesmo corpo de /calcular, um único mês -> 202 {"chave", "status"}
+    GET  /pdf/{chave}       o PDF quando pronto; senão {"status"} (202), 410 se já
+                            saiu do cache, ou erro
+
+Corpo de /calcular:
+    {
+      "entradas": [
+        {"mes_ref": "Janeiro/2026", "rota": "Sete Lagoas",
+         "veiculos": [{"valor": 800, "dias": 22}], "passagens": 3000,
+         "alunos_integrais": 30, "descontos": {"50": 6}, "diarias": 22,
+         "aux_recebido": 5000},
+        ...
+      ],
+      "aux_total": {"Janeiro/2026": 9000},   (opcional; ou um número para todos os meses)
+      "centavos": false                      (opcional, padrão false, como no app)
+    }
+Com "aux_total", o auxílio de cada mês é dividido entre as suas rotas
+pelas diárias (na ordem das entradas), como no app, e aux_recebido das
+entradas é ignorado. Faixas de desconto sem percentual ou sem alunos são
+ignoradas, como no formulário. Valores, dias, diárias e quantidades
+negativos, NaN ou infinitos são recusados com 400.
+
+O servidor é assíncrono (Starlette + Uvicorn, os mesmos do Streamlit).
+Os cálculos rodam num pool de threads, fora do laço de eventos; os PDFs
+vão para a fila de processos de fila_pdf, compartilhada com o cache de
+PDFs do app.
+"""
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from calculo import (
+    CENTAVOS_PADRAO,
+    CHAVE,
+    CAMPOS_RESULTADO,
+    calcular_rotas_centavos,
+    calcular_rotas_lote,
+    centavos_para_reais,
+    consolidar_descontos,
+    distribuir_auxilio_centavos,
+    distribuir_auxilio_rotas,
+    montar_resultado,
+    montar_tabelas_lote,
+    para_centavos,
+    para_reais,
+    resultados_lote_como_dicts,
+)
+from metricas import medir
+
+API_HOST = os.environ.get("ASSEUF_API_HOST", "127.0.0.1")
+API_PORTA = int(os.environ.get("ASSEUF_API_PORTA", 8600))
+MAX_ENTRADAS = int(os.environ.get("ASSEUF_API_MAX_ENTRADAS", 100_000))
+MAX_LIMITE_HISTORICO = 1000
+
+
+class ErroRequisicao(Exception):
+    def __init__(self, mensagem, status=400):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def _json_padrao(valor):
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    raise TypeError(f"{type(valor).__name__} não é serializável")
+
+
+class RespostaJSON(JSONResponse):
+    """JSONResponse que aceita escalares e arrays NumPy."""
+
+    def render(self, conteudo) -> bytes:
+        return json.dumps(conteudo, ensure_ascii=False, separators=(",", ":"), default=_json_padrao).encode("utf-8")
+
+
+def _numero(valor) -> bool:
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+
+def _erro(mensagem, status=400):
+    return RespostaJSON({"erro": mensagem}, status_code=status)
+
+
+async def _corpo(request) -> dict:
+    try:
+        corpo = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise ErroRequisicao("Corpo não é um JSON válido.")
+    if not isinstance(corpo, dict):
+        raise ErroRequisicao("O corpo deve ser um objeto JSON.")
+    return corpo
+
+# ============================================================
+# CÁLCULO EM LOTE
+# ============================================================
+def _nao_negativo(valor, campo, tipo=float, maximo=math.inf):
+    """valor convertido para tipo; ValueError se não for finito e entre 0 e maximo."""
+    numero = float(valor)
+    if not (math.isfinite(numero) and 0 <= numero <= maximo):
+        faixa = ">= 0" if math.isinf(maximo) else f"entre 0 e {maximo}"
+        raise ValueError(f"{campo} deve ser um número finito {faixa}, não {valor!r}")
+    return tipo(numero)
+
+
+def _normalizar_entrada(e: dict) -> dict:
+    veiculos = e.get("veiculos") or []
+    if isinstance(veiculos, list):
+        veiculos = {str(i): v for i, v in enumerate(veiculos)}
+    if not isinstance(e["mes_ref"], str) or not isinstance(e["rota"], str):
+        raise TypeError("mes_ref e rota devem ser textos")
+    return {
+        "mes_ref": e["mes_ref"],
+        "rota": e["rota"],
+        "veiculos": {
+            k: {"valor": _nao_negativo(v["valor"], "valor"), "dias": _nao_negativo(v["dias"], "dias", int)}
+            for k, v in veiculos.items()
+        },
+        "passagens": _nao_negativo(e.get("passagens", 0), "passagens"),
+        "alunos_integrais": _nao_negativo(e.get("alunos_integrais", 0), "alunos_integrais", int),
+        "descontos": {
+            _nao_negativo(pct, "pct", int, 100): _nao_negativo(qtd, "qtd", int)
+            for pct, qtd in (e.get("descontos") or {}).items()
+        },
+        "aux_recebido": _nao_negativo(e.get("aux_recebido", 0), "aux_recebido"),
+        "diarias": _nao_negativo(e.get("diarias", 0), "diarias", int),
+    }
+
+
+def _auxilio_total(aux_total, meses) -> np.ndarray:
+    """aux_total de cada mês: {mes_ref: número} ou um número para todos."""
+    if _numero(aux_total):
+        total = np.full(len(meses), float(aux_total))
+    elif isinstance(aux_total, dict):
+        faltando = set(meses) - set(aux_total)
+        if faltando:
+            raise ErroRequisicao(f"aux_total sem valor para: {sorted(faltando)}")
+        invalidos = [m for m in meses if not _numero(aux_total[m])]
+        if invalidos:
+            raise ErroRequisicao(f"aux_total deve ser numérico; inválido para: {sorted(invalidos)}")
+        total = np.array([float(aux_total[m]) for m in meses])
+    else:
+        raise ErroRequisicao('"aux_total" deve ser um número ou um objeto {mes_ref: número}.')
+    if not (np.isfinite(total) & (total >= 0)).all():
+        raise ErroRequisicao('"aux_total" deve ser finito e >= 0.')
+    return total
+
+
+def _auxilio_por_mes(rotas: pd.DataFrame, aux_total, centavos: bool) -> np.ndarray:
+    """Divide o auxílio de cada mês entre as rotas do mês, na ordem das linhas."""
+    i, meses = pd.factorize(rotas["mes_ref"])
+    total = _auxilio_total(aux_total, meses)
+    j = rotas.groupby(i).cumcount().to_numpy()
+    # Matriz (meses, rotas); posições vazias têm zero diárias e não recebem.
+    diarias = np.zeros((len(meses), j.max() + 1), dtype=np.int64)
+    diarias[i, j] = rotas["diarias"].to_numpy(dtype=np.int64)
+    if centavos:
+        return para_reais(distribuir_auxilio_centavos(para_centavos(total), diarias))[i, j]
+    return distribuir_auxilio_rotas(total, diarias)[i, j]
+
+
+def _tabelas_do_corpo(corpo: dict):
+    entradas = corpo.get("entradas")
+    if not isinstance(entradas, list) or not entradas:
+        raise ErroRequisicao('Informe "entradas": uma lista de rotas-mês.')
+    if len(entradas) > MAX_ENTRADAS:
+        raise ErroRequisicao(f"No máximo {MAX_ENTRADAS} entradas por requisição.", status=413)
+    try:
+        normalizadas = [_normalizar_entrada(e) for e in entradas]
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        raise ErroRequisicao(f"Entrada inválida: {e!r}")
+    centavos = bool(corpo.get("centavos", CENTAVOS_PADRAO))
+    rotas, veiculos, descontos = montar_tabelas_lote(normalizadas)
+    descontos = consolidar_descontos(descontos)
+    if corpo.get("aux_total") is not None:
+        rotas["aux_recebido"] = _auxilio_por_mes(rotas, corpo["aux_total"], centavos)
+    return rotas, veiculos, descontos, centavos
+
+
+def _calcular(rotas, veiculos, descontos, centavos) -> pd.DataFrame:
+    try:
+        if centavos:
+            return centavos_para_reais(calcular_rotas_centavos(rotas, veiculos, descontos))
+        return calcular_rotas_lote(rotas, veiculos, descontos)
+    except ValueError as e:  # chaves repetidas
+        raise ErroRequisicao(str(e))
+
+
+@medir("api_calcular")
+def _processar_calculo(corpo: dict) -> dict:
+    resultado = _calcular(*_tabelas_do_corpo(corpo))
+    return {
+        "colunas": [*CHAVE, *CAMPOS_RESULTADO],
+        "resultados": resultado.to_dict("records"),
+    }
+
+
+@medir("api_distribuir")
+def _processar_distribuicao(corpo: dict) -> dict:
+    try:
+        diarias = np.asarray(corpo["diarias"], dtype=np.int64)
+        aux_total = np.asarray(corpo["aux_total"], dtype=float)
+    except (KeyError, TypeError, ValueError):
+        raise ErroRequisicao('Informe "aux_total" (número ou lista) e "diarias" (lista ou lista de listas).')
+    if diarias.ndim not in (1, 2) or (diarias < 0).any():
+        raise ErroRequisicao('"diarias" deve ser uma lista (ou lista de listas) de inteiros >= 0.')
+    # Um mês (diárias 1-D): um número. Vários meses: um número ou um por linha.
+    if aux_total.ndim > diarias.ndim - 1 or (aux_total.ndim == 1 and len(aux_total) != len(diarias)):
+        raise ErroRequisicao('"aux_total" deve ser um número ou, com vários meses, um valor por linha de "diarias".')
+    if not (np.isfinite(aux_total) & (aux_total >= 0)).all():
+        raise ErroRequisicao('"aux_total" deve ser finito e >= 0.')
+    if corpo.get("centavos", CENTAVOS_PADRAO):
+        aux = para_reais(distribuir_auxilio_centavos(para_centavos(aux_total), diarias))
+    else:
+        aux = distribuir_auxilio_rotas(aux_total, diarias)
+    return {"aux_recebido": aux}
+
+
+async def calcular(request):
+    return RespostaJSON(await run_in_threadpool(_processar_calculo, await _corpo(request)))
+
+
+async def distribuir(request):
+    return RespostaJSON(await run_in_threadpool(_processar_distribuicao, await _corpo(request)))
+
+# ============================================================
+# HISTÓRICO
+# ============================================================
+def _faixas_da_consulta(valores: list) -> dict:
+    faixas = {}
+    for valor in valores:
+        try:
+            coluna, minimo, maximo = valor.split(":")
+            faixas[coluna] = (float(minimo) if minimo else None, float(maximo) if maximo else None)
+        except ValueError:
+            raise ErroRequisicao(f'faixa inválida: "{valor}" (use coluna:min:max).')
+    return faixas
+
+
+@medir("api_historico")
+def _consultar_historico(params) -> dict:
+    from historico import obter_backend
+
+    try:
+        limite = max(1, min(int(params.get("limite", 50)), MAX_LIMITE_HISTORICO))
+        deslocamento = int(params.get("deslocamento", 0))
+    except ValueError:
+        raise ErroRequisicao("limite e deslocamento devem ser inteiros.")
+    if deslocamento < 0:
+        raise ErroRequisicao("deslocamento deve ser >= 0.")
+    try:
+        pagina, total = obter_backend().consultar(
+            rotas=params.getlist("rota") or None,
+            periodo_de=params.get("de"),
+            periodo_ate=params.get("ate"),
+            faixas=_faixas_da_consulta(params.getlist("faixa")),
+            ordenar_por=params.get("ordenar_por"),
+            decrescente=params.get("decrescente", "0") in ("1", "true"),
+            limite=limite,
+            deslocamento=deslocamento,
+        )
+    except ValueError as e:  # coluna desconhecida
+        raise ErroRequisicao(str(e))
+    # NaN não é JSON válido: vira null.
+    registros = pagina.astype(object).where(pagina.notna(), None).to_dict("records")
+    return {"total": total, "limite": limite, "deslocamento": deslocamento, "registros": registros}
+
+
+async def historico(request):
+    return RespostaJSON(await run_in_threadpool(_consultar_historico, request.query_params))
+
+# ============================================================
+# PDF
+# ============================================================
+def _enviar_pdf(corpo: dict) -> str:
+    from fila_pdf import enviar_pdf
+
+    rotas, veiculos, descontos, centavos = _tabelas_do_corpo(corpo)
+    meses = rotas["mes_ref"].unique()
+    if len(meses) != 1:
+        raise ErroRequisicao("O relatório PDF é de um único mês.")
+    resultado = _calcular(rotas, veiculos, descontos, centavos)
+    dicts = resultados_lote_como_dicts(resultado, descontos)
+    return enviar_pdf(montar_resultado(meses[0], dict(zip(resultado["rota"], dicts))))
+
+
+async def pdf(request):
+    from fila_pdf import status_pdf
+
+    chave = await run_in_threadpool(_enviar_pdf, await _corpo(request))
+    return RespostaJSON(
+        {"chave": chave, "status": status_pdf(chave), "url": f"/pdf/{chave}"}, status_code=202
+    )
+
+
+async def pdf_pronto(request):
+    from fila_pdf import STATUS_ERRO, STATUS_PRONTO, erro_pdf, obter_pdf, status_pdf
+
+    chave = request.path_params["chave"]
+    status = status_pdf(chave)
+    if status is None:
+        return _erro("Relatório desconhecido.", 404)
+    if status == STATUS_ERRO:
+        return _erro(f"Falha ao gerar o PDF: {erro_pdf(chave)}", 500)
+    if status != STATUS_PRONTO:
+        return RespostaJSON({"chave": chave, "status": status}, status_code=202)
+    conteudo = await run_in_threadpool(obter_pdf, chave)
+    if conteudo is None:  # pronto, mas já saiu do cache
+        return _erro("O PDF expirou; gere-o de novo com POST /pdf.", 410)
+    return Response(conteudo, media_type="application/pdf")
+
+# ============================================================
+# APLICAÇÃO
+# ============================================================
+async def saude(request):
+    return RespostaJSON({"status": "ok"})
+
+
+async def _tratar_erro(request, exc):
+    return _erro(str(exc), exc.status)
+
+
+app = Starlette(
+    routes=[
+        Route("/saude", saude),
+        Route("/calcular", calcular, methods=["POST"]),
+        Route("/distribuir", distribuir, methods=["POST"]),
+        Route("/historico", historico),
+        Route("/pdf", pdf, methods=["POST"]),
+        Route("/pdf/{chave}", pdf_pronto),
+    ],
+    exception_handlers={ErroRequisicao: _tratar_erro},
+)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="API JSON local do sistema de rotas.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--porta", type=int, default=API_PORTA)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.porta, log_level="warning")
@@ -1,13 +1,13 @@
-from pathlib import Path
-import streamlit as st
-import base64
-import qrcode
-from io import BytesIO
-from datetime import datetime
-from weasyprint import HTML
-import pandas as pd
 import os
-import altair as alt
+import streamlit as st
+
+from recursos import LARGURA_LOGO, css_app, links_css, logo_bytes
+
+# Este arquivo é só a interface. O cálculo (calculo.py), o histórico
+# (historico.py) e o PDF (relatorio.py, fila_pdf.py) são módulos
+# importáveis sem Streamlit. Bibliotecas pesadas (pandas, Altair,
+# WeasyPrint, qrcode) são importadas apenas dentro da página que as usa,
+# para que a primeira carga do app não pague por elas.
 
 # ============================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -22,9 +22,9 @@ st.set_page_config(
 # LOGO
 # ============================================================
 def carregar_logo():
-    logo_path = Path(__file__).parent / "logo.png"
-    if logo_path.exists():
-        st.image(str(logo_path), width=220)
+    logo = logo_bytes()
+    if logo is not None:
+        st.image(logo, width=LARGURA_LOGO)
     else:
         st.warning("Logo não encontrada (logo.png)")
 
@@ -33,220 +33,26 @@ carregar_logo()
 # ============================================================
 # CSS GLOBAL
 # ============================================================
-st.markdown("""
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;600;700&family=Space+Grotesk:wght@400;600&display=swap');
-
-        html, body, [class*="css"]  {
-            font-family: 'Poppins', sans-serif;
-        }
-
-        body {
-            background-color: #02040A;
-        }
-        .main {
-            background: radial-gradient(circle at top, #10152A 0, #02040A 55%);
-            color: #f5f5f5;
-        }
-        h1, h2, h3, h4, h5 {
-            font-family: 'Space Grotesk', sans-serif;
-            letter-spacing: 0.03em;
-            color: #00e676 !important;
-        }
-        .elevated-card {
-            background: linear-gradient(145deg, #0b0f1c, #050814);
-            padding: 20px;
-            border-radius: 16px;
-            box-shadow: 0px 0px 18px rgba(0,0,0,0.6);
-            margin-bottom: 20px;
-            border: 1px solid rgba(0,230,118,0.15);
-        }
-        .calc-card {
-            background: radial-gradient(circle at top left, #10152A, #050814);
-            padding: 25px;
-            border-radius: 18px;
-            box-shadow: 0px 0px 22px rgba(0,0,0,0.7);
-            margin-top: 30px;
-            border: 1px solid rgba(0,230,118,0.25);
-        }
-        .divider {
-            height: 1px;
-            background: linear-gradient(90deg, transparent, #00e676, transparent);
-            margin: 18px 0;
-        }
-        .top-menu button {
-            width: 100%;
-        }
-        .stButton>button {
-            background: linear-gradient(135deg, #00e676, #00b248);
-            color: #02040A;
-            border-radius: 999px;
-            font-weight: 700;
-            padding: 8px 18px;
-            border: none;
-            box-shadow: 0px 0px 12px rgba(0,230,118,0.5);
-            transition: all 0.3s ease;
-        }
-        .stButton>button:hover {
-            background: linear-gradient(135deg, #00b248, #00e676);
-            color: white;
-            box-shadow: 0px 0px 18px rgba(0,230,118,0.8);
-            transform: scale(1.02);
-        }
-        .stDownloadButton>button {
-            background: linear-gradient(135deg, #2979ff, #1565c0) !important;
-            color: white !important;
-            box-shadow: 0px 0px 12px rgba(41,121,255,0.5);
-        }
-        .stDownloadButton>button:hover {
-            background: linear-gradient(135deg, #1565c0, #0d47a1) !important;
-        }
-    </style>
-""", unsafe_allow_html=True)
-
-# ============================================================
-# CONSTANTES E HISTÓRICO
-# ============================================================
-HIST_PATH = "historico_rotas.csv"
-
-def carregar_historico():
-    if os.path.exists(HIST_PATH):
-        try:
-            return pd.read_csv(HIST_PATH)
-        except Exception:
-            return pd.DataFrame()
-    return pd.DataFrame()
-
-def salvar_historico(mes_ref, rota_nome, dados):
-    df = carregar_historico()
-    base = {
-        "mes_ref": mes_ref,
-        "rota": rota_nome,
-        "bruto": dados["bruto"],
-        "passagens": dados["passagens"],
-        "dez_porcento": dados["dez_porcento"],
-        "bruto_aj_10": dados["bruto_aj_10"],
-        "aux_recebido": dados["aux_recebido"],
-        "pos_aux": dados["pos_aux"],
-        "noventa_porcento": dados["noventa_porcento"],
-        "valor_final": dados["valor_final"],
-        "alunos_integrais": dados["alunos_integrais"],
-        "alunos_desconto_total": dados["alunos_desconto_total"],
-        "mensalidade_media": dados["mensalidade_media"],
-        "veiculos": dados["veiculos_qtd"],
-        "diarias": dados["diarias"],
-        "data_registro": datetime.now().strftime("%d/%m/%Y %H:%M")
-    }
-    df = pd.concat([df, pd.DataFrame([base])], ignore_index=True)
-    df.to_csv(HIST_PATH, index=False)
-# ============================================================
-# FUNÇÕES DE CÁLCULO
-# ============================================================
-def calcular_bruto(veiculos: dict) -> float:
-    return sum(v["valor"] * v["dias"] for v in veiculos.values())
-
-def calcular_peso_alunos(alunos_integrais: int, descontos: dict) -> float:
-    """
-    descontos: {percentual_desconto: quantidade}
-    Ex: {50: 3, 30: 2}
-    Internamente usamos peso, mas na interface só falamos
-    em 'alunos integrais' e 'alunos com desconto'.
-    """
-    peso = float(alunos_integrais)
-    for pct, qtd in descontos.items():
-        fator = (100 - pct) / 100.0
-        peso += qtd * fator
-    return peso
-
-def distribuir_auxilio_por_diarias(aux_total: float, d_sete: int, d_cur: int):
-    if aux_total <= 0:
-        return 0.0, 0.0
-    if d_sete == 0 and d_cur == 0:
-        return 0.0, 0.0
-    if d_sete == 0:
-        return 0.0, aux_total
-    if d_cur == 0:
-        return aux_total, 0.0
-
-    if d_sete == d_cur:
-        total = d_sete + d_cur
-        return aux_total * d_sete / total, aux_total * d_cur / total
-
-    if d_sete > d_cur:
-        excedente = d_sete - d_cur
-        base = d_cur
-        total_base = base * 2 + excedente
-        valor_diaria = aux_total / total_base
-        aux_sete = base * valor_diaria + excedente * (valor_diaria * 0.70)
-        aux_cur = base * valor_diaria + excedente * (valor_diaria * 0.30)
-        return aux_sete, aux_cur
-
-    excedente = d_cur - d_sete
-    base = d_sete
-    total_base = base * 2 + excedente
-    valor_diaria = aux_total / total_base
-    aux_sete = base * valor_diaria + excedente * (valor_diaria * 0.30)
-    aux_cur = base * valor_diaria + excedente * (valor_diaria * 0.70)
-    return aux_sete, aux_cur
-
-def calcular_rota(
-    veiculos: dict,
-    passagens: float,
-    alunos_integrais: int,
-    descontos: dict,
-    aux_recebido: float,
-    diarias_rota: int,
-):
-    bruto = calcular_bruto(veiculos)
-    dez_porcento = passagens * 0.10
-    bruto_aj_10 = bruto - dez_porcento
-    pos_aux = bruto_aj_10 - aux_recebido
-    noventa_porcento = passagens * 0.90
-    valor_final = pos_aux - noventa_porcento
-
-    peso_alunos = calcular_peso_alunos(alunos_integrais, descontos)
-    alunos_desconto_total = sum(descontos.values())
-    mensalidade_media = valor_final / peso_alunos if peso_alunos > 0 else 0.0
-
-    return {
-        "bruto": bruto,
-        "passagens": passagens,
-        "dez_porcento": dez_porcento,
-        "bruto_aj_10": bruto_aj_10,
-        "aux_recebido": aux_recebido,
-        "pos_aux": pos_aux,
-        "noventa_porcento": noventa_porcento,
-        "valor_final": valor_final,
-        "alunos_integrais": alunos_integrais,
-        "alunos_desconto_total": alunos_desconto_total,
-        "mensalidade_media": mensalidade_media,
-        "descontos": descontos,
-        "diarias": diarias_rota,
-        "veiculos_qtd": len(veiculos),
-    }
+# static/app.css é servido pelo Streamlit e fica no cache do navegador;
+# a cada rerun só a tag <link> é enviada (ver recursos.py).
+if st.get_option("server.enableStaticServing"):
+    st.markdown(links_css(), unsafe_allow_html=True)
+else:
+    st.markdown(f"<style>{css_app()}</style>", unsafe_allow_html=True)
 
 # ============================================================
-# QR CODE
-# ============================================================
-def gerar_qr_base64(texto: str) -> str:
-    qr = qrcode.QRCode(box_size=4, border=1)
-    qr.add_data(texto)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    buf = BytesIO()
-    img.save(buf, format="PNG")
-    return base64.b64encode(buf.getvalue()).decode("utf-8")
-# ============================================================
 # MENU SUPERIOR (OPÇÃO A)
 # ============================================================
-col1, col2, col3, col4 = st.columns(4)
+col1, col2, col3, col4, col5 = st.columns(5)
 with col1:
     btn_inicio = st.button("🏠 Início")
 with col2:
     btn_calc = st.button("🧮 Cadastro e Cálculo")
 with col3:
-    btn_rel = st.button("📊 Relatórios")
+    btn_cen = st.button("🔮 Cenários")
 with col4:
+    btn_rel = st.button("📊 Relatórios")
+with col5:
     btn_pdf = st.button("📄 PDF")
 
 if "pagina" not in st.session_state:
@@ -256,11 +62,25 @@ if btn_inicio:
     st.session_state["pagina"] = "inicio"
 elif btn_calc:
     st.session_state["pagina"] = "calculo"
+elif btn_cen:
+    st.session_state["pagina"] = "cenarios"
 elif btn_rel:
     st.session_state["pagina"] = "relatorios"
 elif btn_pdf:
     st.session_state["pagina"] = "pdf"
 
+# Página de métricas (fora do menu): abra o app com ?admin=<chave>, onde a
+# chave é ASSEUF_ADMIN_CHAVE. Sem a variável definida a página fica
+# desativada. Depois disso o menu volta a funcionar normalmente.
+chave_admin = os.environ.get("ASSEUF_ADMIN_CHAVE")
+if (
+    chave_admin
+    and st.query_params.get("admin") == chave_admin
+    and not st.session_state.get("admin_aberto")
+):
+    st.session_state["admin_aberto"] = True
+    st.session_state["pagina"] = "metricas"
+
 pagina = st.session_state["pagina"]
 
 # ============================================================
@@ -306,410 +126,549 @@ if pagina == "inicio":
 # PÁGINA CADASTRO E CÁLCULO
 # ============================================================
 if pagina == "calculo":
-    st.markdown("<h1>Cadastro e Cálculo das Rotas</h1>", unsafe_allow_html=True)
-
-    mes_ref = st.text_input("Mês de referência (ex: Janeiro/2026)", value="")
-
-    aux_total = st.number_input("Auxílio total do mês (R$)", min_value=0.0, step=100.0)
+    import pandas as pd
+    from calculo import (
+        CENTAVOS_PADRAO,
+        ROTAS,
+        calcular_rotas_centavos,
+        calcular_rotas_lote,
+        centavos_para_reais,
+        consolidar_descontos,
+        distribuir_auxilio_centavos,
+        distribuir_auxilio_rotas,
+        montar_resultado,
+        para_centavos,
+        para_reais,
+        resultados_lote_como_dicts,
+    )
+    from historico import salvar_calculo
 
-    # ---------------- ROTA SETE LAGOS ----------------
-    st.markdown("### 🚍 Rota Sete Lagoas")
+    st.markdown("<h1>Cadastro e Cálculo das Rotas</h1>", unsafe_allow_html=True)
 
-    veic_sete = st.number_input("Quantidade de veículos - Sete Lagoas", min_value=1, step=1, value=1)
-    veiculos_sete = {}
+    # Tudo fica dentro de um formulário: editar as tabelas não reexecuta
+    # a página, e o cálculo só roda ao clicar em "Calcular rotas".
+    with st.form("cadastro"):
+        mes_ref = st.text_input("Mês de referência (ex: Janeiro/2026)", value="")
+
+        aux_total = st.number_input("Auxílio total do mês (R$)", min_value=0.0, step=100.0)
+
+        entradas = {}
+        for rota in ROTAS:
+            nome, chave = rota["nome"], rota["chave"]
+            st.markdown(f"### 🚍 Rota {nome}")
+
+            st.markdown(f"**Veículos - {nome}** (uma linha por veículo)")
+            veiculos = st.data_editor(
+                pd.DataFrame([{"nome": "", "valor": 0.0, "dias": 0}]),
+                key=f"veiculos_{chave}",
+                num_rows="dynamic",
+                use_container_width=True,
+                column_config={
+                    "nome": st.column_config.TextColumn("Nome/Tipo (ex: Micro-ônibus, Van)"),
+                    "valor": st.column_config.NumberColumn("Valor da diária (R$)", min_value=0.0, step=10.0, format="%.2f"),
+                    "dias": st.column_config.NumberColumn("Dias rodados", min_value=0, step=1),
+                },
+            )
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                passagens = st.number_input(f"Total de passagens arrecadadas - {nome} (R$)", min_value=0.0, step=50.0, key=f"pass_{chave}")
+            with col2:
+                integrais = st.number_input(f"Alunos integrais - {nome}", min_value=0, step=1, key=f"int_{chave}")
+            with col3:
+                diarias = st.number_input(f"Total de diárias da rota {nome}", min_value=0, step=1, key=f"diarias_{chave}")
+
+            st.markdown(f"**Alunos com desconto - {nome}** (uma linha por faixa de desconto)")
+            faixas = st.data_editor(
+                pd.DataFrame({"pct": pd.Series(dtype="int64"), "qtd": pd.Series(dtype="int64")}),
+                key=f"faixas_{chave}",
+                num_rows="dynamic",
+                use_container_width=True,
+                column_config={
+                    "pct": st.column_config.NumberColumn("Percentual de desconto (%)", min_value=0, max_value=100, step=5),
+                    "qtd": st.column_config.NumberColumn("Quantidade de alunos", min_value=0, step=1),
+                },
+            )
+
+            entradas[nome] = {
+                "veiculos": veiculos,
+                "faixas": faixas,
+                "passagens": passagens,
+                "integrais": integrais,
+                "diarias": diarias,
+            }
+
+        exato = st.checkbox(
+            "Cálculo exato em centavos",
+            value=CENTAVOS_PADRAO,
+            help="Valores arredondados ao centavo; o auxílio das rotas soma exatamente o total do mês.",
+        )
+        calcular = st.form_submit_button("Calcular rotas")
 
-    for i in range(veic_sete):
-        st.markdown(f"**Veículo {i+1} - Sete Lagoas**")
-        nome_veic = st.text_input(f"Nome/Tipo do veículo {i+1} (ex: Micro-ônibus, Van)", key=f"nome_sete_{i}")
-        v = st.number_input(f"Valor da diária (R$) - Veículo {i+1}", min_value=0.0, step=10.0, key=f"v_sete_{i}")
-        d = st.number_input(f"Dias rodados - Veículo {i+1}", min_value=0, step=1, key=f"d_sete_{i}")
-        veiculos_sete[f"veic_{i+1}"] = {"valor": v, "dias": d, "nome": nome_veic}
+    # ---------------- BOTÃO CALCULAR ----------------
+    if calcular:
+        nomes = list(entradas)
+        diarias_rotas = [entradas[n]["diarias"] for n in nomes]
+        if exato:
+            auxilios = para_reais(distribuir_auxilio_centavos(para_centavos(aux_total), diarias_rotas))
+        else:
+            auxilios = distribuir_auxilio_rotas(aux_total, diarias_rotas)
+
+        # Tabelas do cálculo em lote: uma linha por rota, veículos e faixas
+        # em formato longo. Linhas de veículo sem nome e sem valor (a linha
+        # inicial e as adicionadas em branco) não são veículos; nas demais,
+        # células vazias contam como zero. Faixas sem percentual ou sem
+        # alunos são ignoradas, como antes.
+        tab_rotas = pd.DataFrame({
+            "mes_ref": mes_ref,
+            "rota": nomes,
+            "passagens": [entradas[n]["passagens"] for n in nomes],
+            "alunos_integrais": [entradas[n]["integrais"] for n in nomes],
+            "aux_recebido": auxilios,
+            "diarias": [entradas[n]["diarias"] for n in nomes],
+        })
+        veiculos_preenchidos = {}
+        for n, e in entradas.items():
+            v = e["veiculos"]
+            tem_nome = v["nome"].fillna("").astype(str).str.strip() != ""
+            veiculos_preenchidos[n] = v[tem_nome | (v["valor"].fillna(0) > 0)]
+        tab_veiculos = pd.concat(
+            [
+                v[["valor", "dias"]].fillna(0).assign(mes_ref=mes_ref, rota=n)
+                for n, v in veiculos_preenchidos.items()
+            ],
+            ignore_index=True,
+        ).astype({"valor": float, "dias": "int64"})
+        tab_faixas = pd.concat(
+            [
+                e["faixas"][["pct", "qtd"]].fillna(0).astype("int64").assign(mes_ref=mes_ref, rota=n)
+                for n, e in entradas.items()
+            ],
+            ignore_index=True,
+        )
+        tab_faixas = consolidar_descontos(tab_faixas)
 
-    pass_sete = st.number_input("Total de passagens arrecadadas - Sete Lagoas (R$)", min_value=0.0, step=50.0)
-    int_sete = st.number_input("Alunos integrais - Sete Lagoas", min_value=0, step=1)
+        if exato:
+            lote = centavos_para_reais(calcular_rotas_centavos(tab_rotas, tab_veiculos, tab_faixas))
+        else:
+            lote = calcular_rotas_lote(tab_rotas, tab_veiculos, tab_faixas)
+        resultados = dict(zip(nomes, resultados_lote_como_dicts(lote, tab_faixas)))
 
-    st.markdown("#### Alunos com desconto - Sete Lagoas")
-    qtd_faixas_sete = st.number_input("Quantas faixas de desconto existem em Sete Lagoas?", min_value=0, step=1, value=0)
+        st.session_state["resultado"] = montar_resultado(mes_ref, resultados, exato)
 
-    descontos_sete = {}
-    for i in range(qtd_faixas_sete):
-        col1, col2 = st.columns(2)
-        with col1:
-            pct = st.number_input(f"Percentual de desconto da faixa {i+1} (%)", min_value=0, max_value=100, step=5, key=f"pct_sete_{i}")
-        with col2:
-            qtd = st.number_input(f"Quantidade de alunos nessa faixa {i+1}", min_value=0, step=1, key=f"qtd_sete_{i}")
-        if pct > 0 and qtd > 0:
-            descontos_sete[pct] = descontos_sete.get(pct, 0) + qtd
+        salvar_calculo(mes_ref, resultados)
 
-    diarias_sete = st.number_input("Total de diárias da rota Sete Lagoas", min_value=0, step=1)
+        st.success("Cálculo realizado e histórico salvo com sucesso.")
 
-    # ---------------- ROTA CURVELO ----------------
-    st.markdown("### 🚍 Rota Curvelo")
+        for nome, res in resultados.items():
+            st.markdown(f"### Resumo - {nome}")
+            st.json(res)
 
-    veic_cur = st.number_input("Quantidade de veículos - Curvelo", min_value=1, step=1, value=1)
-    veiculos_cur = {}
+    # ---------------- IMPORTAÇÃO EM LOTE ----------------
+    with st.expander("📥 Importar vários meses (CSV ou Excel)"):
+        from importacao import importar, modelo_csv
 
-    for i in range(veic_cur):
-        st.markdown(f"**Veículo {i+1} - Curvelo**")
-        nome_veic = st.text_input(f"Nome/Tipo do veículo {i+1} (ex: Ônibus, Van)", key=f"nome_cur_{i}")
-        v = st.number_input(f"Valor da diária (R$) - Veículo {i+1}", min_value=0.0, step=10.0, key=f"v_cur_{i}")
-        d = st.number_input(f"Dias rodados - Veículo {i+1}", min_value=0, step=1, key=f"d_cur_{i}")
-        veiculos_cur[f"veic_{i+1}"] = {"valor": v, "dias": d, "nome": nome_veic}
+        st.markdown(
+            "Uma linha por rota, veículo ou faixa de desconto, indicada na coluna "
+            "<b>tipo</b>. Se houver qualquer erro, nada é gravado.",
+            unsafe_allow_html=True,
+        )
+        st.download_button(
+            "Baixar modelo (CSV)",
+            data=modelo_csv(),
+            file_name="modelo_importacao_asseuf.csv",
+            mime="text/csv",
+            on_click="ignore",
+        )
+        arquivo = st.file_uploader("Arquivo de importação", type=["csv", "xlsx"])
+        if arquivo is not None and st.button("Validar e importar"):
+            with st.spinner("Validando e calculando..."):
+                saida = importar(arquivo, arquivo.name)
+            if not saida["erros"].empty:
+                st.error(f"{len(saida['erros'])} erro(s) encontrado(s); nada foi gravado.")
+                st.dataframe(saida["erros"], use_container_width=True, hide_index=True)
+            else:
+                meses = saida["resultados"]["mes_ref"].nunique()
+                st.success(f"{saida['gravados']} rota-mês de {meses} mês(es) gravadas no histórico.")
+                st.dataframe(
+                    saida["resultados"][["mes_ref", "rota", "aux_recebido", "mensalidade_media"]],
+                    use_container_width=True,
+                    hide_index=True,
+                )
+# ============================================================
+# PÁGINA CENÁRIOS
+# ============================================================
+if pagina == "cenarios":
+    import numpy as np
+    import pandas as pd
+    from cenarios import base_do_resultado, nome_eixo, sensibilidade, varrer_cenarios
+    from graficos import spec_mapa
+    from historico import obter_backend
+    from metas import metas_do_resultado
+    from simulacao import SEMENTE_PADRAO, ajustar_modelo, faixas_percentis, simular, tabela_modelo
+    from metricas import medir
+
+    st.markdown("<h1>Simulação de Cenários</h1>", unsafe_allow_html=True)
 
-    pass_cur = st.number_input("Total de passagens arrecadadas - Curvelo (R$)", min_value=0.0, step=50.0)
-    int_cur = st.number_input("Alunos integrais - Curvelo", min_value=0, step=1)
+    if "resultado" not in st.session_state:
+        st.warning("Nenhuma simulação encontrada. Vá em 'Cadastro e Cálculo' e gere um cálculo primeiro.")
+    else:
+        base = base_do_resultado(st.session_state["resultado"])
+        nomes_rotas = list(base["rotas"])
 
-    st.markdown("#### Alunos com desconto - Curvelo")
-    qtd_faixas_cur = st.number_input("Quantas faixas de desconto existem em Curvelo?", min_value=0, step=1, value=0)
+        st.markdown(
+            "Os veículos e os alunos de cada rota ficam fixos no último cálculo; "
+            "o auxílio total e um segundo parâmetro variam numa grade."
+        )
+        if base["exato"]:
+            st.caption("Valores calculados em centavos, como no último cálculo (cálculo exato).")
 
-    descontos_cur = {}
-    for i in range(qtd_faixas_cur):
-        col1, col2 = st.columns(2)
+        st.markdown("### Auxílio total do mês (eixo X)")
+        col1, col2, col3 = st.columns(3)
         with col1:
-            pct = st.number_input(f"Percentual de desconto da faixa {i+1} (%) - Curvelo", min_value=0, max_value=100, step=5, key=f"pct_cur_{i}")
+            aux_min = st.number_input("Auxílio mínimo (R$)", min_value=0.0, step=500.0, value=round(base["aux_total"] * 0.5, 2))
         with col2:
-            qtd = st.number_input(f"Quantidade de alunos nessa faixa {i+1} - Curvelo", min_value=0, step=1, key=f"qtd_cur_{i}")
-        if pct > 0 and qtd > 0:
-            descontos_cur[pct] = descontos_cur.get(pct, 0) + qtd
+            aux_max = st.number_input("Auxílio máximo (R$)", min_value=0.0, step=500.0, value=round(base["aux_total"] * 1.5, 2))
+        with col3:
+            aux_passos = st.number_input("Pontos no eixo X", min_value=2, max_value=100, step=1, value=30)
 
-    diarias_cur = st.number_input("Total de diárias da rota Curvelo", min_value=0, step=1)
+        st.markdown("### Segundo parâmetro (eixo Y)")
+        opcoes = {
+            f"Passagens - {nome}": ("passagens", nome) for nome in nomes_rotas
+        }
+        opcoes.update({f"Diárias - {nome}": ("diarias", nome) for nome in nomes_rotas})
+        escolha = st.selectbox("Parâmetro", list(opcoes))
+        campo, rota_y = opcoes[escolha]
+        atual = base["rotas"][rota_y][campo]
+
+        col1, col2, col3 = st.columns(3)
+        if campo == "diarias":
+            with col1:
+                y_min = st.number_input("Mínimo", min_value=0, step=1, value=max(0, int(atual) - 10))
+            with col2:
+                y_max = st.number_input("Máximo", min_value=0, step=1, value=int(atual) + 10)
+            valores_y = np.arange(y_min, max(y_min, y_max) + 1)
+        else:
+            with col1:
+                y_min = st.number_input("Mínimo (R$)", min_value=0.0, step=100.0, value=round(atual * 0.5, 2))
+            with col2:
+                y_max = st.number_input("Máximo (R$)", min_value=0.0, step=100.0, value=round(atual * 1.5, 2))
+            with col3:
+                y_passos = st.number_input("Pontos no eixo Y", min_value=2, max_value=100, step=1, value=30)
+            valores_y = np.linspace(y_min, y_max, int(y_passos))
+
+        rota_mens = st.selectbox("Mensalidade exibida da rota", nomes_rotas)
+
+        eixo_y = nome_eixo(campo, rota_y)
+        cenarios = varrer_cenarios(base, {
+            "aux_total": np.linspace(aux_min, aux_max, int(aux_passos)),
+            eixo_y: valores_y,
+        })
+        dados_mapa = pd.DataFrame({
+            "aux_total": cenarios["aux_total"].round(2),
+            "parametro": cenarios[eixo_y].round(2),
+            "mensalidade": cenarios[nome_eixo("mensalidade_media", rota_mens)].round(2),
+        })
+
+        st.markdown(f"### Mensalidade média - {rota_mens}")
+        with medir("grafico_cenarios"):
+            st.vega_lite_chart(spec_mapa(dados_mapa, escolha), use_container_width=True)
+
+        st.markdown("### Sensibilidade da mensalidade média (R$)")
+        st.caption("Variação da mensalidade de cada rota quando apenas um parâmetro muda, a partir do último cálculo.")
+        st.dataframe(sensibilidade(base).style.format("{:+,.2f}"))
+
+        st.markdown("### Meta de mensalidade")
+        st.caption(
+            "Valor que cada entrada precisaria ter para a mensalidade média chegar à meta, "
+            "com as demais fixas no último cálculo. Vazio: a meta não é atingível por aquela entrada."
+        )
+        resultado = st.session_state["resultado"]
+        metas = {}
+        for col, nome in zip(st.columns(len(nomes_rotas)), nomes_rotas):
+            with col:
+                atual_mens = max(float(resultado["rotas"][nome]["mensalidade_media"]), 0.0)
+                metas[nome] = st.number_input(f"Meta - {nome} (R$)", min_value=0.0, step=10.0, value=round(atual_mens, 2))
+        # A meta segue o modo do último cálculo: em float, o auxílio que leva
+        # a rota mais cara exatamente à meta; em centavos, o menor valor ao
+        # centavo que deixa todas as rotas na meta ou abaixo.
+        exato = resultado.get("exato", False)
+        tabela_metas = metas_do_resultado(resultado, metas, exato=exato)
 
-    # ---------------- BOTÃO CALCULAR ----------------
-    if st.button("Calcular rotas"):
-        aux_sete, aux_cur = distribuir_auxilio_por_diarias(aux_total, diarias_sete, diarias_cur)
-
-        res_sete = calcular_rota(
-            {k: {"valor": v["valor"], "dias": v["dias"]} for k, v in veiculos_sete.items()},
-            pass_sete,
-            int_sete,
-            descontos_sete,
-            aux_recebido=aux_sete,
-            diarias_rota=diarias_sete
+        col1, col2 = st.columns(2)
+        col1.metric("Auxílio total atual", f"R$ {tabela_metas['aux_total_atual'].iloc[0]:,.2f}")
+        aux_meta = tabela_metas["aux_total_exato" if exato else "aux_total"].iloc[0]
+        col2.metric(
+            "Auxílio total para todas as rotas na meta",
+            "—" if np.isnan(aux_meta) else f"R$ {aux_meta:,.2f}",
+            help=(
+                "Menor valor, ao centavo, que deixa todas as rotas na meta ou abaixo (cálculo exato em centavos)."
+                if exato else "Valor que leva a rota mais cara exatamente à meta (cálculo em float)."
+            ),
         )
-        res_cur = calcular_rota(
-            {k: {"valor": v["valor"], "dias": v["dias"]} for k, v in veiculos_cur.items()},
-            pass_cur,
-            int_cur,
-            descontos_cur,
-            aux_recebido=aux_cur,
-            diarias_rota=diarias_cur
+        st.dataframe(
+            tabela_metas.set_index("rota")[[
+                "mensalidade_media", "meta", "aux_total_rota", "passagens", "desconto_pct",
+            ]].rename(columns={
+                "mensalidade_media": "Mensalidade atual",
+                "meta": "Meta",
+                "aux_total_rota": "Auxílio total (só esta rota)",
+                "passagens": "Passagens necessárias",
+                "desconto_pct": "Desconto único (%)",
+            }).style.format("{:,.2f}", na_rep="—")
         )
 
-        st.session_state["resultado"] = {
-            "mes_ref": mes_ref,
-            "sete": res_sete,
-            "cur": res_cur,
-        }
-
-        salvar_historico(mes_ref, "Sete Lagoas", res_sete)
-        salvar_historico(mes_ref, "Curvelo", res_cur)
-
-        st.success("Cálculo realizado e histórico salvo com sucesso.")
-
-        st.markdown("### Resumo - Sete Lagoas")
-        st.json(res_sete)
+        st.markdown("### Faixa provável da mensalidade (Monte Carlo)")
+        st.caption(
+            "Passagens, diárias e alunos de cada rota são sorteados de distribuições ajustadas "
+            "ao histórico. A mesma semente e o mesmo número de amostras reproduzem o resultado."
+        )
+        with st.form("monte_carlo"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                n_amostras = st.selectbox("Amostras", [10_000, 100_000, 1_000_000], index=1, format_func="{:,}".format)
+            with col2:
+                semente = st.number_input("Semente", min_value=0, step=1, value=SEMENTE_PADRAO)
+            with col3:
+                aux_mc = st.number_input("Auxílio total do mês (R$)", min_value=0.0, step=500.0, value=round(base["aux_total"], 2))
+            rodar_mc = st.form_submit_button("Simular")
+
+        if rodar_mc:
+            with st.spinner("Simulando..."):
+                modelo = ajustar_modelo(obter_backend().carregar())
+                amostras_mc = simular(modelo, aux_mc, amostras=n_amostras, semente=int(semente))
+            if not modelo:
+                st.warning("Sem histórico para ajustar as distribuições.")
+            else:
+                st.dataframe(faixas_percentis(amostras_mc).style.format("{:,.2f}"))
+                with st.expander("Distribuições ajustadas"):
+                    st.dataframe(tabela_modelo(modelo), hide_index=True)
 
-        st.markdown("### Resumo - Curvelo")
-        st.json(res_cur)
 # ============================================================
 # PÁGINA RELATÓRIOS E GRÁFICOS
 # ============================================================
 if pagina == "relatorios":
+    import pandas as pd
+    from analises import csv_historico, obter_analises
+    from graficos import spec_comparativo, spec_mensal
+    from metricas import medir
+
     st.markdown("<h1>Relatórios e Gráficos</h1>", unsafe_allow_html=True)
 
-    historico = carregar_historico()
+    analises = obter_analises()
 
-    if historico.empty:
+    if analises["mensal"].empty:
         st.warning("Nenhum histórico encontrado. Gere um cálculo na aba de Cadastro e Cálculo.")
     else:
         st.markdown("### Histórico mensal registrado")
-        st.dataframe(historico)
 
-        csv_bytes = historico.to_csv(index=False).encode("utf-8")
+        # Filtros, ordenação e paginação rodam no backend do histórico;
+        # só a página visível é enviada ao navegador. Por ser um fragmento,
+        # mexer nos filtros não reexecuta o resto da página.
+        @st.fragment
+        def navegador_historico():
+            from historico import COLUNAS, obter_backend
+
+            opcoes = analises["opcoes_filtro"]
+            colunas_valor = ["mensalidade_media", "valor_final", "bruto", "aux_recebido", "passagens", "diarias"]
+
+            col1, col2 = st.columns(2)
+            with col1:
+                rotas_sel = st.multiselect("Rotas", opcoes["rotas"])
+            with col2:
+                periodo_de = periodo_ate = None
+                if len(opcoes["periodos"]) > 1:
+                    de, ate = st.select_slider(
+                        "Período",
+                        options=opcoes["periodos"],
+                        value=(opcoes["periodos"][0], opcoes["periodos"][-1]),
+                    )
+                    # Com o intervalo completo, meses em formato não reconhecido continuam visíveis.
+                    if (de, ate) != (opcoes["periodos"][0], opcoes["periodos"][-1]):
+                        periodo_de, periodo_ate = de, ate
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                coluna_valor = st.selectbox("Filtrar por valor", colunas_valor)
+            with col2:
+                minimo = st.number_input("Valor mínimo", value=None, step=10.0)
+            with col3:
+                maximo = st.number_input("Valor máximo", value=None, step=10.0)
+
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                ordenar_por = st.selectbox("Ordenar por", ["(ordem de registro)"] + COLUNAS)
+            with col2:
+                decrescente = st.checkbox("Decrescente")
+            with col3:
+                por_pagina = st.selectbox("Linhas por página", [25, 50, 100, 250])
+            with col4:
+                pagina_atual = st.number_input("Página", min_value=1, step=1, value=1)
+
+            filtros = {
+                "rotas": rotas_sel or None,
+                "periodo_de": periodo_de,
+                "periodo_ate": periodo_ate,
+                "faixas": {coluna_valor: (minimo, maximo)} if minimo is not None or maximo is not None else None,
+                "ordenar_por": None if ordenar_por == "(ordem de registro)" else ordenar_por,
+                "decrescente": decrescente,
+                "limite": por_pagina,
+            }
+            backend = obter_backend()
+            linhas, total = backend.consultar(**filtros, deslocamento=(pagina_atual - 1) * por_pagina)
+            total_paginas = max(1, -(-total // por_pagina))
+            if pagina_atual > total_paginas:
+                pagina_atual = total_paginas
+                linhas, total = backend.consultar(**filtros, deslocamento=(pagina_atual - 1) * por_pagina)
+
+            st.dataframe(linhas, hide_index=True)
+            inicio = (pagina_atual - 1) * por_pagina
+            st.caption(
+                f"Mostrando {min(inicio + 1, total)}–{inicio + len(linhas)} de {total} registros "
+                f"(página {pagina_atual} de {total_paginas})."
+            )
+
+        navegador_historico()
+
         st.download_button(
             label="📥 Baixar histórico completo (CSV)",
-            data=csv_bytes,
+            data=lambda: csv_historico(analises),
             file_name="historico_rotas.csv",
-            mime="text/csv"
+            mime="text/csv",
+            on_click="ignore",
         )
 
         st.markdown("---")
         st.markdown("### Evolução da mensalidade média por rota")
 
-        graf_mensal = historico.groupby(["mes_ref", "rota"])["mensalidade_media"].mean().reset_index()
+        graf_mensal = analises["mensal"]
 
         if not graf_mensal.empty:
-            chart_mensal = alt.Chart(graf_mensal).mark_line(point=True).encode(
-                x=alt.X("mes_ref:N", title="Mês"),
-                y=alt.Y("mensalidade_media:Q", title="Mensalidade média (R$)"),
-                color=alt.Color("rota:N", title="Rota"),
-                tooltip=["mes_ref", "rota", "mensalidade_media"]
-            ).properties(height=350)
-            st.altair_chart(chart_mensal, use_container_width=True)
+            with medir("grafico_mensal"):
+                st.vega_lite_chart(spec_mensal(graf_mensal, analises["versao"]), use_container_width=True)
 
         st.markdown("---")
         st.markdown("### Comparativo financeiro da última simulação")
 
         if "resultado" in st.session_state:
             r = st.session_state["resultado"]
-            s = r["sete"]
-            c = r["cur"]
 
             df_comp = pd.DataFrame([
-                {"Indicador": "Bruto", "Rota": "Sete Lagoas", "Valor": s["bruto"]},
-                {"Indicador": "Bruto ajustado (10%)", "Rota": "Sete Lagoas", "Valor": s["bruto_aj_10"]},
-                {"Indicador": "Auxílio recebido", "Rota": "Sete Lagoas", "Valor": s["aux_recebido"]},
-                {"Indicador": "Valor final", "Rota": "Sete Lagoas", "Valor": s["valor_final"]},
-                {"Indicador": "Bruto", "Rota": "Curvelo", "Valor": c["bruto"]},
-                {"Indicador": "Bruto ajustado (10%)", "Rota": "Curvelo", "Valor": c["bruto_aj_10"]},
-                {"Indicador": "Auxílio recebido", "Rota": "Curvelo", "Valor": c["aux_recebido"]},
-                {"Indicador": "Valor final", "Rota": "Curvelo", "Valor": c["valor_final"]},
+                {"Indicador": indicador, "Rota": nome, "Valor": res[campo]}
+                for nome, res in r["rotas"].items()
+                for indicador, campo in [
+                    ("Bruto", "bruto"),
+                    ("Bruto ajustado (10%)", "bruto_aj_10"),
+                    ("Auxílio recebido", "aux_recebido"),
+                    ("Valor final", "valor_final"),
+                ]
             ])
 
-            chart_comp = alt.Chart(df_comp).mark_bar().encode(
-                x=alt.X("Indicador:N", title="Etapa"),
-                y=alt.Y("Valor:Q", title="Valor (R$)"),
-                color=alt.Color("Rota:N", title="Rota"),
-                tooltip=["Indicador", "Rota", "Valor"]
-            ).properties(height=350)
-
-            st.altair_chart(chart_comp, use_container_width=True)
+            with medir("grafico_comparativo"):
+                st.vega_lite_chart(spec_comparativo(df_comp), use_container_width=True)
         else:
             st.info("Nenhuma simulação ativa encontrada. Faça um cálculo para ver o comparativo.")
 # ============================================================
-# FUNÇÃO PDF
-# ============================================================
-def gerar_pdf_profissional(r: dict) -> bytes:
-    resumo_qr = (
-        f"ASSEUF - {r.get('mes_ref', 'Mês não informado')} | "
-        f"Sete Lagoas: R$ {r['sete']['valor_final']:,.2f} | "
-        f"Curvelo: R$ {r['cur']['valor_final']:,.2f}"
-    )
-    qr_b64 = gerar_qr_base64(resumo_qr)
-
-    def fmt_brl(val):
-        try:
-            return f"R$ {float(val):,.2f}"
-        except Exception:
-            return "R$ 0,00"
-
-    s = r["sete"]
-    c = r["cur"]
-
-    total_bruto = s["bruto"] + c["bruto"]
-    total_pass = s["passagens"] + c["passagens"]
-    total_10 = s["dez_porcento"] + c["dez_porcento"]
-    total_bruto_aj = s["bruto_aj_10"] + c["bruto_aj_10"]
-    total_aux = s["aux_recebido"] + c["aux_recebido"]
-    total_pos_aux = s["pos_aux"] + c["pos_aux"]
-    total_90 = s["noventa_porcento"] + c["noventa_porcento"]
-    total_final = s["valor_final"] + c["valor_final"]
-    total_alunos_int = s["alunos_integrais"] + c["alunos_integrais"]
-    total_alunos_desc = s["alunos_desconto_total"] + c["alunos_desconto_total"]
-    total_veic = s["veiculos_qtd"] + c["veiculos_qtd"]
-    total_diarias = s["diarias"] + c["diarias"]
-
-    html = f"""
-    <!DOCTYPE html>
-    <html lang="pt-BR">
-    <head>
-        <meta charset="UTF-8">
-        <title>Relatório ASSEUF - {r.get('mes_ref', '')}</title>
-        <style>
-            @page {{ size: A4; margin: 1.8cm; }}
-            body {{
-                font-family: Arial, sans-serif;
-                color: #2c3e50;
-                line-height: 1.5;
-            }}
-            .header {{
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                border-bottom: 3px solid #00e676;
-                padding-bottom: 12px;
-                margin-bottom: 25px;
-            }}
-            .title h1 {{
-                color: #00695c;
-                font-size: 22px;
-                margin: 0;
-            }}
-            .qr img {{
-                width: 90px;
-                height: 90px;
-            }}
-            h2 {{
-                color: #004d40;
-                font-size: 17px;
-                margin-top: 25px;
-                margin-bottom: 10px;
-                border-left: 5px solid #00e676;
-                padding-left: 10px;
-            }}
-            table {{
-                width: 100%;
-                border-collapse: collapse;
-                margin-bottom: 20px;
-                font-size: 12px;
-            }}
-            th {{
-                background-color: #e0f2f1;
-                color: #004d40;
-                padding: 8px;
-                border: 1px solid #b0bec5;
-                text-align: center;
-                font-weight: bold;
-            }}
-            td {{
-                padding: 7px;
-                border: 1px solid #b0bec5;
-                text-align: right;
-            }}
-            td:first-child {{
-                text-align: left;
-                font-weight: 500;
-            }}
-            .totais {{
-                background-color: #f1f8e9;
-                border-left: 5px solid #00e676;
-                padding: 12px;
-                margin-top: 25px;
-            }}
-            .footer {{
-                margin-top: 40px;
-                text-align: center;
-                font-size: 10px;
-                color: #95a5a6;
-                border-top: 1px solid #ecf0f1;
-                padding-top: 15px;
-            }}
-        </style>
-    </head>
-    <body>
-
-        <div class="header">
-            <div class="title">
-                <h1>ASSEUF • Relatório Mensal</h1>
-                <span>Metodologia: 10% → auxílio → 90% → alunos integrais e com desconto</span>
-            </div>
-            <div class="qr">
-                <img src="data:image/png;base64,{qr_b64}">
-            </div>
-        </div>
-
-        <p><strong>Mês de referência:</strong> {r.get('mes_ref', 'Não informado')}</p>
-
-        <h2>Resumo financeiro por rota</h2>
-        <table>
-            <tr>
-                <th>Etapa</th>
-                <th>Sete Lagoas</th>
-                <th>Curvelo</th>
-                <th>Total</th>
-            </tr>
-            <tr>
-                <td>Custo bruto</td>
-                <td>{fmt_brl(s['bruto'])}</td>
-                <td>{fmt_brl(c['bruto'])}</td>
-                <td>{fmt_brl(total_bruto)}</td>
-            </tr>
-            <tr>
-                <td>Passagens arrecadadas</td>
-                <td>{fmt_brl(s['passagens'])}</td>
-                <td>{fmt_brl(c['passagens'])}</td>
-                <td>{fmt_brl(total_pass)}</td>
-            </tr>
-            <tr>
-                <td>(-) 10% das passagens</td>
-                <td>{fmt_brl(s['dez_porcento'])}</td>
-                <td>{fmt_brl(c['dez_porcento'])}</td>
-                <td>{fmt_brl(total_10)}</td>
-            </tr>
-            <tr>
-                <td>Custo após 10%</td>
-                <td>{fmt_brl(s['bruto_aj_10'])}</td>
-                <td>{fmt_brl(c['bruto_aj_10'])}</td>
-                <td>{fmt_brl(total_bruto_aj)}</td>
-            </tr>
-            <tr>
-                <td>(-) Auxílio recebido</td>
-                <td>{fmt_brl(s['aux_recebido'])}</td>
-                <td>{fmt_brl(c['aux_recebido'])}</td>
-                <td>{fmt_brl(total_aux)}</td>
-            </tr>
-            <tr>
-                <td>Valor após auxílio</td>
-                <td>{fmt_brl(s['pos_aux'])}</td>
-                <td>{fmt_brl(c['pos_aux'])}</td>
-                <td>{fmt_brl(total_pos_aux)}</td>
-            </tr>
-            <tr>
-                <td>(-) 90% das passagens</td>
-                <td>{fmt_brl(s['noventa_porcento'])}</td>
-                <td>{fmt_brl(c['noventa_porcento'])}</td>
-                <td>{fmt_brl(total_90)}</td>
-            </tr>
-            <tr>
-                <td><strong>Valor final</strong></td>
-                <td><strong>{fmt_brl(s['valor_final'])}</strong></td>
-                <td><strong>{fmt_brl(c['valor_final'])}</strong></td>
-                <td><strong>{fmt_brl(total_final)}</strong></td>
-            </tr>
-        </table>
-
-        <h2>Alunos e mensalidade</h2>
-        <table>
-            <tr>
-                <th>Rota</th>
-                <th>Alunos integrais</th>
-                <th>Alunos com desconto</th>
-                <th>Mensalidade média</th>
-            </tr>
-            <tr>
-                <td>Sete Lagoas</td>
-                <td style="text-align:center;">{s['alunos_integrais']}</td>
-                <td style="text-align:center;">{s['alunos_desconto_total']}</td>
-                <td>{fmt_brl(s['mensalidade_media'])}</td>
-            </tr>
-            <tr>
-                <td>Curvelo</td>
-                <td style="text-align:center;">{c['alunos_integrais']}</td>
-                <td style="text-align:center;">{c['alunos_desconto_total']}</td>
-                <td>{fmt_brl(c['mensalidade_media'])}</td>
-            </tr>
-        </table>
-
-        <div class="totais">
-            <h3>Resumo consolidado</h3>
-            <p><strong>Total de alunos integrais:</strong> {total_alunos_int}</p>
-            <p><strong>Total de alunos com desconto:</strong> {total_alunos_desc}</p>
-            <p><strong>Total de veículos:</strong> {total_veic}</p>
-            <p><strong>Total de diárias:</strong> {total_diarias}</p>
-            <p><strong>Valor final total:</strong> {fmt_brl(total_final)}</p>
-        </div>
-
-        <div class="footer">
-            Relatório gerado automaticamente pelo Sistema ASSEUF em {datetime.now().strftime('%d/%m/%Y %H:%M')}.
-        </div>
-
-    </body>
-    </html>
-    """
-
-    return HTML(string=html).write_pdf()
-
-# ============================================================
 # PÁGINA PDF
 # ============================================================
 if pagina == "pdf":
+    from fila_pdf import STATUS_ERRO, STATUS_GERANDO, STATUS_PRONTO, enviar_pdf, erro_pdf, obter_pdf, status_pdf
+    from relatorio import gerar_pdf_em_cache
+
     st.markdown("<h1>Geração de PDF</h1>", unsafe_allow_html=True)
 
     if "resultado" not in st.session_state:
         st.warning("Nenhuma simulação encontrada. Vá em 'Cadastro e Cálculo' e gere um cálculo primeiro.")
     else:
         r = st.session_state["resultado"]
-        pdf_bytes = gerar_pdf_profissional(r)
-        b64 = base64.b64encode(pdf_bytes).decode("utf-8")
-        href = f'<a href="data:application/pdf;base64,{b64}" download="relatorio_asseuf.pdf">📥 Baixar relatório em PDF</a>'
-        st.markdown(href, unsafe_allow_html=True)
\ No newline at end of file
+        chave_pdf = enviar_pdf(r)
+
+        if status_pdf(chave_pdf) == STATUS_PRONTO:
+            # Os bytes só são lidos do cache quando o usuário clica:
+            # os reruns da página não trafegam o PDF.
+            st.download_button(
+                label="📥 Baixar relatório em PDF",
+                data=lambda: obter_pdf(chave_pdf) or gerar_pdf_em_cache(r),
+                file_name="relatorio_asseuf.pdf",
+                mime="application/pdf",
+                on_click="ignore",
+            )
+        else:
+            # Só este trecho é reexecutado enquanto o job não termina;
+            # ao concluir, a página inteira roda de novo e mostra o download.
+            @st.fragment(run_every=1)
+            def acompanhar_pdf():
+                status = status_pdf(chave_pdf)
+                if status in (STATUS_PRONTO, None):
+                    st.rerun()
+                elif status == STATUS_ERRO:
+                    st.error(f"Falha ao gerar o PDF: {erro_pdf(chave_pdf)}")
+                    if st.button("Tentar novamente"):
+                        enviar_pdf(r)
+                        st.rerun()
+                elif status == STATUS_GERANDO:
+                    st.info("⏳ Gerando o relatório em PDF...")
+                else:
+                    st.info("⏳ Relatório na fila de geração...")
+
+            acompanhar_pdf()
+# ============================================================
+# PÁGINA DE MÉTRICAS (ADMINISTRAÇÃO)
+# ============================================================
+if pagina == "metricas":
+    import altair as alt
+    import pandas as pd
+    import metricas
+
+    st.markdown("<h1>Métricas de desempenho</h1>", unsafe_allow_html=True)
+    st.caption(
+        "Tempos de cada etapa acumulados neste processo, somando todas as sessões. "
+        "PDFs gerados na fila entram quando o job termina."
+    )
+
+    linhas = metricas.resumo()
+    if not linhas:
+        st.info("Nenhuma etapa medida ainda.")
+    else:
+        tabela = pd.DataFrame(linhas).set_index("etapa")
+        colunas_ms = ["total_s", "media_s", "p50_s", "p90_s", "p99_s", "max_s"]
+        tabela[colunas_ms] = tabela[colunas_ms] * 1000
+        tabela = tabela.rename(columns={c: c.replace("_s", " (ms)") for c in colunas_ms})
+        st.dataframe(tabela.style.format("{:,.2f}", subset=[c for c in tabela.columns if "(ms)" in c]))
+
+        etapa = st.selectbox("Histograma da etapa", list(tabela.index))
+        h = metricas.instantaneo()[etapa]
+        limites = [f"≤ {b * 1000:g} ms" for b in metricas.BALDES] + [f"> {metricas.BALDES[-1] * 1000:g} ms"]
+        baldes = pd.DataFrame({"Duração": limites, "Execuções": h["contagens"]})
+        st.altair_chart(
+            alt.Chart(baldes).mark_bar().encode(
+                x=alt.X("Duração:N", sort=None),
+                y=alt.Y("Execuções:Q"),
+                tooltip=["Duração", "Execuções"],
+            ).properties(height=300),
+            use_container_width=True,
+        )
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button(
+            "📥 Prometheus (texto)",
+            data=lambda: metricas.exportar_prometheus().encode("utf-8"),
+            file_name="asseuf.prom",
+            mime="text/plain",
+            on_click="ignore",
+        )
+    with col2:
+        st.download_button(
+            "📥 JSON lines",
+            data=lambda: metricas.exportar_jsonl().encode("utf-8"),
+            file_name="asseuf_metricas.jsonl",
+            mime="application/x-ndjson",
+            on_click="ignore",
+        )
+    with col3:
+        if st.button("Zerar métricas"):
+            metricas.zerar()
+            st.rerun()
+    if metricas.ARQUIVO:
+        st.caption(f"Exportação automática em {metricas.ARQUIVO} a cada {metricas.INTERVALO:g} s.")
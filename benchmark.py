@@ -0,0 +1,386 @@
+"""
+Benchmarks reprodutíveis dos caminhos mais pesados: cálculo das rotas,
+distribuição do auxílio, metas de mensalidade, gravação/leitura do
+histórico e PDF.
+
+    python benchmark.py                                  # 10² a 10⁴ linhas
+    python benchmark.py --completo                       # até 10⁶ linhas
+    python benchmark.py --casos calcular historico       # só alguns casos
+    python benchmark.py --salvar benchmarks/baseline.json
+    python benchmark.py --comparar benchmarks/baseline.json --limite 0.25
+
+Os dados são sintéticos e gerados com semente fixa. Para cada caso e
+tamanho são medidos a vazão (linhas por segundo), os percentis de
+latência de cada execução e o pico de memória alocada (tracemalloc, numa
+execução à parte para não distorcer os tempos). Com --comparar, a mediana
+de cada caso é comparada com a da linha de base e o script termina com
+erro se algum caso ficar mais lento que o limite.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from calculo import (
+    ROTAS,
+    calcular_rota,
+    calcular_rotas_centavos,
+    calcular_rotas_lote,
+    distribuir_auxilio_centavos,
+    distribuir_auxilio_por_diarias,
+    distribuir_auxilio_rotas,
+    montar_resultado,
+    montar_tabelas_lote,
+    para_centavos,
+    resultados_lote_como_dicts,
+)
+from historico import HistoricoCSV, HistoricoParquet, HistoricoSQLite, montar_registro
+from metas import metas_lote
+
+TAMANHOS_RAPIDO = [10**2, 10**3, 10**4]
+TAMANHOS_COMPLETO = [10**2, 10**3, 10**4, 10**5, 10**6]
+SEMENTE = 2026
+LIMITE_PADRAO = 0.25
+# Diferenças abaixo disso são ruído do relógio, mesmo que passem do limite.
+RUIDO_MS = 0.05
+
+NOMES_MESES = [
+    "Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", "Julho",
+    "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro",
+]
+
+BACKENDS = {
+    "csv": lambda pasta: HistoricoCSV(os.path.join(pasta, "historico.csv")),
+    "sqlite": lambda pasta: HistoricoSQLite(os.path.join(pasta, "historico.db")),
+    "parquet": lambda pasta: HistoricoParquet(os.path.join(pasta, "historico.parquet")),
+}
+
+# ============================================================
+# GERADORES SINTÉTICOS
+# ============================================================
+def nome_mes(i: int) -> str:
+    return f"{NOMES_MESES[i % 12]}/{2000 + i // 12}"
+
+
+def gerar_entradas(n: int, semente=SEMENTE) -> list:
+    """n rotas-mês no formato de montar_tabelas_lote, alternando as ROTAS."""
+    rng = np.random.default_rng(semente)
+    n_veic = rng.integers(1, 5, n)
+    n_faixas = rng.integers(0, 4, n)
+    valores = rng.uniform(200, 900, n_veic.sum()).round(2)
+    dias = rng.integers(0, 23, n_veic.sum())
+    pcts = [rng.choice(np.arange(10, 100, 10), k, replace=False) for k in range(4)]
+    entradas = []
+    v = 0
+    for i in range(n):
+        veiculos = {}
+        for j in range(n_veic[i]):
+            veiculos[f"Veículo {j + 1}"] = {"valor": float(valores[v]), "dias": int(dias[v])}
+            v += 1
+        k = n_faixas[i]
+        entradas.append({
+            "mes_ref": nome_mes(i // len(ROTAS)),
+            "rota": ROTAS[i % len(ROTAS)]["nome"],
+            "veiculos": veiculos,
+            "passagens": float(rng.uniform(0, 3000)),
+            "alunos_integrais": int(rng.integers(0, 60)),
+            "descontos": {int(p): int(rng.integers(1, 10)) for p in pcts[k]},
+            "aux_recebido": float(rng.uniform(0, 8000)),
+            "diarias": int(rng.integers(0, 45)),
+        })
+    return entradas
+
+
+def gerar_diarias(n: int, semente=SEMENTE):
+    """n meses: auxílio total (n,) e diárias (n, rotas), com alguns zeros."""
+    rng = np.random.default_rng(semente)
+    aux = rng.uniform(0, 20000, n).round(2)
+    diarias = rng.integers(0, 45, (n, len(ROTAS)))
+    diarias[rng.random((n, len(ROTAS))) < 0.05] = 0
+    return aux, diarias
+
+
+def gerar_registros(n: int, semente=SEMENTE) -> list:
+    """n linhas de histórico, calculadas pelo motor em lote."""
+    entradas = gerar_entradas(n, semente)
+    rotas, veiculos, descontos = montar_tabelas_lote(entradas)
+    lote = calcular_rotas_lote(rotas, veiculos, descontos)
+    return [
+        montar_registro(e["mes_ref"], e["rota"], dados, data_registro="01/01/2026 12:00")
+        for e, dados in zip(entradas, resultados_lote_como_dicts(lote, descontos))
+    ]
+
+
+def gerar_resultado(semente=SEMENTE) -> dict:
+    """Um cálculo completo (todas as ROTAS), como o usado pelo PDF."""
+    entradas = gerar_entradas(len(ROTAS), semente)
+    resultados = {
+        e["rota"]: calcular_rota(
+            e["veiculos"], e["passagens"], e["alunos_integrais"],
+            e["descontos"], e["aux_recebido"], e["diarias"],
+        )
+        for e in entradas
+    }
+    return montar_resultado(entradas[0]["mes_ref"], resultados)
+
+# ============================================================
+# MEDIÇÃO
+# ============================================================
+def repeticoes_para(n: int) -> int:
+    """Mais repetições nos tamanhos pequenos, pelo menos 3 nos grandes."""
+    return int(min(30, max(3, 10**5 // max(n, 1))))
+
+
+def medir(operacao, preparar=None, itens=1, repeticoes=5) -> dict:
+    """
+    Executa operacao(preparar()) `repeticoes` vezes, mais uma de
+    aquecimento e uma sob tracemalloc. Só operacao é cronometrada.
+    """
+    preparar = preparar or (lambda: None)
+    operacao(preparar())  # aquecimento: imports, caches, JIT do SQLite
+
+    latencias = []
+    for _ in range(repeticoes):
+        arg = preparar()
+        inicio = time.perf_counter_ns()
+        operacao(arg)
+        latencias.append((time.perf_counter_ns() - inicio) / 1e6)
+
+    arg = preparar()
+    tracemalloc.start()
+    try:
+        operacao(arg)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    lat = np.array(latencias)
+    return {
+        "itens": itens,
+        "repeticoes": repeticoes,
+        "itens_por_s": itens / (lat.sum() / 1000 / repeticoes),
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p90_ms": float(np.percentile(lat, 90)),
+        "p99_ms": float(np.percentile(lat, 99)),
+        "max_ms": float(lat.max()),
+        "pico_mem_mb": pico / 2**20,
+    }
+
+# ============================================================
+# CASOS
+# ============================================================
+# Cada caso recebe o tamanho e devolve {nome: medição}. Um caso pode
+# gerar várias medições (por exemplo, uma por backend de histórico).
+def caso_calcular(n: int) -> dict:
+    entradas = gerar_entradas(n)
+    tabelas = montar_tabelas_lote(entradas)
+    reps = repeticoes_para(n)
+
+    def escalar(_):
+        for e in entradas:
+            calcular_rota(
+                e["veiculos"], e["passagens"], e["alunos_integrais"],
+                e["descontos"], e["aux_recebido"], e["diarias"],
+            )
+
+    return {
+        "calcular_rota": medir(escalar, itens=n, repeticoes=reps),
+        "calcular_rotas_lote": medir(lambda _: calcular_rotas_lote(*tabelas), itens=n, repeticoes=reps),
+        "calcular_rotas_centavos": medir(lambda _: calcular_rotas_centavos(*tabelas), itens=n, repeticoes=reps),
+    }
+
+
+def caso_distribuir(n: int) -> dict:
+    aux, diarias = gerar_diarias(n)
+    pares = list(zip(aux.tolist(), diarias[:, 0].tolist(), diarias[:, 1].tolist()))
+    aux_centavos = para_centavos(aux)
+    reps = repeticoes_para(n)
+
+    def escalar(_):
+        for a, d1, d2 in pares:
+            distribuir_auxilio_por_diarias(a, d1, d2)
+
+    return {
+        "distribuir_auxilio_por_diarias": medir(escalar, itens=n, repeticoes=reps),
+        "distribuir_auxilio_rotas": medir(lambda _: distribuir_auxilio_rotas(aux, diarias), itens=n, repeticoes=reps),
+        "distribuir_auxilio_centavos": medir(
+            lambda _: distribuir_auxilio_centavos(aux_centavos, diarias), itens=n, repeticoes=reps
+        ),
+    }
+
+
+def caso_metas(n: int) -> dict:
+    tabelas = montar_tabelas_lote(gerar_entradas(n))
+    reps = repeticoes_para(n)
+    return {
+        "metas_lote": medir(lambda _: metas_lote(*tabelas, 150.0), itens=n, repeticoes=reps),
+        "metas_lote/exato": medir(lambda _: metas_lote(*tabelas, 150.0, exato=True), itens=n, repeticoes=reps),
+    }
+
+
+def caso_historico(n: int) -> dict:
+    registros = gerar_registros(n)
+    novos = gerar_registros(len(ROTAS), semente=SEMENTE + 1)
+    reps = repeticoes_para(n)
+    medicoes = {}
+    with tempfile.TemporaryDirectory(prefix="asseuf-bench-") as raiz:
+        contador = iter(range(10**9))
+
+        def pasta_nova():
+            pasta = os.path.join(raiz, str(next(contador)))
+            os.makedirs(pasta)
+            return pasta
+
+        for tipo, criar in BACKENDS.items():
+            # Gravação de n linhas num histórico vazio.
+            medicoes[f"salvar_registros/{tipo}"] = medir(
+                lambda backend: backend.salvar_registros(registros),
+                preparar=lambda: criar(pasta_nova()),
+                itens=n,
+                repeticoes=reps,
+            )
+
+            # Histórico com n linhas: leitura completa e acréscimo de um
+            # cálculo (uma linha por rota), como faz a interface.
+            cheio = criar(pasta_nova())
+            cheio.salvar_registros(registros)
+            medicoes[f"carregar_historico/{tipo}"] = medir(
+                lambda _: cheio.carregar(), itens=n, repeticoes=reps
+            )
+            medicoes[f"salvar_calculo/{tipo}"] = medir(
+                lambda _: cheio.salvar_registros(novos),
+                itens=len(novos),
+                repeticoes=min(reps, 10),
+            )
+    return medicoes
+
+
+def caso_pdf(n: int) -> dict:
+    """
+    Relatório atual (template Jinja2, CSS e fontes reaproveitados) e, com o
+    sufixo /original, o relatório de antes (f-string com CSS embutido e QR
+    em PNG), copiado em benchmarks/pdf_original.py.
+    """
+    from benchmarks.pdf_original import gerar_pdf_original, html_original
+    from relatorio import gerar_pdf_profissional, html_relatorio
+
+    r = gerar_resultado()
+    medicoes = {
+        "html_relatorio": medir(lambda _: html_relatorio(r), repeticoes=200),
+        "html_relatorio/original": medir(lambda _: html_original(r), repeticoes=200),
+    }
+    try:
+        gerar_pdf_profissional(r)
+    except (ImportError, OSError) as e:
+        print(f"Aviso: PDF ignorado, WeasyPrint indisponível ({e}).", file=sys.stderr)
+        return medicoes
+
+    medicoes["gerar_pdf_profissional"] = medir(lambda _: gerar_pdf_profissional(r), repeticoes=10)
+    medicoes["gerar_pdf_profissional/original"] = medir(lambda _: gerar_pdf_original(r), repeticoes=10)
+    return medicoes
+
+
+CASOS = {
+    "calcular": caso_calcular,
+    "distribuir": caso_distribuir,
+    "metas": caso_metas,
+    "historico": caso_historico,
+    "pdf": caso_pdf,
+}
+# O PDF não depende do tamanho do histórico: roda uma vez, no menor
+# tamanho pedido.
+CASOS_SEM_TAMANHO = {"pdf"}
+
+# ============================================================
+# EXECUÇÃO, LINHA DE BASE E REGRESSÕES
+# ============================================================
+def ambiente() -> dict:
+    return {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "processador": platform.processor() or platform.machine(),
+        "nucleos": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def executar(casos=None, tamanhos=None, saida=sys.stdout) -> dict:
+    """Retorna {"ambiente": ..., "resultados": {"caso/n": medição}}."""
+    resultados = {}
+    for nome_caso in casos or CASOS:
+        lista = tamanhos or TAMANHOS_RAPIDO
+        if nome_caso in CASOS_SEM_TAMANHO:
+            lista = [min(lista)]
+        for n in lista:
+            for nome, medicao in CASOS[nome_caso](n).items():
+                chave = f"{nome}/{n}"
+                resultados[chave] = medicao
+                print(
+                    f"{chave:45s} {medicao['itens_por_s']:>14,.0f} itens/s"
+                    f"  p50 {medicao['p50_ms']:>10.3f} ms  p99 {medicao['p99_ms']:>10.3f} ms"
+                    f"  mem {medicao['pico_mem_mb']:>8.1f} MB",
+                    file=saida,
+                    flush=True,
+                )
+    return {"ambiente": ambiente(), "resultados": resultados}
+
+
+def comparar(atual: dict, base: dict, limite=LIMITE_PADRAO) -> list:
+    """
+    Compara as medianas dos casos presentes nas duas execuções.
+    Retorna [(caso, p50_base, p50_atual, variação)] dos casos que ficaram
+    mais lentos que (1 + limite) × a linha de base.
+    """
+    regressoes = []
+    for chave, med in atual["resultados"].items():
+        ref = base["resultados"].get(chave)
+        if ref is None:
+            continue
+        antes, agora = ref["p50_ms"], med["p50_ms"]
+        if agora > antes * (1 + limite) and agora - antes > RUIDO_MS:
+            regressoes.append((chave, antes, agora, agora / antes - 1))
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do cálculo, histórico e PDF.")
+    parser.add_argument("--casos", nargs="+", choices=list(CASOS), help="casos a executar (padrão: todos)")
+    parser.add_argument("--tamanhos", nargs="+", type=int, help="números de linhas (padrão: 10² a 10⁴)")
+    parser.add_argument("--completo", action="store_true", help="tamanhos de 10² a 10⁶")
+    parser.add_argument("--salvar", metavar="JSON", help="grava os resultados como linha de base")
+    parser.add_argument("--comparar", metavar="JSON", help="compara com uma linha de base")
+    parser.add_argument("--limite", type=float, default=LIMITE_PADRAO, help="piora tolerada (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    tamanhos = args.tamanhos or (TAMANHOS_COMPLETO if args.completo else TAMANHOS_RAPIDO)
+    atual = executar(args.casos, tamanhos)
+
+    if args.salvar:
+        os.makedirs(os.path.dirname(args.salvar) or ".", exist_ok=True)
+        with open(args.salvar, "w", encoding="utf-8") as f:
+            json.dump(atual, f, indent=2, ensure_ascii=False)
+        print(f"Linha de base gravada em {args.salvar}.")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        if base.get("ambiente") != atual["ambiente"]:
+            print("Aviso: a linha de base foi medida em outro ambiente.", file=sys.stderr)
+        regressoes = comparar(atual, base, args.limite)
+        for chave, antes, agora, variacao in regressoes:
+            print(f"REGRESSÃO {chave}: p50 {antes:.3f} ms -> {agora:.3f} ms (+{variacao:.0%})")
+        if regressoes:
+            raise SystemExit(f"{len(regressoes)} caso(s) acima do limite de {args.limite:.0%}.")
+        print(f"Nenhuma regressão acima de {args.limite:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
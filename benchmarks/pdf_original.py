@@ -0,0 +1,248 @@
+"""
+O relatório PDF como era antes do template Jinja2: cópia literal de
+gerar_pdf_profissional e gerar_qr_base64 do app.py original, separada em
+HTML e PDF. Serve só de linha de base para o caso "pdf" de benchmark.py;
+o app não usa este módulo.
+"""
+import base64
+from datetime import datetime
+from io import BytesIO
+
+
+def gerar_qr_base64(texto: str) -> str:
+    import qrcode
+
+    qr = qrcode.QRCode(box_size=4, border=1)
+    qr.add_data(texto)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode("utf-8")
+
+
+def html_original(r: dict) -> str:
+    resumo_qr = (
+        f"ASSEUF - {r.get('mes_ref', 'Mês não informado')} | "
+        f"Sete Lagoas: R$ {r['sete']['valor_final']:,.2f} | "
+        f"Curvelo: R$ {r['cur']['valor_final']:,.2f}"
+    )
+    qr_b64 = gerar_qr_base64(resumo_qr)
+
+    def fmt_brl(val):
+        try:
+            return f"R$ {float(val):,.2f}"
+        except Exception:
+            return "R$ 0,00"
+
+    s = r["sete"]
+    c = r["cur"]
+
+    total_bruto = s["bruto"] + c["bruto"]
+    total_pass = s["passagens"] + c["passagens"]
+    total_10 = s["dez_porcento"] + c["dez_porcento"]
+    total_bruto_aj = s["bruto_aj_10"] + c["bruto_aj_10"]
+    total_aux = s["aux_recebido"] + c["aux_recebido"]
+    total_pos_aux = s["pos_aux"] + c["pos_aux"]
+    total_90 = s["noventa_porcento"] + c["noventa_porcento"]
+    total_final = s["valor_final"] + c["valor_final"]
+    total_alunos_int = s["alunos_integrais"] + c["alunos_integrais"]
+    total_alunos_desc = s["alunos_desconto_total"] + c["alunos_desconto_total"]
+    total_veic = s["veiculos_qtd"] + c["veiculos_qtd"]
+    total_diarias = s["diarias"] + c["diarias"]
+
+    html = f"""
+    <!DOCTYPE html>
+    <html lang="pt-BR">
+    <head>
+        <meta charset="UTF-8">
+        <title>Relatório ASSEUF - {r.get('mes_ref', '')}</title>
+        <style>
+            @page {{ size: A4; margin: 1.8cm; }}
+            body {{
+                font-family: Arial, sans-serif;
+                color: #2c3e50;
+                line-height: 1.5;
+            }}
+            .header {{
+                display: flex;
+                justify-content: space-between;
+                align-items: center;
+                border-bottom: 3px solid #00e676;
+                padding-bottom: 12px;
+                margin-bottom: 25px;
+            }}
+            .title h1 {{
+                color: #00695c;
+                font-size: 22px;
+                margin: 0;
+            }}
+            .qr img {{
+                width: 90px;
+                height: 90px;
+            }}
+            h2 {{
+                color: #004d40;
+                font-size: 17px;
+                margin-top: 25px;
+                margin-bottom: 10px;
+                border-left: 5px solid #00e676;
+                padding-left: 10px;
+            }}
+            table {{
+                width: 100%;
+                border-collapse: collapse;
+                margin-bottom: 20px;
+                font-size: 12px;
+            }}
+            th {{
+                background-color: #e0f2f1;
+                color: #004d40;
+                padding: 8px;
+                border: 1px solid #b0bec5;
+                text-align: center;
+                font-weight: bold;
+            }}
+            td {{
+                padding: 7px;
+                border: 1px solid #b0bec5;
+                text-align: right;
+            }}
+            td:first-child {{
+                text-align: left;
+                font-weight: 500;
+            }}
+            .totais {{
+                background-color: #f1f8e9;
+                border-left: 5px solid #00e676;
+                padding: 12px;
+                margin-top: 25px;
+            }}
+            .footer {{
+                margin-top: 40px;
+                text-align: center;
+                font-size: 10px;
+                color: #95a5a6;
+                border-top: 1px solid #ecf0f1;
+                padding-top: 15px;
+            }}
+        </style>
+    </head>
+    <body>
+
+        <div class="header">
+            <div class="title">
+                <h1>ASSEUF • Relatório Mensal</h1>
+                <span>Metodologia: 10% → auxílio → 90% → alunos integrais e com desconto</span>
+            </div>
+            <div class="qr">
+                <img src="data:image/png;base64,{qr_b64}">
+            </div>
+        </div>
+
+        <p><strong>Mês de referência:</strong> {r.get('mes_ref', 'Não informado')}</p>
+
+        <h2>Resumo financeiro por rota</h2>
+        <table>
+            <tr>
+                <th>Etapa</th>
+                <th>Sete Lagoas</th>
+                <th>Curvelo</th>
+                <th>Total</th>
+            </tr>
+            <tr>
+                <td>Custo bruto</td>
+                <td>{fmt_brl(s['bruto'])}</td>
+                <td>{fmt_brl(c['bruto'])}</td>
+                <td>{fmt_brl(total_bruto)}</td>
+            </tr>
+            <tr>
+                <td>Passagens arrecadadas</td>
+                <td>{fmt_brl(s['passagens'])}</td>
+                <td>{fmt_brl(c['passagens'])}</td>
+                <td>{fmt_brl(total_pass)}</td>
+            </tr>
+            <tr>
+                <td>(-) 10% das passagens</td>
+                <td>{fmt_brl(s['dez_porcento'])}</td>
+                <td>{fmt_brl(c['dez_porcento'])}</td>
+                <td>{fmt_brl(total_10)}</td>
+            </tr>
+            <tr>
+                <td>Custo após 10%</td>
+                <td>{fmt_brl(s['bruto_aj_10'])}</td>
+                <td>{fmt_brl(c['bruto_aj_10'])}</td>
+                <td>{fmt_brl(total_bruto_aj)}</td>
+            </tr>
+            <tr>
+                <td>(-) Auxílio recebido</td>
+                <td>{fmt_brl(s['aux_recebido'])}</td>
+                <td>{fmt_brl(c['aux_recebido'])}</td>
+                <td>{fmt_brl(total_aux)}</td>
+            </tr>
+            <tr>
+                <td>Valor após auxílio</td>
+                <td>{fmt_brl(s['pos_aux'])}</td>
+                <td>{fmt_brl(c['pos_aux'])}</td>
+                <td>{fmt_brl(total_pos_aux)}</td>
+            </tr>
+            <tr>
+                <td>(-) 90% das passagens</td>
+                <td>{fmt_brl(s['noventa_porcento'])}</td>
+                <td>{fmt_brl(c['noventa_porcento'])}</td>
+                <td>{fmt_brl(total_90)}</td>
+            </tr>
+            <tr>
+                <td><strong>Valor final</strong></td>
+                <td><strong>{fmt_brl(s['valor_final'])}</strong></td>
+                <td><strong>{fmt_brl(c['valor_final'])}</strong></td>
+                <td><strong>{fmt_brl(total_final)}</strong></td>
+            </tr>
+        </table>
+
+        <h2>Alunos e mensalidade</h2>
+        <table>
+            <tr>
+                <th>Rota</th>
+                <th>Alunos integrais</th>
+                <th>Alunos com desconto</th>
+                <th>Mensalidade média</th>
+            </tr>
+            <tr>
+                <td>Sete Lagoas</td>
+                <td style="text-align:center;">{s['alunos_integrais']}</td>
+                <td style="text-align:center;">{s['alunos_desconto_total']}</td>
+                <td>{fmt_brl(s['mensalidade_media'])}</td>
+            </tr>
+            <tr>
+                <td>Curvelo</td>
+                <td style="text-align:center;">{c['alunos_integrais']}</td>
+                <td style="text-align:center;">{c['alunos_desconto_total']}</td>
+                <td>{fmt_brl(c['mensalidade_media'])}</td>
+            </tr>
+        </table>
+
+        <div class="totais">
+            <h3>Resumo consolidado</h3>
+            <p><strong>Total de alunos integrais:</strong> {total_alunos_int}</p>
+            <p><strong>Total de alunos com desconto:</strong> {total_alunos_desc}</p>
+            <p><strong>Total de veículos:</strong> {total_veic}</p>
+            <p><strong>Total de diárias:</strong> {total_diarias}</p>
+            <p><strong>Valor final total:</strong> {fmt_brl(total_final)}</p>
+        </div>
+
+        <div class="footer">
+            Relatório gerado automaticamente pelo Sistema ASSEUF em {datetime.now().strftime('%d/%m/%Y %H:%M')}.
+        </div>
+
+    </body>
+    </html>
+    """
+
+    return html
+
+
+def gerar_pdf_original(r: dict) -> bytes:
+    from weasyprint import HTML
+
+    return HTML(string=html_original(r)).write_pdf()
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+# ============================================================
+# CACHE DE PDFs POR CONTEÚDO
+# ============================================================
+# A chave é o hash do dicionário de resultado normalizado mais a versão
+# do template. Há dois níveis: um LRU em memória (por processo) e um
+# diretório em disco, compartilhado entre sessões e reinícios, com
+# remoção dos arquivos menos usados quando passa do tamanho máximo.
+PDF_CACHE_DIR = os.environ.get("ASSEUF_PDF_CACHE_DIR", ".cache_pdf")
+PDF_CACHE_MAX_MB = float(os.environ.get("ASSEUF_PDF_CACHE_MAX_MB", "200"))
+PDF_CACHE_ITENS_MEMORIA = int(os.environ.get("ASSEUF_PDF_CACHE_ITENS", "32"))
+
+
+def _normalizar(valor):
+    if isinstance(valor, dict):
+        return {str(k): _normalizar(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_normalizar(v) for v in valor]
+    if hasattr(valor, "item"):  # escalares NumPy
+        return valor.item()
+    return valor
+
+
+def chave_relatorio(r: dict, versao_template: str) -> str:
+    conteudo = json.dumps(
+        {"template": versao_template, "resultado": _normalizar(r)},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+class CachePDF:
+    def __init__(
+        self,
+        diretorio=PDF_CACHE_DIR,
+        max_bytes_disco=int(PDF_CACHE_MAX_MB * 1024 * 1024),
+        max_itens_memoria=PDF_CACHE_ITENS_MEMORIA,
+    ):
+        self.diretorio = Path(diretorio)
+        self.max_bytes_disco = max_bytes_disco
+        self.max_itens_memoria = max_itens_memoria
+        self._memoria = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _arquivo(self, chave: str) -> Path:
+        return self.diretorio / f"{chave}.pdf"
+
+    def obter(self, chave: str):
+        with self._lock:
+            if chave in self._memoria:
+                self._memoria.move_to_end(chave)
+                return self._memoria[chave]
+        arquivo = self._arquivo(chave)
+        try:
+            dados = arquivo.read_bytes()
+        except OSError:
+            return None
+        try:
+            os.utime(arquivo)  # marca como usado recentemente
+        except OSError:
+            pass
+        self._guardar_memoria(chave, dados)
+        return dados
+
+    def guardar(self, chave: str, dados: bytes):
+        self._guardar_memoria(chave, dados)
+        try:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.diretorio, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(dados)
+            os.replace(tmp, self._arquivo(chave))
+            self._podar_disco()
+        except OSError:
+            # O disco é só uma otimização: sem ele o cache em memória segue valendo.
+            pass
+
+    def obter_ou_gerar(self, chave: str, gerar) -> bytes:
+        dados = self.obter(chave)
+        if dados is None:
+            dados = gerar()
+            self.guardar(chave, dados)
+        return dados
+
+    def _guardar_memoria(self, chave: str, dados: bytes):
+        with self._lock:
+            self._memoria[chave] = dados
+            self._memoria.move_to_end(chave)
+            while len(self._memoria) > self.max_itens_memoria:
+                self._memoria.popitem(last=False)
+
+    def _podar_disco(self):
+        arquivos = []
+        total = 0
+        for arquivo in self.diretorio.glob("*.pdf"):
+            try:
+                info = arquivo.stat()
+            except OSError:
+                continue
+            arquivos.append((info.st_mtime, info.st_size, arquivo))
+            total += info.st_size
+        arquivos.sort()
+        for _, tamanho, arquivo in arquivos:
+            if total <= self.max_bytes_disco:
+                break
+            try:
+                arquivo.unlink()
+                total -= tamanho
+            except OSError:
+                pass
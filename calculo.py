@@ -0,0 +1,527 @@
+import numpy as np
+import pandas as pd
+
+from metricas import medir
+
+# ============================================================
+# ROTAS ATENDIDAS
+# ============================================================
+# "chave" identifica a rota nos widgets, no resultado da sessão e no
+# relatório PDF.
+ROTAS = [
+    {"nome": "Sete Lagoas", "chave": "sete"},
+    {"nome": "Curvelo", "chave": "cur"},
+]
+
+# ============================================================
+# FUNÇÕES DE CÁLCULO
+# ============================================================
+def calcular_bruto(veiculos: dict) -> float:
+    return sum(v["valor"] * v["dias"] for v in veiculos.values())
+
+def calcular_peso_alunos(alunos_integrais: int, descontos: dict) -> float:
+    """
+    descontos: {percentual_desconto: quantidade}
+    Ex: {50: 3, 30: 2}
+    Internamente usamos peso, mas na interface só falamos
+    em 'alunos integrais' e 'alunos com desconto'.
+    """
+    peso = float(alunos_integrais)
+    for pct, qtd in descontos.items():
+        fator = (100 - pct) / 100.0
+        peso += qtd * fator
+    return peso
+
+def distribuir_auxilio_por_diarias(aux_total: float, d_sete: int, d_cur: int):
+    if aux_total <= 0:
+        return 0.0, 0.0
+    if d_sete == 0 and d_cur == 0:
+        return 0.0, 0.0
+    if d_sete == 0:
+        return 0.0, aux_total
+    if d_cur == 0:
+        return aux_total, 0.0
+
+    if d_sete == d_cur:
+        total = d_sete + d_cur
+        return aux_total * d_sete / total, aux_total * d_cur / total
+
+    if d_sete > d_cur:
+        excedente = d_sete - d_cur
+        base = d_cur
+        total_base = base * 2 + excedente
+        valor_diaria = aux_total / total_base
+        aux_sete = base * valor_diaria + excedente * (valor_diaria * 0.70)
+        aux_cur = base * valor_diaria + excedente * (valor_diaria * 0.30)
+        return aux_sete, aux_cur
+
+    excedente = d_cur - d_sete
+    base = d_sete
+    total_base = base * 2 + excedente
+    valor_diaria = aux_total / total_base
+    aux_sete = base * valor_diaria + excedente * (valor_diaria * 0.30)
+    aux_cur = base * valor_diaria + excedente * (valor_diaria * 0.70)
+    return aux_sete, aux_cur
+
+def calcular_rota(
+    veiculos: dict,
+    passagens: float,
+    alunos_integrais: int,
+    descontos: dict,
+    aux_recebido: float,
+    diarias_rota: int,
+):
+    bruto = calcular_bruto(veiculos)
+    dez_porcento = passagens * 0.10
+    bruto_aj_10 = bruto - dez_porcento
+    pos_aux = bruto_aj_10 - aux_recebido
+    noventa_porcento = passagens * 0.90
+    valor_final = pos_aux - noventa_porcento
+
+    peso_alunos = calcular_peso_alunos(alunos_integrais, descontos)
+    alunos_desconto_total = sum(descontos.values())
+    mensalidade_media = valor_final / peso_alunos if peso_alunos > 0 else 0.0
+
+    return {
+        "bruto": bruto,
+        "passagens": passagens,
+        "dez_porcento": dez_porcento,
+        "bruto_aj_10": bruto_aj_10,
+        "aux_recebido": aux_recebido,
+        "pos_aux": pos_aux,
+        "noventa_porcento": noventa_porcento,
+        "valor_final": valor_final,
+        "alunos_integrais": alunos_integrais,
+        "alunos_desconto_total": alunos_desconto_total,
+        "mensalidade_media": mensalidade_media,
+        "descontos": descontos,
+        "diarias": diarias_rota,
+        "veiculos_qtd": len(veiculos),
+    }
+
+def montar_resultado(mes_ref, resultados: dict, exato=False) -> dict:
+    """
+    Resultado de um cálculo completo, como guardado na sessão e usado no PDF.
+    resultados: {nome_da_rota: dados_de_calcular_rota}
+    exato: o cálculo foi feito em centavos (calcular_rotas_centavos).
+    """
+    resultado = {"mes_ref": mes_ref, "rotas": resultados}
+    if exato:
+        resultado["exato"] = True
+    for rota in ROTAS:
+        if rota["nome"] in resultados:
+            resultado[rota["chave"]] = resultados[rota["nome"]]
+    return resultado
+
+# ============================================================
+# CÁLCULO EM LOTE (VETORIZADO)
+# ============================================================
+# Mesmo cálculo de calcular_rota, mas sobre tabelas colunares:
+#   rotas:     uma linha por rota-mês (chave + passagens, alunos_integrais,
+#              aux_recebido, diarias)
+#   veiculos:  formato longo, uma linha por veículo (chave + valor, dias)
+#   descontos: formato longo, uma linha por faixa (chave + pct, qtd)
+# As somas por grupo usam np.add.at, que acumula na ordem das linhas,
+# exatamente como os laços do caminho escalar.
+CHAVE = ("mes_ref", "rota")
+
+CAMPOS_RESULTADO = [
+    "bruto",
+    "passagens",
+    "dez_porcento",
+    "bruto_aj_10",
+    "aux_recebido",
+    "pos_aux",
+    "noventa_porcento",
+    "valor_final",
+    "alunos_integrais",
+    "alunos_desconto_total",
+    "mensalidade_media",
+    "diarias",
+    "veiculos_qtd",
+]
+
+def _indices_grupo(rotas: pd.DataFrame, *tabelas: pd.DataFrame, chave=CHAVE) -> list:
+    """
+    Para cada tabela, a posição em `rotas` da rota-mês de cada linha.
+    Cada coluna da chave é fatorada uma única vez, sobre `rotas` e as
+    tabelas juntas, e as colunas viram um código inteiro por linha; o
+    casamento é uma busca binária nesses códigos (sem MultiIndex, que
+    dominava o tempo em lotes pequenos).
+    """
+    chave = list(chave)
+    com_linhas = [t for t in tabelas if not t.empty]
+    tamanhos = [len(rotas)] + [len(t) for t in com_linhas]
+    codigo = np.zeros(sum(tamanhos), dtype=np.int64)
+    for coluna in chave:
+        valores = pd.concat([rotas[coluna], *(t[coluna] for t in com_linhas)], ignore_index=True)
+        codigos, unicos = pd.factorize(valores, use_na_sentinel=False)
+        codigo = codigo * max(len(unicos), 1) + codigos
+    codigo_rotas, *codigos_tabelas = np.split(codigo, np.cumsum(tamanhos)[:-1])
+
+    ordem = np.argsort(codigo_rotas, kind="stable")
+    ordenado = codigo_rotas[ordem]
+    if (ordenado[1:] == ordenado[:-1]).any():
+        raise ValueError(f"A tabela de rotas tem chaves repetidas em {chave}.")
+
+    indices = iter(codigos_tabelas)
+    resultado = []
+    for tabela in tabelas:
+        if tabela.empty:
+            resultado.append(np.empty(0, dtype=np.intp))
+            continue
+        codigo_t = next(indices)
+        pos = np.searchsorted(ordenado, codigo_t)
+        encontrada = pos < len(ordenado)
+        encontrada[encontrada] = ordenado[pos[encontrada]] == codigo_t[encontrada]
+        orfa = ~encontrada
+        if orfa.any():
+            orfas = tabela.loc[orfa, chave].drop_duplicates().to_dict("records")
+            raise ValueError(f"Linhas sem rota correspondente: {orfas}")
+        resultado.append(ordem[pos].astype(np.intp))
+    return resultado
+
+def _somar_por_grupo(inicial: np.ndarray, idx: np.ndarray, valores: np.ndarray) -> np.ndarray:
+    total = inicial.copy()
+    if len(idx):
+        np.add.at(total, idx, valores)
+    return total
+
+def _tabela_resultado(rotas, chave, colunas: dict) -> pd.DataFrame:
+    # Um único construtor: assign() com 13 colunas custava mais que o cálculo.
+    return pd.DataFrame(
+        {**{c: rotas[c].array for c in chave}, **{campo: colunas[campo] for campo in CAMPOS_RESULTADO}}
+    )
+
+def _custo_veiculos(veiculos) -> np.ndarray:
+    return veiculos["valor"].to_numpy(dtype=float) * veiculos["dias"].to_numpy(dtype=float)
+
+def _peso_faixas(descontos) -> np.ndarray:
+    fator = (100 - descontos["pct"].to_numpy(dtype=float)) / 100.0
+    return descontos["qtd"].to_numpy(dtype=float) * fator
+
+def calcular_bruto_lote(rotas, veiculos, chave=CHAVE) -> np.ndarray:
+    idx, = _indices_grupo(rotas, veiculos, chave=chave)
+    return _somar_por_grupo(np.zeros(len(rotas)), idx, _custo_veiculos(veiculos))
+
+def calcular_peso_alunos_lote(rotas, descontos, chave=CHAVE) -> np.ndarray:
+    idx, = _indices_grupo(rotas, descontos, chave=chave)
+    integrais = rotas["alunos_integrais"].to_numpy(dtype=float)
+    return _somar_por_grupo(integrais, idx, _peso_faixas(descontos))
+
+@medir("calculo")
+def calcular_rotas_lote(
+    rotas: pd.DataFrame,
+    veiculos: pd.DataFrame,
+    descontos: pd.DataFrame,
+    chave=CHAVE,
+) -> pd.DataFrame:
+    """
+    Retorna um DataFrame com as colunas da chave e os campos de
+    CAMPOS_RESULTADO, uma linha por rota-mês, na ordem de `rotas`.
+    """
+    n = len(rotas)
+    idx_veic, idx_desc = _indices_grupo(rotas, veiculos, descontos, chave=chave)
+
+    alunos_integrais = rotas["alunos_integrais"].to_numpy(dtype=np.int64)
+    bruto = _somar_por_grupo(np.zeros(n), idx_veic, _custo_veiculos(veiculos))
+    peso_alunos = _somar_por_grupo(
+        alunos_integrais.astype(float), idx_desc, _peso_faixas(descontos)
+    )
+    alunos_desconto_total = _somar_por_grupo(
+        np.zeros(n, dtype=np.int64), idx_desc, descontos["qtd"].to_numpy(dtype=np.int64)
+    )
+    veiculos_qtd = np.bincount(idx_veic, minlength=n).astype(np.int64)
+
+    passagens = rotas["passagens"].to_numpy(dtype=float)
+    aux_recebido = rotas["aux_recebido"].to_numpy(dtype=float)
+    dez_porcento = passagens * 0.10
+    bruto_aj_10 = bruto - dez_porcento
+    pos_aux = bruto_aj_10 - aux_recebido
+    noventa_porcento = passagens * 0.90
+    valor_final = pos_aux - noventa_porcento
+
+    mensalidade_media = np.zeros(n)
+    np.divide(valor_final, peso_alunos, out=mensalidade_media, where=peso_alunos > 0)
+
+    colunas = {
+        "bruto": bruto,
+        "passagens": passagens,
+        "dez_porcento": dez_porcento,
+        "bruto_aj_10": bruto_aj_10,
+        "aux_recebido": aux_recebido,
+        "pos_aux": pos_aux,
+        "noventa_porcento": noventa_porcento,
+        "valor_final": valor_final,
+        "alunos_integrais": alunos_integrais,
+        "alunos_desconto_total": alunos_desconto_total,
+        "mensalidade_media": mensalidade_media,
+        "diarias": rotas["diarias"].to_numpy(dtype=np.int64),
+        "veiculos_qtd": veiculos_qtd,
+    }
+    return _tabela_resultado(rotas, chave, colunas)
+
+def resultados_lote_como_dicts(resultado: pd.DataFrame, descontos: pd.DataFrame, chave=CHAVE) -> list:
+    """
+    Converte a saída de calcular_rotas_lote para o formato de calcular_rota
+    (um dict por linha, com tipos Python e o dicionário de descontos).
+    """
+    chave = list(chave)
+    faixas = {}
+    for linha in descontos.to_dict("records"):
+        k = tuple(linha[c] for c in chave)
+        grupo = faixas.setdefault(k, {})
+        grupo[linha["pct"]] = grupo.get(linha["pct"], 0) + linha["qtd"]
+    dicts = []
+    for linha in resultado.to_dict("records"):
+        res = {campo: linha[campo] for campo in CAMPOS_RESULTADO}
+        res["descontos"] = faixas.get(tuple(linha[c] for c in chave), {})
+        dicts.append(res)
+    return dicts
+
+def montar_tabelas_lote(entradas: list):
+    """
+    Converte entradas no formato do caminho escalar em tabelas do lote.
+    entradas: lista de dicts com mes_ref, rota, veiculos, passagens,
+    alunos_integrais, descontos, aux_recebido e diarias.
+    """
+    rotas, veiculos, descontos = [], [], []
+    for e in entradas:
+        k = {"mes_ref": e["mes_ref"], "rota": e["rota"]}
+        rotas.append({
+            **k,
+            "passagens": e["passagens"],
+            "alunos_integrais": e["alunos_integrais"],
+            "aux_recebido": e["aux_recebido"],
+            "diarias": e["diarias"],
+        })
+        for v in e["veiculos"].values():
+            veiculos.append({**k, "valor": v["valor"], "dias": v["dias"]})
+        for pct, qtd in e["descontos"].items():
+            descontos.append({**k, "pct": pct, "qtd": qtd})
+    return (
+        pd.DataFrame(rotas, columns=[*CHAVE, "passagens", "alunos_integrais", "aux_recebido", "diarias"]),
+        pd.DataFrame(veiculos, columns=[*CHAVE, "valor", "dias"]),
+        pd.DataFrame(descontos, columns=[*CHAVE, "pct", "qtd"]),
+    )
+
+
+def consolidar_descontos(descontos: pd.DataFrame, chave=CHAVE) -> pd.DataFrame:
+    """
+    Regra do formulário: faixas sem percentual ou sem alunos são
+    ignoradas e faixas com o mesmo percentual são somadas.
+    """
+    descontos = descontos[(descontos["pct"] > 0) & (descontos["qtd"] > 0)]
+    return descontos.groupby([*chave, "pct"], sort=False, as_index=False)["qtd"].sum()
+
+# ============================================================
+# DISTRIBUIÇÃO DO AUXÍLIO ENTRE N ROTAS (VETORIZADA)
+# ============================================================
+# Generalização da regra 70/30 de distribuir_auxilio_por_diarias:
+#   - o valor da diária é aux_total / soma das diárias;
+#   - a base é a menor quantidade de diárias entre as rotas que rodaram,
+#     paga integralmente a todas elas;
+#   - cada rota fica com 70% do valor do próprio excedente sobre a base,
+#     e os 30% restantes de cada excedente são divididos igualmente
+#     entre as demais rotas que rodaram.
+# Rotas sem diárias não recebem auxílio. Com duas rotas o resultado é
+# idêntico, bit a bit, ao de distribuir_auxilio_por_diarias.
+PESO_EXCEDENTE_PROPRIO = 0.70
+PESO_EXCEDENTE_OUTRAS = 0.30
+
+def distribuir_auxilio_rotas(aux_total, diarias) -> np.ndarray:
+    """
+    aux_total: escalar ou array (meses,)
+    diarias:   array (rotas,) ou (meses, rotas)
+    Retorna o auxílio de cada rota com o mesmo formato de `diarias`.
+    """
+    d = np.asarray(diarias, dtype=np.int64)
+    unidimensional = d.ndim == 1
+    d = np.atleast_2d(d)
+    aux = np.broadcast_to(np.asarray(aux_total, dtype=float).reshape(-1, 1), (d.shape[0], 1))
+
+    ativa = d > 0
+    n_ativas = ativa.sum(axis=1, keepdims=True)
+    total = d.sum(axis=1, keepdims=True)
+    total_seguro = np.where(total > 0, total, 1)
+    base = np.where(ativa, d, np.iinfo(np.int64).max).min(axis=1, keepdims=True)
+    base = np.where(n_ativas > 0, base, 0)
+
+    valor_diaria = aux / total_seguro
+    excedente = np.where(ativa, d - base, 0)
+    exc_outras = excedente.sum(axis=1, keepdims=True) - excedente
+    divisor_outras = np.maximum(n_ativas - 1, 1)
+
+    com_excedente = (
+        base * valor_diaria
+        + excedente * (valor_diaria * PESO_EXCEDENTE_PROPRIO)
+        + (exc_outras / divisor_outras) * (valor_diaria * PESO_EXCEDENTE_OUTRAS)
+    )
+    iguais = aux * d / total_seguro
+
+    sem_excedente = (excedente == 0).all(axis=1, keepdims=True)
+    resultado = np.where(sem_excedente, iguais, com_excedente)
+    resultado = np.where(n_ativas == 1, aux, resultado)
+    resultado = np.where(ativa & (aux > 0), resultado, 0.0)
+
+    return resultado[0] if unidimensional else resultado
+
+# ============================================================
+# CÁLCULO EXATO EM CENTAVOS
+# ============================================================
+# Modo alternativo ao cálculo em float: todo valor em R$ vira int64 em
+# centavos e as contas são feitas em inteiros, vetorizadas. Regras:
+#   - R$ -> centavos: centavo mais próximo, meio centavo para longe de zero
+#     (mesma regra em toda divisão arredondada abaixo).
+#   - 10% das passagens é arredondado; os 90% são o restante, de modo que
+#     as duas parcelas somam exatamente as passagens.
+#   - Auxílio: a regra 70/30 vira pesos inteiros por rota,
+#         10·(n-1)·base + 7·(n-1)·excedente + 3·(excedente das outras),
+#     proporcionais às cotas do cálculo em float. O auxílio total é
+#     rateado por esses pesos pelo método do maior resto: cada rota recebe
+#     o piso da sua cota e os centavos que sobram vão, um a um, às rotas de
+#     maior resto (no empate, à que vem primeiro). A soma das rotas é
+#     sempre o auxílio total.
+#   - Bruto, bruto ajustado, pós-auxílio e valor final são somas e
+#     diferenças de inteiros, sem arredondamento.
+#   - Mensalidade média = valor final / peso dos alunos, arredondada ao
+#     centavo. É uma média por aluno e não compõe nenhum total.
+# O modo padrão (CENTAVOS_PADRAO) é o mesmo no app, na importação e na API.
+CENTAVOS_PADRAO = False
+
+CAMPOS_MONETARIOS = [
+    "bruto",
+    "passagens",
+    "dez_porcento",
+    "bruto_aj_10",
+    "aux_recebido",
+    "pos_aux",
+    "noventa_porcento",
+    "valor_final",
+    "mensalidade_media",
+]
+
+def para_centavos(valores) -> np.ndarray:
+    reais = np.asarray(valores, dtype=float)
+    # O round(…, 6) desfaz o erro de representação (0.285 * 100 = 28.4999…).
+    absoluto = np.floor(np.round(np.abs(reais) * 100, 6) + 0.5)
+    return (np.sign(reais) * absoluto).astype(np.int64)
+
+def para_reais(centavos) -> np.ndarray:
+    return np.asarray(centavos, dtype=np.int64) / 100
+
+def dividir_arredondado(numerador, denominador) -> np.ndarray:
+    """numerador / denominador (> 0) em inteiros, meio para longe de zero."""
+    num = np.asarray(numerador, dtype=np.int64)
+    den = np.asarray(denominador, dtype=np.int64)
+    return np.sign(num) * ((2 * np.abs(num) + den) // (2 * den))
+
+def ratear(total, pesos) -> np.ndarray:
+    """
+    Divide total (centavos >= 0, escalar ou (m,)) proporcionalmente a
+    pesos inteiros (n,) ou (m, n) pelo método do maior resto.
+    Linhas com soma de pesos zero recebem zero.
+    """
+    p = np.asarray(pesos, dtype=np.int64)
+    unidimensional = p.ndim == 1
+    p = np.atleast_2d(p)
+    t = np.broadcast_to(np.asarray(total, dtype=np.int64).reshape(-1, 1), (p.shape[0], 1))
+
+    soma = p.sum(axis=1, keepdims=True)
+    soma_segura = np.where(soma > 0, soma, 1)
+    piso, resto = np.divmod(t * p, soma_segura)
+    faltam = t - piso.sum(axis=1, keepdims=True)
+
+    # Posição de cada rota na ordem decrescente de resto (estável = a
+    # primeira rota ganha o empate); as `faltam` primeiras levam +1.
+    ordem = np.argsort(-resto, axis=1, kind="stable")
+    posicao = np.empty_like(ordem)
+    np.put_along_axis(posicao, ordem, np.arange(p.shape[1])[None, :].repeat(p.shape[0], axis=0), axis=1)
+    resultado = np.where(soma > 0, piso + (posicao < faltam), 0)
+
+    return resultado[0] if unidimensional else resultado
+
+def pesos_auxilio(diarias) -> np.ndarray:
+    """Pesos inteiros da regra 70/30 (ver distribuir_auxilio_rotas)."""
+    d = np.atleast_2d(np.asarray(diarias, dtype=np.int64))
+    ativa = d > 0
+    n_ativas = ativa.sum(axis=1, keepdims=True)
+    base = np.where(ativa, d, np.iinfo(np.int64).max).min(axis=1, keepdims=True)
+    base = np.where(n_ativas > 0, base, 0)
+    excedente = np.where(ativa, d - base, 0)
+    exc_outras = excedente.sum(axis=1, keepdims=True) - excedente
+
+    proprio = round(PESO_EXCEDENTE_PROPRIO * 10)
+    outras = round(PESO_EXCEDENTE_OUTRAS * 10)
+    pesos = 10 * (n_ativas - 1) * base + proprio * (n_ativas - 1) * excedente + outras * exc_outras
+    pesos = np.where(n_ativas == 1, 1, pesos)
+    return np.where(ativa, pesos, 0)
+
+def distribuir_auxilio_centavos(aux_total, diarias) -> np.ndarray:
+    """
+    Como distribuir_auxilio_rotas, mas com aux_total em centavos (int) e
+    resultado em centavos cuja soma por mês é exatamente aux_total.
+    """
+    d = np.asarray(diarias, dtype=np.int64)
+    aux = np.maximum(np.asarray(aux_total, dtype=np.int64), 0)
+    resultado = ratear(aux, pesos_auxilio(d))
+    return resultado[0] if d.ndim == 1 else resultado
+
+@medir("calculo")
+def calcular_rotas_centavos(
+    rotas: pd.DataFrame,
+    veiculos: pd.DataFrame,
+    descontos: pd.DataFrame,
+    chave=CHAVE,
+) -> pd.DataFrame:
+    """
+    Mesmas tabelas de calcular_rotas_lote (valores em R$); devolve os
+    campos de CAMPOS_MONETARIOS em centavos (int64). aux_recebido deve vir
+    de distribuir_auxilio_centavos para que a soma feche com o total.
+    """
+    n = len(rotas)
+    idx_veic, idx_desc = _indices_grupo(rotas, veiculos, descontos, chave=chave)
+
+    custo = para_centavos(veiculos["valor"]) * veiculos["dias"].to_numpy(dtype=np.int64)
+    bruto = _somar_por_grupo(np.zeros(n, dtype=np.int64), idx_veic, custo)
+
+    alunos_integrais = rotas["alunos_integrais"].to_numpy(dtype=np.int64)
+    qtd = descontos["qtd"].to_numpy(dtype=np.int64)
+    # Peso dos alunos em centésimos: 100 por integral, (100 - pct) por desconto.
+    peso_100 = _somar_por_grupo(
+        100 * alunos_integrais, idx_desc, qtd * (100 - descontos["pct"].to_numpy(dtype=np.int64))
+    )
+    alunos_desconto_total = _somar_por_grupo(np.zeros(n, dtype=np.int64), idx_desc, qtd)
+    veiculos_qtd = np.bincount(idx_veic, minlength=n).astype(np.int64)
+
+    passagens = para_centavos(rotas["passagens"])
+    aux_recebido = para_centavos(rotas["aux_recebido"])
+    dez_porcento = dividir_arredondado(passagens * 10, 100)
+    noventa_porcento = passagens - dez_porcento
+    bruto_aj_10 = bruto - dez_porcento
+    pos_aux = bruto_aj_10 - aux_recebido
+    valor_final = pos_aux - noventa_porcento
+    mensalidade_media = np.where(
+        peso_100 > 0, dividir_arredondado(valor_final * 100, np.maximum(peso_100, 1)), 0
+    )
+
+    colunas = {
+        "bruto": bruto,
+        "passagens": passagens,
+        "dez_porcento": dez_porcento,
+        "bruto_aj_10": bruto_aj_10,
+        "aux_recebido": aux_recebido,
+        "pos_aux": pos_aux,
+        "noventa_porcento": noventa_porcento,
+        "valor_final": valor_final,
+        "alunos_integrais": alunos_integrais,
+        "alunos_desconto_total": alunos_desconto_total,
+        "mensalidade_media": mensalidade_media,
+        "diarias": rotas["diarias"].to_numpy(dtype=np.int64),
+        "veiculos_qtd": veiculos_qtd,
+    }
+    return _tabela_resultado(rotas, chave, colunas)
+
+def centavos_para_reais(resultado: pd.DataFrame) -> pd.DataFrame:
+    """Converte os campos monetários de calcular_rotas_centavos para R$ (float)."""
+    return resultado.assign(**{c: para_reais(resultado[c]) for c in CAMPOS_MONETARIOS})
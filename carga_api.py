@@ -0,0 +1,157 @@
+"""
+Teste de carga da API local (api.py).
+
+    python carga_api.py --iniciar                         # sobe a API numa porta livre
+    python carga_api.py --url http://127.0.0.1:8600 --endpoint calcular --linhas 100
+    python carga_api.py --iniciar --endpoint distribuir --conexoes 16 --duracao 20
+
+Cada conexão é uma thread com uma conexão HTTP persistente que repete a
+mesma requisição até o fim do tempo. Os corpos são gerados uma vez, com
+os dados sintéticos de semente fixa do benchmark. Ao final são
+mostrados requisições por segundo, linhas (rotas-mês) por segundo e os
+percentis de latência.
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from benchmark import gerar_diarias, gerar_entradas
+
+
+def corpo_calcular(linhas: int) -> dict:
+    entradas = gerar_entradas(linhas)
+    for e in entradas:
+        e["veiculos"] = list(e["veiculos"].values())
+    return {"entradas": entradas}
+
+
+def corpo_distribuir(linhas: int) -> dict:
+    aux, diarias = gerar_diarias(linhas)
+    return {"aux_total": aux.tolist(), "diarias": diarias.tolist()}
+
+
+# endpoint: (método, caminho, corpo(linhas) ou None)
+REQUISICOES = {
+    "saude": ("GET", "/saude", None),
+    "calcular": ("POST", "/calcular", corpo_calcular),
+    "distribuir": ("POST", "/distribuir", corpo_distribuir),
+    "historico": ("GET", "/historico?limite=50", None),
+}
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def iniciar_api(porta: int) -> subprocess.Popen:
+    api = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api.py")
+    processo = subprocess.Popen([sys.executable, api, "--porta", str(porta)])
+    limite = time.monotonic() + 30
+    while time.monotonic() < limite:
+        try:
+            conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=1)
+            conexao.request("GET", "/saude")
+            if conexao.getresponse().status == 200:
+                return processo
+        except OSError:
+            time.sleep(0.2)
+    processo.terminate()
+    raise SystemExit("A API não respondeu em 30 s.")
+
+
+def executar_carga(host, porta, metodo, caminho, corpo: bytes, conexoes: int, duracao: float) -> dict:
+    latencias = [[] for _ in range(conexoes)]
+    erros = [0] * conexoes
+    fim = time.perf_counter() + duracao
+    cabecalhos = {"Content-Type": "application/json"} if corpo else {}
+
+    def trabalhador(i):
+        conexao = http.client.HTTPConnection(host, porta, timeout=60)
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            try:
+                conexao.request(metodo, caminho, body=corpo, headers=cabecalhos)
+                resposta = conexao.getresponse()
+                resposta.read()
+                ok = resposta.status < 400
+            except (OSError, http.client.HTTPException):
+                conexao.close()
+                conexao = http.client.HTTPConnection(host, porta, timeout=60)
+                ok = False
+            if ok:
+                latencias[i].append(time.perf_counter() - inicio)
+            else:
+                erros[i] += 1
+        conexao.close()
+
+    inicio = time.perf_counter()
+    threads = [threading.Thread(target=trabalhador, args=(i,)) for i in range(conexoes)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    decorrido = time.perf_counter() - inicio
+
+    tempos = np.concatenate([np.asarray(l) for l in latencias]) * 1000
+    p50, p90, p99 = np.percentile(tempos, [50, 90, 99]) if len(tempos) else (np.nan,) * 3
+    return {
+        "requisicoes": len(tempos),
+        "erros": sum(erros),
+        "req_por_s": len(tempos) / decorrido,
+        "p50_ms": p50,
+        "p90_ms": p90,
+        "p99_ms": p99,
+        "max_ms": tempos.max() if len(tempos) else np.nan,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga da API local.")
+    parser.add_argument("--url", default="http://127.0.0.1:8600")
+    parser.add_argument("--iniciar", action="store_true", help="sobe a API numa porta livre durante o teste")
+    parser.add_argument("--endpoint", choices=list(REQUISICOES), default="calcular")
+    parser.add_argument("--linhas", type=int, default=100, help="rotas-mês por requisição")
+    parser.add_argument("--conexoes", type=int, default=8)
+    parser.add_argument("--duracao", type=float, default=10.0, help="segundos")
+    args = parser.parse_args(argv)
+
+    metodo, caminho, gerar_corpo = REQUISICOES[args.endpoint]
+    corpo = json.dumps(gerar_corpo(args.linhas)).encode("utf-8") if gerar_corpo else None
+
+    processo = None
+    if args.iniciar:
+        host, porta = "127.0.0.1", _porta_livre()
+        processo = iniciar_api(porta)
+    else:
+        url = urlsplit(args.url)
+        host, porta = url.hostname, url.port or 80
+    try:
+        r = executar_carga(host, porta, metodo, caminho, corpo, args.conexoes, args.duracao)
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+
+    linhas = args.linhas if gerar_corpo else 0
+    print(f"{metodo} {caminho}  {args.conexoes} conexões, {args.duracao:.0f} s, corpo {len(corpo or b'') / 1024:,.1f} KB")
+    print(f"  requisições   {r['requisicoes']:>12,}  (erros: {r['erros']})")
+    print(f"  req/s         {r['req_por_s']:>12,.1f}")
+    if linhas:
+        print(f"  linhas/s      {r['req_por_s'] * linhas:>12,.0f}")
+    print(f"  latência (ms) p50 {r['p50_ms']:.2f}  p90 {r['p90_ms']:.2f}  p99 {r['p99_ms']:.2f}  max {r['max_ms']:.2f}")
+    return 1 if r["erros"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
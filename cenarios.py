@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+from calculo import (
+    calcular_peso_alunos,
+    distribuir_auxilio_centavos,
+    distribuir_auxilio_rotas,
+    dividir_arredondado,
+    para_centavos,
+    para_reais,
+)
+
+# ============================================================
+# SIMULAÇÃO DE CENÁRIOS ("E SE?")
+# ============================================================
+# Avalia distribuir_auxilio_rotas -> calcular_rota sobre uma grade de
+# valores de auxílio total, passagens e diárias, num único passe
+# vetorizado. Os custos (veículos) e os alunos de cada rota ficam fixos
+# nos valores da base, normalmente o último cálculo feito. Com
+# base["exato"] (último cálculo feito em centavos), a grade usa as mesmas
+# regras de calcular_rotas_centavos, e cada ponto bate com o Cadastro.
+#
+# base = {
+#     "aux_total": 10000.0,
+#     "exato": False,
+#     "rotas": {nome: {"bruto", "passagens", "peso_alunos", "diarias"}},
+# }
+# eixos = {"aux_total": [...], "passagens (Curvelo)": [...], "diarias (Sete Lagoas)": [...]}
+
+
+def nome_eixo(campo, rota=None) -> str:
+    return campo if rota is None else f"{campo} ({rota})"
+
+
+def base_do_resultado(r: dict) -> dict:
+    """Monta a base dos cenários a partir do resultado guardado na sessão."""
+    rotas = {
+        nome: {
+            "bruto": res["bruto"],
+            "passagens": res["passagens"],
+            "peso_alunos": calcular_peso_alunos(res["alunos_integrais"], res.get("descontos", {})),
+            "diarias": res["diarias"],
+        }
+        for nome, res in r["rotas"].items()
+    }
+    return {
+        "aux_total": sum(res["aux_recebido"] for res in r["rotas"].values()),
+        "exato": bool(r.get("exato", False)),
+        "rotas": rotas,
+    }
+
+
+def grade(eixos: dict) -> dict:
+    """Produto cartesiano dos eixos, achatado: {nome: array (pontos,)}."""
+    nomes = list(eixos)
+    malhas = np.meshgrid(*[np.asarray(eixos[n]) for n in nomes], indexing="ij")
+    return {n: m.ravel() for n, m in zip(nomes, malhas)}
+
+
+def _mensalidade_float(aux_total, passagens, diarias, bruto, peso):
+    aux_rotas = distribuir_auxilio_rotas(aux_total, diarias)
+
+    # Mesma sequência de operações de calcular_rota.
+    dez_porcento = passagens * 0.10
+    bruto_aj_10 = bruto - dez_porcento
+    pos_aux = bruto_aj_10 - aux_rotas
+    noventa_porcento = passagens * 0.90
+    valor_final = pos_aux - noventa_porcento
+    mensalidade = np.zeros_like(valor_final)
+    peso_b = np.broadcast_to(peso, valor_final.shape)
+    np.divide(valor_final, peso_b, out=mensalidade, where=peso_b > 0)
+    return aux_rotas, mensalidade
+
+
+def _mensalidade_centavos(aux_total, passagens, diarias, bruto, peso):
+    # Mesmas regras de calcular_rotas_centavos, em R$ na saída.
+    aux_rotas = distribuir_auxilio_centavos(para_centavos(aux_total), diarias)
+    passagens = para_centavos(passagens)
+    dez_porcento = dividir_arredondado(passagens * 10, 100)
+    noventa_porcento = passagens - dez_porcento
+    valor_final = para_centavos(bruto) - dez_porcento - aux_rotas - noventa_porcento
+    peso_100 = np.broadcast_to(np.rint(peso * 100).astype(np.int64), valor_final.shape)
+    mensalidade = np.where(
+        peso_100 > 0, dividir_arredondado(valor_final * 100, np.maximum(peso_100, 1)), 0
+    )
+    return para_reais(aux_rotas), para_reais(mensalidade)
+
+
+def avaliar_pontos(base: dict, pontos: dict) -> pd.DataFrame:
+    """
+    pontos: {nome_do_eixo: array (P,)}; eixos ausentes ficam no valor da base.
+    Retorna uma linha por ponto com os eixos, o auxílio e a mensalidade
+    média de cada rota.
+    """
+    nomes = list(base["rotas"])
+    n = len(next(iter(pontos.values()))) if pontos else 1
+
+    def coluna(campo, rota=None):
+        nome = nome_eixo(campo, rota)
+        if nome in pontos:
+            return np.asarray(pontos[nome])
+        valor = base[campo] if rota is None else base["rotas"][rota][campo]
+        return np.full(n, valor)
+
+    aux_total = coluna("aux_total").astype(float)
+    passagens = np.column_stack([coluna("passagens", r).astype(float) for r in nomes])
+    diarias = np.column_stack([coluna("diarias", r).astype(np.int64) for r in nomes])
+    bruto = np.array([base["rotas"][r]["bruto"] for r in nomes], dtype=float)
+    peso = np.array([base["rotas"][r]["peso_alunos"] for r in nomes], dtype=float)
+
+    if base.get("exato"):
+        aux_rotas, mensalidade = _mensalidade_centavos(aux_total, passagens, diarias, bruto, peso)
+    else:
+        aux_rotas, mensalidade = _mensalidade_float(aux_total, passagens, diarias, bruto, peso)
+
+    df = pd.DataFrame({nome: np.asarray(valores) for nome, valores in pontos.items()})
+    for i, rota in enumerate(nomes):
+        df[nome_eixo("aux_recebido", rota)] = aux_rotas[:, i]
+        df[nome_eixo("mensalidade_media", rota)] = mensalidade[:, i]
+    return df
+
+
+def varrer_cenarios(base: dict, eixos: dict) -> pd.DataFrame:
+    return avaliar_pontos(base, grade(eixos))
+
+
+def sensibilidade(base: dict, variacao=0.10) -> pd.DataFrame:
+    """
+    Variação da mensalidade média de cada rota quando um parâmetro muda
+    isoladamente: +variacao (relativa) nos valores em R$ e +1 nas diárias.
+    """
+    nomes = list(base["rotas"])
+    parametros = [("aux_total", None)]
+    parametros += [("passagens", r) for r in nomes]
+    parametros += [("diarias", r) for r in nomes]
+
+    # Ponto 0 é a base; o ponto i+1 altera apenas o parâmetro i.
+    pontos = {}
+    rotulos = []
+    for i, (campo, rota) in enumerate(parametros):
+        atual = base[campo] if rota is None else base["rotas"][rota][campo]
+        novo = atual + 1 if campo == "diarias" else atual * (1 + variacao)
+        valores = np.full(len(parametros) + 1, atual, dtype=float)
+        valores[i + 1] = novo
+        pontos[nome_eixo(campo, rota)] = valores
+        sufixo = "+1 diária" if campo == "diarias" else f"+{variacao:.0%}"
+        rotulos.append(f"{nome_eixo(campo, rota)} {sufixo}")
+
+    df = avaliar_pontos(base, pontos)
+    tabela = pd.DataFrame(index=rotulos)
+    for rota in nomes:
+        mens = df[nome_eixo("mensalidade_media", rota)].to_numpy()
+        tabela[rota] = mens[1:] - mens[0]
+    tabela.index.name = "Parâmetro"
+    return tabela
@@ -0,0 +1,132 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from cache_pdf import chave_relatorio
+from metricas import executar_e_drenar, mesclar
+from relatorio import TEMPLATE_VERSAO, cache_relatorios, gerar_pdf_profissional
+
+# ============================================================
+# FILA DE GERAÇÃO DE PDF
+# ============================================================
+# O WeasyPrint roda num pool de processos limitado, fora da thread do
+# Streamlit. Cada relatório vira um job identificado pela mesma chave do
+# cache de PDFs, de modo que pedidos repetidos (a mesma sessão após um
+# rerun ou tesoureiros diferentes) aguardam o mesmo job. O estado é do
+# processo e, portanto, compartilhado entre todas as sessões. Cada job
+# devolve (pdf, medições), e as medições do worker entram nas métricas
+# deste processo.
+#
+# Se um worker morre (falta de memória, falha no pango), o pool inteiro
+# fica inutilizável; o próximo envio descarta o pool e cria outro. Jobs
+# com erro ficam visíveis por PDF_ERRO_TTL segundos (para a página e a
+# API mostrarem a falha) e depois são esquecidos.
+PDF_WORKERS = int(os.environ.get("ASSEUF_PDF_WORKERS", min(2, os.cpu_count() or 1)))
+PDF_ERRO_TTL = float(os.environ.get("ASSEUF_PDF_ERRO_TTL", 600))
+
+STATUS_NA_FILA = "na_fila"
+STATUS_GERANDO = "gerando"
+STATUS_PRONTO = "pronto"
+STATUS_ERRO = "erro"
+
+_executor = None
+_jobs = {}
+_falhas = {}  # chave -> instante (time.monotonic) em que o job falhou
+_lock = threading.Lock()
+
+
+def _obter_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # "spawn" evita herdar, via fork, as threads do servidor Streamlit.
+        _executor = ProcessPoolExecutor(
+            max_workers=PDF_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def _descartar_executor():
+    global _executor
+    antigo, _executor = _executor, None
+    if antigo is not None:
+        antigo.shutdown(wait=False)
+
+
+def _submeter(r: dict):
+    try:
+        return _obter_executor().submit(executar_e_drenar, gerar_pdf_profissional, r)
+    except BrokenProcessPool:
+        _descartar_executor()
+        return _obter_executor().submit(executar_e_drenar, gerar_pdf_profissional, r)
+
+
+def _esquecer_falhas_antigas():
+    limite = time.monotonic() - PDF_ERRO_TTL
+    for chave in [c for c, instante in _falhas.items() if instante < limite]:
+        del _falhas[chave]
+        _jobs.pop(chave, None)
+
+
+def _concluir(chave, future):
+    if future.cancelled() or future.exception() is not None:
+        # Mantém o job por PDF_ERRO_TTL para que status_pdf informe o erro.
+        with _lock:
+            if _jobs.get(chave) is future:
+                _falhas[chave] = time.monotonic()
+        return
+    pdf, medicoes = future.result()
+    mesclar(medicoes)
+    cache_relatorios.guardar(chave, pdf)
+    with _lock:
+        if _jobs.get(chave) is future:
+            del _jobs[chave]
+
+
+def enviar_pdf(r: dict) -> str:
+    """Agenda a geração do PDF (se ainda não existir) e devolve a chave do job."""
+    chave = chave_relatorio(r, TEMPLATE_VERSAO)
+    if cache_relatorios.obter(chave) is not None:
+        return chave
+    with _lock:
+        _esquecer_falhas_antigas()
+        job = _jobs.get(chave)
+        if job is not None and not (job.done() and (job.cancelled() or job.exception() is not None)):
+            return chave
+        job = _submeter(r)
+        _jobs[chave] = job
+        _falhas.pop(chave, None)
+    job.add_done_callback(lambda f: _concluir(chave, f))
+    return chave
+
+
+def status_pdf(chave: str):
+    """Retorna um dos STATUS_* ou None se a chave for desconhecida."""
+    with _lock:
+        job = _jobs.get(chave)
+    if job is None:
+        return STATUS_PRONTO if cache_relatorios.obter(chave) is not None else None
+    if not job.done():
+        return STATUS_GERANDO if job.running() else STATUS_NA_FILA
+    if job.cancelled() or job.exception() is not None:
+        return STATUS_ERRO
+    return STATUS_PRONTO
+
+
+def obter_pdf(chave: str):
+    with _lock:
+        job = _jobs.get(chave)
+    if job is not None and job.done() and not job.cancelled() and job.exception() is None:
+        return job.result()[0]
+    return cache_relatorios.obter(chave)
+
+
+def erro_pdf(chave: str):
+    with _lock:
+        job = _jobs.get(chave)
+    if job is None or not job.done() or job.cancelled():
+        return None
+    return job.exception()
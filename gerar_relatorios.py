@@ -0,0 +1,91 @@
+"""
+Gera, sem interface, os relatórios PDF de todo o histórico num arquivo zip.
+
+    python gerar_relatorios.py --saida relatorios.zip
+    python gerar_relatorios.py --mes Janeiro/2026 --mes Fevereiro/2026
+
+Para cada mês usa o registro mais recente de cada rota. Os PDFs são
+renderizados em paralelo (um processo por núcleo) e gravados no zip à
+medida que ficam prontos, com no máximo dois jobs por processo em memória.
+"""
+import argparse
+import multiprocessing
+import os
+import re
+import zipfile
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from calculo import montar_resultado
+from historico import criar_backend, dados_do_registro
+from relatorio import gerar_pdf_profissional
+
+
+def resultados_do_historico(historico, meses=None):
+    """Gera (mes_ref, resultado) para cada mês do histórico, em ordem de registro."""
+    if historico.empty:
+        return
+    if meses:
+        historico = historico[historico["mes_ref"].isin(meses)]
+    # A última linha de cada (mes_ref, rota) é o cálculo mais recente.
+    ultimos = historico.drop_duplicates(subset=["mes_ref", "rota"], keep="last")
+    # O relatório tem uma coluna por rota presente no mês, quantas forem.
+    for mes_ref, grupo in ultimos.groupby("mes_ref", sort=False):
+        resultados = {
+            linha["rota"]: dados_do_registro(linha)
+            for linha in grupo.to_dict("records")
+        }
+        yield mes_ref, montar_resultado(mes_ref, resultados)
+
+
+def nome_arquivo(mes_ref, usados: set) -> str:
+    base = re.sub(r"[^\w-]+", "-", str(mes_ref)).strip("-") or "sem-mes"
+    nome, n = f"relatorio_{base}.pdf", 1
+    while nome in usados:
+        n += 1
+        nome = f"relatorio_{base}_{n}.pdf"
+    usados.add(nome)
+    return nome
+
+
+def gerar_zip(resultados, caminho_zip, workers=None) -> int:
+    workers = workers or os.cpu_count() or 1
+    limite = workers * 2
+    usados = set()
+    total = 0
+    # Os PDFs já saem comprimidos; ZIP_STORED evita gastar CPU à toa.
+    with zipfile.ZipFile(caminho_zip, "w", zipfile.ZIP_STORED) as zf, ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        pendentes = {}
+
+        def gravar_prontos(modo):
+            nonlocal total
+            prontos, _ = wait(pendentes, return_when=modo)
+            for job in prontos:
+                zf.writestr(pendentes.pop(job), job.result())
+                total += 1
+
+        for mes_ref, r in resultados:
+            if len(pendentes) >= limite:
+                gravar_prontos(FIRST_COMPLETED)
+            pendentes[executor.submit(gerar_pdf_profissional, r)] = nome_arquivo(mes_ref, usados)
+        if pendentes:
+            gravar_prontos(ALL_COMPLETED)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera os relatórios PDF de todo o histórico.")
+    parser.add_argument("--saida", default="relatorios_asseuf.zip", help="arquivo zip de saída")
+    parser.add_argument("--mes", action="append", help="mês de referência (pode repetir)")
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: nº de núcleos)")
+    parser.add_argument("--backend", choices=["sqlite", "parquet", "csv"], default=None)
+    args = parser.parse_args(argv)
+
+    historico = criar_backend(args.backend).carregar()
+    total = gerar_zip(resultados_do_historico(historico, args.mes), args.saida, args.workers)
+    print(f"{total} relatório(s) gravado(s) em {args.saida}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# DADOS E SPECS DOS GRÁFICOS
+# ============================================================
+# O Altair embute a tabela inteira no spec Vega-Lite enviado ao navegador.
+# Aqui os dados são reduzidos no servidor antes de virar spec:
+#   - só as colunas usadas, com valores arredondados ao centavo;
+#   - séries longas reduzidas a MAX_PONTOS_SERIE pontos por rota pelo
+#     LTTB (Largest-Triangle-Three-Buckets), que preserva picos e vales;
+#   - mapas de calor com mais de MAX_CELULAS_MAPA células agregados em
+#     blocos (média), reduzindo a resolução da grade;
+#   - se o spec ainda passar de MAX_BYTES_SPEC, a redução é refeita com
+#     metade dos pontos.
+# Os specs prontos ficam num cache do processo, chaveado pela versão dos
+# dados (versão do histórico ou hash da tabela): reruns e outras sessões
+# reaproveitam o mesmo dict sem reconstruir o gráfico.
+MAX_PONTOS_SERIE = int(os.environ.get("ASSEUF_GRAFICO_MAX_PONTOS", 240))
+MAX_CELULAS_MAPA = int(os.environ.get("ASSEUF_GRAFICO_MAX_CELULAS", 2500))
+MAX_BYTES_SPEC = int(os.environ.get("ASSEUF_GRAFICO_MAX_KB", 512)) * 1024
+MAX_SPECS_CACHE = 64
+
+_lock = threading.Lock()
+_specs = OrderedDict()
+
+
+def lttb(y, n_pontos: int) -> np.ndarray:
+    """Índices dos pontos mantidos pelo LTTB (x = posição na série)."""
+    y = np.asarray(y, dtype=float)
+    m = len(y)
+    if n_pontos >= m or n_pontos < 3:
+        return np.arange(m)
+    x = np.arange(m, dtype=float)
+    # n_pontos - 2 baldes entre o primeiro e o último ponto.
+    bordas = np.linspace(1, m - 1, n_pontos - 1).astype(int)
+    escolhidos = [0]
+    a = 0
+    for i in range(n_pontos - 2):
+        ini, fim = bordas[i], bordas[i + 1]
+        if i + 2 < len(bordas):
+            prox_x = x[fim:bordas[i + 2]].mean()
+            prox_y = y[fim:bordas[i + 2]].mean()
+        else:
+            prox_x, prox_y = x[-1], y[-1]
+        area = np.abs(
+            (x[a] - prox_x) * (y[ini:fim] - y[a]) - (x[a] - x[ini:fim]) * (prox_y - y[a])
+        )
+        a = ini + int(np.argmax(area))
+        escolhidos.append(a)
+    escolhidos.append(m - 1)
+    return np.asarray(escolhidos)
+
+
+def reduzir_series(df: pd.DataFrame, serie: str, y: str, max_pontos: int) -> pd.DataFrame:
+    """Aplica o LTTB em cada série (na ordem atual das linhas)."""
+    if df.empty or df.groupby(serie).size().max() <= max_pontos:
+        return df
+    partes = []
+    for _, grupo in df.groupby(serie, sort=False):
+        partes.append(grupo.iloc[lttb(grupo[y].to_numpy(), max_pontos)])
+    return pd.concat(partes).sort_index()
+
+
+def reduzir_grade(df: pd.DataFrame, x: str, y: str, valor: str, max_celulas: int) -> pd.DataFrame:
+    """
+    Agrega uma grade x × y em blocos k × k (média do valor), com o menor
+    k que deixa a grade com até max_celulas. Cada bloco fica com o
+    primeiro x e o primeiro y dele.
+    """
+    xs = np.sort(df[x].unique())
+    ys = np.sort(df[y].unique())
+    celulas = len(xs) * len(ys)
+    if celulas <= max_celulas:
+        return df
+    k = int(np.ceil(np.sqrt(celulas / max_celulas)))
+    bloco_x = np.searchsorted(xs, df[x].to_numpy()) // k
+    bloco_y = np.searchsorted(ys, df[y].to_numpy()) // k
+    return (
+        df.assign(_bx=bloco_x, _by=bloco_y)
+        .groupby(["_bx", "_by"], sort=True)
+        .agg(**{x: (x, "first"), y: (y, "first"), valor: (valor, "mean")})
+        .reset_index(drop=True)
+    )
+
+
+def chave_dados(df: pd.DataFrame) -> tuple:
+    """Versão de uma tabela pequena: colunas, tamanho e hash do conteúdo."""
+    return (tuple(df.columns), len(df), int(pd.util.hash_pandas_object(df, index=False).sum()))
+
+
+def tamanho_spec(spec: dict) -> int:
+    return len(json.dumps(spec, separators=(",", ":"), default=str))
+
+
+def spec_em_cache(nome: str, chave, construir) -> dict:
+    with _lock:
+        spec = _specs.get((nome, chave))
+        if spec is not None:
+            _specs.move_to_end((nome, chave))
+            return spec
+    spec = construir()
+    with _lock:
+        _specs[(nome, chave)] = spec
+        while len(_specs) > MAX_SPECS_CACHE:
+            _specs.popitem(last=False)
+    return spec
+
+
+def _limitar(construir, max_pontos: int) -> dict:
+    """Constrói o spec e, se passar de MAX_BYTES_SPEC, reduz à metade os pontos."""
+    spec = construir(max_pontos)
+    while tamanho_spec(spec) > MAX_BYTES_SPEC and max_pontos > 16:
+        max_pontos //= 2
+        spec = construir(max_pontos)
+    return spec
+
+# ============================================================
+# GRÁFICOS DO APP
+# ============================================================
+def spec_mensal(mensal: pd.DataFrame, versao) -> dict:
+    """Evolução da mensalidade média por rota (mensal de analises.resumo_mensal)."""
+    import altair as alt
+
+    def construir(max_pontos):
+        dados = mensal[["mes_ref", "rota", "mensalidade_media"]].assign(
+            mensalidade_media=mensal["mensalidade_media"].round(2)
+        )
+        reduzido = reduzir_series(dados, "rota", "mensalidade_media", max_pontos)
+        return alt.Chart(reduzido).mark_line(point=True).encode(
+            x=alt.X("mes_ref:N", title="Mês", sort=None),  # já em ordem cronológica
+            y=alt.Y("mensalidade_media:Q", title="Mensalidade média (R$)"),
+            color=alt.Color("rota:N", title="Rota"),
+            tooltip=["mes_ref", "rota", "mensalidade_media"]
+        ).properties(height=350).to_dict()
+
+    return spec_em_cache("mensal", versao, lambda: _limitar(construir, MAX_PONTOS_SERIE))
+
+
+def spec_comparativo(df_comp: pd.DataFrame) -> dict:
+    """Barras por etapa do cálculo e rota (df_comp: Indicador, Rota, Valor)."""
+    import altair as alt
+
+    dados = df_comp.assign(Valor=df_comp["Valor"].astype(float).round(2))
+
+    def construir():
+        return alt.Chart(dados).mark_bar().encode(
+            x=alt.X("Indicador:N", title="Etapa"),
+            y=alt.Y("Valor:Q", title="Valor (R$)"),
+            color=alt.Color("Rota:N", title="Rota"),
+            tooltip=["Indicador", "Rota", "Valor"]
+        ).properties(height=350).to_dict()
+
+    return spec_em_cache("comparativo", chave_dados(dados), construir)
+
+
+def spec_mapa(dados_mapa: pd.DataFrame, titulo_y: str) -> dict:
+    """Mapa de calor dos cenários (dados_mapa: aux_total, parametro, mensalidade)."""
+    import altair as alt
+
+    def construir(max_celulas):
+        grade = reduzir_grade(dados_mapa, "aux_total", "parametro", "mensalidade", max_celulas)
+        grade = grade.assign(mensalidade=grade["mensalidade"].round(2))
+        return alt.Chart(grade).mark_rect().encode(
+            x=alt.X("aux_total:O", title="Auxílio total (R$)", axis=alt.Axis(labelOverlap=True)),
+            y=alt.Y("parametro:O", title=titulo_y, sort="descending", axis=alt.Axis(labelOverlap=True)),
+            color=alt.Color("mensalidade:Q", title="Mensalidade (R$)", scale=alt.Scale(scheme="redyellowgreen", reverse=True)),
+            tooltip=[
+                alt.Tooltip("aux_total:Q", title="Auxílio total", format=",.2f"),
+                alt.Tooltip("parametro:Q", title=titulo_y, format=",.2f"),
+                alt.Tooltip("mensalidade:Q", title="Mensalidade", format=",.2f"),
+            ]
+        ).properties(height=420).to_dict()
+
+    chave = (titulo_y, chave_dados(dados_mapa))
+    return spec_em_cache("mapa", chave, lambda: _limitar(construir, MAX_CELULAS_MAPA))
@@ -0,0 +1,908 @@
+import atexit
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import pandas as pd
+
+from metricas import medir
+
+# ============================================================
+# HISTÓRICO DE CÁLCULOS
+# ============================================================
+# O histórico é gravado por um backend plugável. O padrão é SQLite em
+# modo WAL (anexação O(1), índice em (mes_ref, rota) e as rotas de um
+# mesmo cálculo gravadas numa única transação). O CSV antigo continua
+# disponível como backend e como origem da migração.
+HIST_PATH = "historico_rotas.csv"
+HIST_DB_PATH = "historico_rotas.db"
+HIST_PARQUET_PATH = "historico_rotas.parquet"
+
+# Parquet: nº de partes que dispara a compactação automática.
+MAX_PARTES_PARQUET = int(os.environ.get("ASSEUF_PARQUET_MAX_PARTES", 64))
+PREFIXO_COMPACTO = "compacto-"
+
+# Único formato de data_registro gravado e lido por todos os backends.
+FORMATO_DATA_REGISTRO = "%d/%m/%Y %H:%M"
+
+COLUNAS = [
+    "mes_ref",
+    "rota",
+    "bruto",
+    "passagens",
+    "dez_porcento",
+    "bruto_aj_10",
+    "aux_recebido",
+    "pos_aux",
+    "noventa_porcento",
+    "valor_final",
+    "alunos_integrais",
+    "alunos_desconto_total",
+    "mensalidade_media",
+    "veiculos",
+    "diarias",
+    "data_registro",
+]
+
+_TIPOS_SQL = {
+    "mes_ref": "TEXT NOT NULL",
+    "rota": "TEXT NOT NULL",
+    "alunos_integrais": "INTEGER",
+    "alunos_desconto_total": "INTEGER",
+    "veiculos": "INTEGER",
+    "diarias": "INTEGER",
+    "data_registro": "TEXT",
+}
+
+
+MESES = {
+    "janeiro": 1, "fevereiro": 2, "marco": 3, "março": 3, "abril": 4,
+    "maio": 5, "junho": 6, "julho": 7, "agosto": 8, "setembro": 9,
+    "outubro": 10, "novembro": 11, "dezembro": 12,
+}
+
+
+def periodo_mes_ref(mes_ref):
+    """
+    Converte o mês de referência digitado ("Janeiro/2026", "jan 2026",
+    "01/2026", "2026-01") em "AAAA-MM", que ordena corretamente.
+    Retorna None quando o texto não é reconhecido.
+    """
+    if not isinstance(mes_ref, str):
+        return None
+    partes = re.findall(r"[^\W\d_]+|\d+", mes_ref.strip().lower())
+    if len(partes) != 2:
+        return None
+    a, b = partes
+    if a.isdigit() and len(a) == 4:
+        a, b = b, a
+    if not (b.isdigit() and len(b) == 4):
+        return None
+    if a.isdigit():
+        mes = int(a)
+    else:
+        mes = MESES.get(a) or next(
+            (n for nome, n in MESES.items() if len(a) >= 3 and nome.startswith(a)), None
+        )
+    if not mes or not 1 <= mes <= 12:
+        return None
+    return f"{b}-{mes:02d}"
+
+
+def normalizar_data_registro(valor=None) -> str:
+    """
+    data_registro no formato FORMATO_DATA_REGISTRO, o único que todos os
+    backends leem de volta. Aceita datetime, texto nesse formato ou ISO
+    (ex.: "2026-03-05 14:30"); None vira o momento atual.
+    """
+    if valor is None:
+        return datetime.now().strftime(FORMATO_DATA_REGISTRO)
+    if isinstance(valor, datetime):
+        return valor.strftime(FORMATO_DATA_REGISTRO)
+    if isinstance(valor, str):
+        texto = valor.strip()
+        try:
+            return datetime.strptime(texto, FORMATO_DATA_REGISTRO).strftime(FORMATO_DATA_REGISTRO)
+        except ValueError:
+            pass
+        try:
+            return datetime.fromisoformat(texto).strftime(FORMATO_DATA_REGISTRO)
+        except ValueError:
+            pass
+    raise ValueError(f"data_registro inválida: {valor!r} (use dd/mm/aaaa hh:mm)")
+
+
+def montar_registro(mes_ref, rota_nome, dados, data_registro=None) -> dict:
+    return {
+        "mes_ref": mes_ref,
+        "rota": rota_nome,
+        "bruto": dados["bruto"],
+        "passagens": dados["passagens"],
+        "dez_porcento": dados["dez_porcento"],
+        "bruto_aj_10": dados["bruto_aj_10"],
+        "aux_recebido": dados["aux_recebido"],
+        "pos_aux": dados["pos_aux"],
+        "noventa_porcento": dados["noventa_porcento"],
+        "valor_final": dados["valor_final"],
+        "alunos_integrais": dados["alunos_integrais"],
+        "alunos_desconto_total": dados["alunos_desconto_total"],
+        "mensalidade_media": dados["mensalidade_media"],
+        "veiculos": dados["veiculos_qtd"],
+        "diarias": dados["diarias"],
+        "data_registro": normalizar_data_registro(data_registro),
+    }
+
+
+def dados_do_registro(registro: dict) -> dict:
+    """Inverso de montar_registro: devolve os dados no formato de calcular_rota."""
+    dados = {campo: registro[campo] for campo in COLUNAS if campo not in (
+        "mes_ref", "rota", "veiculos", "data_registro"
+    )}
+    dados["descontos"] = {}  # as faixas não são guardadas no histórico
+    dados["veiculos_qtd"] = registro["veiculos"]
+    return dados
+
+
+def _validar_coluna(coluna):
+    if coluna not in COLUNAS:
+        raise ValueError(f"Coluna desconhecida no histórico: {coluna}")
+
+
+def _validar_faixas(faixas):
+    faixas = faixas or {}
+    for coluna in faixas:
+        _validar_coluna(coluna)
+    return faixas
+
+
+class HistoricoBackend:
+    """Interface comum dos backends de histórico."""
+
+    # Se True, leituras também pegam a trava de arquivo (compartilhada),
+    # para não ver uma gravação pela metade.
+    leitura_exige_trava = False
+    # Se True, uma gravação que falha não deixa nada gravado (transação),
+    # então pode ser refeita sem duplicar registros.
+    gravacao_transacional = False
+
+    def salvar_registros(self, registros: list):
+        raise NotImplementedError
+
+    def carregar(self, colunas=None) -> pd.DataFrame:
+        """Histórico completo, ou só as colunas pedidas (em COLUNAS)."""
+        raise NotImplementedError
+
+    def versao(self):
+        """Identificador barato que muda a cada gravação (usado por caches)."""
+        raise NotImplementedError
+
+    def salvar(self, mes_ref, rota_nome, dados):
+        self.salvar_registros([montar_registro(mes_ref, rota_nome, dados)])
+
+    def opcoes_filtro(self) -> dict:
+        """Rotas e períodos ("AAAA-MM") existentes, para montar filtros."""
+        df = self.carregar(["mes_ref", "rota"])
+        if df.empty:
+            return {"rotas": [], "periodos": []}
+        periodos = df["mes_ref"].map(periodo_mes_ref).dropna()
+        return {
+            "rotas": sorted(df["rota"].dropna().unique().tolist()),
+            "periodos": sorted(periodos.unique().tolist()),
+        }
+
+    @medir("consultar_historico")
+    def consultar(
+        self,
+        rotas=None,
+        periodo_de=None,
+        periodo_ate=None,
+        faixas=None,
+        ordenar_por=None,
+        decrescente=False,
+        limite=50,
+        deslocamento=0,
+    ):
+        """
+        Filtra, ordena e pagina o histórico, devolvendo (página, total).
+        periodo_de/periodo_ate: "AAAA-MM"; faixas: {coluna: (mínimo, máximo)},
+        com None para limite aberto. Sem ordenar_por, mantém a ordem de gravação.
+        Implementação genérica em memória; backends com consulta nativa a
+        substituem.
+        """
+        df = self.carregar()
+        if df.empty:
+            return df, 0
+        filtro = pd.Series(True, index=df.index)
+        if rotas:
+            filtro &= df["rota"].isin(rotas)
+        if periodo_de or periodo_ate:
+            periodo = df["mes_ref"].map(periodo_mes_ref)
+            if periodo_de:
+                filtro &= periodo.notna() & (periodo >= periodo_de)
+            if periodo_ate:
+                filtro &= periodo.notna() & (periodo <= periodo_ate)
+        for coluna, (minimo, maximo) in _validar_faixas(faixas).items():
+            if minimo is not None:
+                filtro &= df[coluna] >= minimo
+            if maximo is not None:
+                filtro &= df[coluna] <= maximo
+        df = df[filtro]
+        if ordenar_por:
+            _validar_coluna(ordenar_por)
+            df = df.sort_values(ordenar_por, ascending=not decrescente, kind="stable")
+        return df.iloc[deslocamento:deslocamento + limite].reset_index(drop=True), len(df)
+
+    def salvar_calculo(self, mes_ref, resultados: dict):
+        """
+        resultados: {nome_da_rota: dados_de_calcular_rota}
+        Todas as rotas de um cálculo são gravadas juntas.
+        """
+        agora = datetime.now().strftime(FORMATO_DATA_REGISTRO)
+        self.salvar_registros([
+            montar_registro(mes_ref, rota_nome, dados, agora)
+            for rota_nome, dados in resultados.items()
+        ])
+
+
+class HistoricoCSV(HistoricoBackend):
+    """Backend legado: um CSV, agora gravado por anexação."""
+
+    leitura_exige_trava = True
+
+    def __init__(self, caminho=HIST_PATH):
+        self.caminho = caminho
+
+    @medir("salvar_historico")
+    def salvar_registros(self, registros: list):
+        if not registros:
+            return
+        novo = not os.path.exists(self.caminho) or os.path.getsize(self.caminho) == 0
+        pd.DataFrame(registros, columns=COLUNAS).to_csv(
+            self.caminho, mode="a", header=novo, index=False
+        )
+
+    @medir("carregar_historico")
+    def carregar(self, colunas=None) -> pd.DataFrame:
+        for coluna in colunas or []:
+            _validar_coluna(coluna)
+        if os.path.exists(self.caminho):
+            try:
+                return pd.read_csv(self.caminho, usecols=colunas)
+            except Exception:
+                return pd.DataFrame()
+        return pd.DataFrame()
+
+    def versao(self):
+        try:
+            info = os.stat(self.caminho)
+        except OSError:
+            return ("csv", os.path.abspath(self.caminho), None)
+        return ("csv", os.path.abspath(self.caminho), info.st_mtime_ns, info.st_size)
+
+
+class HistoricoSQLite(HistoricoBackend):
+    """
+    Backend SQLite (WAL) indexado por (mes_ref, rota).
+
+    A tabela meta guarda marcas de manutenção; csv_migrado indica que o
+    CSV antigo já foi importado (ou que o banco já tinha registros
+    próprios) e não deve ser importado de novo.
+    """
+
+    gravacao_transacional = True
+
+    def __init__(self, caminho=HIST_DB_PATH):
+        self.caminho = caminho
+        colunas_sql = ", ".join(
+            f"{col} {_TIPOS_SQL.get(col, 'REAL')}" for col in COLUNAS
+        )
+        conn = self._conectar()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS historico ("
+                    f"id INTEGER PRIMARY KEY AUTOINCREMENT, {colunas_sql})"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_historico_mes_rota "
+                    "ON historico (mes_ref, rota)"
+                )
+                # periodo ("AAAA-MM") é derivado de mes_ref na gravação e
+                # permite filtrar e ordenar por intervalo de meses no banco.
+                existentes = {c[1] for c in conn.execute("PRAGMA table_info(historico)")}
+                if "periodo" not in existentes:
+                    conn.execute("ALTER TABLE historico ADD COLUMN periodo TEXT")
+                    conn.create_function("periodo_mes_ref", 1, periodo_mes_ref, deterministic=True)
+                    conn.execute("UPDATE historico SET periodo = periodo_mes_ref(mes_ref)")
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_historico_periodo_rota "
+                    "ON historico (periodo, rota)"
+                )
+                conn.execute("CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT)")
+                # Bancos anteriores à marca: se já têm registros, o CSV
+                # foi migrado na criação (ou nunca existiu).
+                conn.execute(
+                    "INSERT OR IGNORE INTO meta (chave, valor) SELECT 'csv_migrado', 'anterior' "
+                    "WHERE EXISTS (SELECT 1 FROM historico)"
+                )
+        finally:
+            conn.close()
+
+    def _conectar(self):
+        # Uma conexão por operação: o Streamlit atende cada sessão em
+        # uma thread própria e conexões sqlite3 não devem ser compartilhadas.
+        conn = sqlite3.connect(self.caminho, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def _inserir(conn, registros: list):
+        marcadores = ", ".join("?" for _ in range(len(COLUNAS) + 1))
+        conn.executemany(
+            f"INSERT INTO historico ({', '.join(COLUNAS)}, periodo) VALUES ({marcadores})",
+            [
+                (*(reg.get(col) for col in COLUNAS), periodo_mes_ref(reg.get("mes_ref")))
+                for reg in registros
+            ],
+        )
+
+    @medir("salvar_historico")
+    def salvar_registros(self, registros: list):
+        if not registros:
+            return
+        conn = self._conectar()
+        try:
+            with conn:
+                self._inserir(conn, registros)
+        finally:
+            conn.close()
+
+    @medir("carregar_historico")
+    def carregar(self, colunas=None) -> pd.DataFrame:
+        for coluna in colunas or []:
+            _validar_coluna(coluna)
+        conn = self._conectar()
+        try:
+            df = pd.read_sql_query(
+                f"SELECT {', '.join(colunas or COLUNAS)} FROM historico ORDER BY id", conn
+            )
+        finally:
+            conn.close()
+        if df.empty:
+            return pd.DataFrame()
+        return df
+
+    def versao(self):
+        # O histórico só recebe inserções, então o maior id basta.
+        conn = self._conectar()
+        try:
+            ultimo = conn.execute("SELECT MAX(id) FROM historico").fetchone()[0]
+        finally:
+            conn.close()
+        return ("sqlite", os.path.abspath(self.caminho), ultimo)
+
+    def opcoes_filtro(self) -> dict:
+        conn = self._conectar()
+        try:
+            rotas = [r[0] for r in conn.execute("SELECT DISTINCT rota FROM historico ORDER BY rota")]
+            periodos = [p[0] for p in conn.execute(
+                "SELECT DISTINCT periodo FROM historico WHERE periodo IS NOT NULL ORDER BY periodo"
+            )]
+        finally:
+            conn.close()
+        return {"rotas": rotas, "periodos": periodos}
+
+    @medir("consultar_historico")
+    def consultar(
+        self,
+        rotas=None,
+        periodo_de=None,
+        periodo_ate=None,
+        faixas=None,
+        ordenar_por=None,
+        decrescente=False,
+        limite=50,
+        deslocamento=0,
+    ):
+        condicoes, params = [], []
+        if rotas:
+            condicoes.append(f"rota IN ({', '.join('?' for _ in rotas)})")
+            params.extend(rotas)
+        if periodo_de:
+            condicoes.append("periodo >= ?")
+            params.append(periodo_de)
+        if periodo_ate:
+            condicoes.append("periodo <= ?")
+            params.append(periodo_ate)
+        # Os nomes de coluna vêm de COLUNAS (validados), nunca do usuário.
+        for coluna, (minimo, maximo) in _validar_faixas(faixas).items():
+            if minimo is not None:
+                condicoes.append(f"{coluna} >= ?")
+                params.append(minimo)
+            if maximo is not None:
+                condicoes.append(f"{coluna} <= ?")
+                params.append(maximo)
+        where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        if ordenar_por:
+            _validar_coluna(ordenar_por)
+            ordem = f"{ordenar_por} {'DESC' if decrescente else 'ASC'}, id"
+        else:
+            ordem = "id"
+
+        conn = self._conectar()
+        try:
+            total = conn.execute(f"SELECT COUNT(*) FROM historico {where}", params).fetchone()[0]
+            pagina = pd.read_sql_query(
+                f"SELECT {', '.join(COLUNAS)} FROM historico {where} "
+                f"ORDER BY {ordem} LIMIT ? OFFSET ?",
+                conn,
+                params=[*params, int(limite), int(deslocamento)],
+            )
+        finally:
+            conn.close()
+        return pagina, total
+
+    def csv_migrado(self) -> bool:
+        conn = self._conectar()
+        try:
+            return conn.execute("SELECT 1 FROM meta WHERE chave = 'csv_migrado'").fetchone() is not None
+        finally:
+            conn.close()
+
+    def migrar_csv(self, caminho_csv=HIST_PATH) -> int:
+        """
+        Importa um CSV antigo e grava a marca csv_migrado na mesma
+        transação: ou entra tudo, ou nada, e a migração não se repete.
+        Retorna o nº de linhas importadas (0 se já migrado).
+
+        O CSV é lido sem a tolerância de HistoricoCSV.carregar: um arquivo
+        corrompido levanta a exceção antes de qualquer escrita, em vez de
+        ser migrado como vazio e marcado.
+        """
+        registros = []
+        if os.path.exists(caminho_csv) and os.path.getsize(caminho_csv):
+            df = pd.read_csv(caminho_csv)
+            faltando = {"mes_ref", "rota"} - set(df.columns)
+            if faltando:
+                raise ValueError(f"{caminho_csv}: colunas ausentes: {', '.join(sorted(faltando))}")
+            registros = _registros_da_tabela(df)
+        conn = self._conectar()
+        try:
+            with conn:
+                # IMMEDIATE: outro processo migrando ao mesmo tempo espera
+                # aqui e depois encontra a marca.
+                conn.execute("BEGIN IMMEDIATE")
+                if conn.execute("SELECT 1 FROM meta WHERE chave = 'csv_migrado'").fetchone():
+                    return 0
+                self._inserir(conn, registros)
+                conn.execute(
+                    "INSERT INTO meta (chave, valor) VALUES ('csv_migrado', ?)",
+                    (datetime.now().strftime(FORMATO_DATA_REGISTRO),),
+                )
+        finally:
+            conn.close()
+        return len(registros)
+
+
+class HistoricoParquet(HistoricoBackend):
+    """
+    Backend colunar tipado (Parquet via pyarrow).
+
+    O histórico é um diretório de arquivos Parquet, um por gravação: anexar
+    é escrever um arquivo novo e a leitura junta as partes em ordem, com
+    memory-map e apenas as colunas pedidas. Valores em R$ são decimais de
+    ponto fixo (2 casas), contagens são inteiros e mes_ref ganha a coluna
+    periodo (primeiro dia do mês), lida como período mensal do pandas.
+
+    Acima de MAX_PARTES_PARQUET partes, a gravação compacta o diretório
+    num arquivo "compacto-<última parte coberta>"; as partes que ele cobre
+    deixam de ser lidas assim que ele aparece e só então são apagadas.
+    """
+
+    # compactar apaga partes: a leitura não pode listar e abrir no meio disso.
+    leitura_exige_trava = True
+
+    def __init__(self, caminho=HIST_PARQUET_PATH):
+        self.caminho = caminho
+
+    @staticmethod
+    def esquema():
+        import pyarrow as pa
+
+        tipos = {
+            "mes_ref": pa.string(),
+            "rota": pa.string(),
+            "alunos_integrais": pa.int32(),
+            "alunos_desconto_total": pa.int32(),
+            "veiculos": pa.int32(),
+            "diarias": pa.int32(),
+            "data_registro": pa.timestamp("s"),
+        }
+        campos = [pa.field(col, tipos.get(col, pa.decimal128(18, 2))) for col in COLUNAS]
+        campos.append(pa.field("periodo", pa.date32()))
+        return pa.schema(campos)
+
+    def _partes(self):
+        """Arquivos a ler, em ordem: o compacto mais recente e as partes posteriores a ele."""
+        try:
+            nomes = sorted(nome for nome in os.listdir(self.caminho) if nome.endswith(".parquet"))
+        except OSError:
+            return []
+        compactos = [nome for nome in nomes if nome.startswith(PREFIXO_COMPACTO)]
+        partes = [nome for nome in nomes if not nome.startswith(PREFIXO_COMPACTO)]
+        if compactos:
+            coberta = compactos[-1][len(PREFIXO_COMPACTO):]
+            partes = compactos[-1:] + [nome for nome in partes if nome > coberta]
+        return [os.path.join(self.caminho, nome) for nome in partes]
+
+    @medir("salvar_historico")
+    def salvar_registros(self, registros: list):
+        if not registros:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        esquema = self.esquema()
+        linhas = []
+        for reg in registros:
+            linha = {col: reg.get(col) for col in COLUNAS}
+            if isinstance(linha["data_registro"], str):
+                linha["data_registro"] = datetime.strptime(linha["data_registro"], FORMATO_DATA_REGISTRO)
+            periodo = periodo_mes_ref(linha["mes_ref"])
+            linha["periodo"] = date(int(periodo[:4]), int(periodo[5:]), 1) if periodo else None
+            linhas.append(linha)
+        colunas = {}
+        for campo in esquema:
+            valores = [linha[campo.name] for linha in linhas]
+            if pa.types.is_decimal(campo.type):
+                # float -> decimal arredonda para o centavo.
+                colunas[campo.name] = pa.array(valores, pa.float64()).cast(campo.type)
+            else:
+                colunas[campo.name] = pa.array(valores, campo.type)
+        tabela = pa.Table.from_pydict(colunas, schema=esquema)
+
+        # Nome ordenável pelo instante da gravação; escrita atômica.
+        os.makedirs(self.caminho, exist_ok=True)
+        nome = f"parte-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp = os.path.join(self.caminho, f".{nome}.tmp")
+        pq.write_table(tabela, tmp)
+        os.replace(tmp, os.path.join(self.caminho, nome))
+        # Quem chama já segura a trava de escrita (HistoricoSerializado).
+        if len(self._partes()) > MAX_PARTES_PARQUET:
+            self._compactar()
+
+    def carregar_tabela(self, colunas=None):
+        """Tabela Arrow tipada, com memory-map e só as colunas pedidas."""
+        import pyarrow.dataset as ds
+        from pyarrow import fs
+
+        partes = self._partes()
+        if not partes:
+            return self.esquema().empty_table().select(colunas or COLUNAS + ["periodo"])
+        dataset = ds.dataset(
+            partes, schema=self.esquema(), format="parquet",
+            filesystem=fs.LocalFileSystem(use_mmap=True),
+        )
+        return dataset.to_table(columns=colunas)
+
+    @medir("carregar_historico")
+    def carregar(self, colunas=None) -> pd.DataFrame:
+        for coluna in colunas or []:
+            if coluna != "periodo":
+                _validar_coluna(coluna)
+        tabela = self.carregar_tabela(colunas or COLUNAS)
+        if tabela.num_rows == 0:
+            return pd.DataFrame()
+        import pyarrow as pa
+
+        # Decimais viram float64 para gráficos e contas; periodo vira Period[M].
+        tipos = [
+            pa.float64() if pa.types.is_decimal(campo.type) else campo.type
+            for campo in tabela.schema
+        ]
+        tabela = tabela.cast(pa.schema([pa.field(c.name, t) for c, t in zip(tabela.schema, tipos)]))
+        df = tabela.to_pandas()
+        if "periodo" in df:
+            df["periodo"] = pd.to_datetime(df["periodo"]).dt.to_period("M")
+        if "data_registro" in df:
+            # Mesmo formato texto do CSV e do SQLite.
+            df["data_registro"] = df["data_registro"].dt.strftime(FORMATO_DATA_REGISTRO)
+        return df
+
+    def versao(self):
+        partes = self._partes()
+        return ("parquet", os.path.abspath(self.caminho), len(partes), partes[-1] if partes else None)
+
+    def compactar(self):
+        """Junta as partes num único arquivo (as leituras ficam mais rápidas)."""
+        with trava_arquivo(self.caminho):
+            self._compactar()
+
+    def _compactar(self):
+        import pyarrow.parquet as pq
+
+        partes = self._partes()
+        if len(partes) < 2:
+            return
+        tabela = self.carregar_tabela()
+        coberta = os.path.basename(partes[-1])
+        nome = os.path.join(self.caminho, PREFIXO_COMPACTO + coberta)
+        tmp = os.path.join(self.caminho, ".compactado.tmp")
+        pq.write_table(tabela, tmp)
+        # Primeiro o compacto entra no lugar (atômico); a partir daí as
+        # partes cobertas já não são lidas, e apagá-las é só limpeza. Se o
+        # processo cair no meio, a próxima compactação termina o serviço.
+        os.replace(tmp, nome)
+        for arquivo in os.listdir(self.caminho):
+            caminho = os.path.join(self.caminho, arquivo)
+            if not arquivo.endswith(".parquet") or caminho == nome:
+                continue
+            if arquivo.startswith(PREFIXO_COMPACTO) or arquivo <= coberta:
+                os.remove(caminho)
+
+
+def registros_do_historico(origem: HistoricoBackend) -> list:
+    """Todos os registros de um backend, como dicts de montar_registro."""
+    return _registros_da_tabela(origem.carregar(COLUNAS))
+
+
+def _registros_da_tabela(df: pd.DataFrame) -> list:
+    if df.empty:
+        return []
+    if "data_registro" in df and pd.api.types.is_datetime64_any_dtype(df["data_registro"]):
+        df["data_registro"] = df["data_registro"].dt.strftime(FORMATO_DATA_REGISTRO)
+    return [
+        {col: (None if pd.isna(val) else val) for col, val in linha.items()}
+        for linha in df.reindex(columns=COLUNAS).to_dict("records")
+    ]
+
+
+def converter_historico(origem: HistoricoBackend, destino: HistoricoBackend) -> int:
+    """Copia todos os registros de um backend para outro. Retorna o nº de linhas."""
+    registros = registros_do_historico(origem)
+    destino.salvar_registros(registros)
+    return len(registros)
+
+
+# ============================================================
+# GRAVADOR ÚNICO (GROUP COMMIT)
+# ============================================================
+# O Streamlit atende cada sessão numa thread. Para que gravações
+# simultâneas não se atropelem, todas passam por uma fila atendida por
+# uma única thread gravadora:
+#   - os pedidos que chegam enquanto uma gravação está em andamento são
+#     juntados e gravados numa só chamada a salvar_registros (uma
+#     transação no SQLite, um arquivo no Parquet, um append no CSV);
+#   - a gravação roda sob uma trava exclusiva de arquivo (fcntl.flock em
+#     "<histórico>.lock"), o que também serializa outros processos, como
+#     importacao.py rodando ao lado do app;
+#   - salvar_registros só retorna depois do commit, e toda leitura espera
+#     os pedidos enviados antes dela: quem grava sempre lê o que gravou.
+# Se a gravação conjunta falhar, cada pedido é regravado sozinho, e só o
+# pedido com problema recebe o erro.
+MAX_PEDIDOS_POR_LOTE = 500
+
+
+@contextmanager
+def trava_arquivo(caminho, exclusiva=True):
+    """flock em "<caminho>.lock"; sem efeito onde não há fcntl (Windows)."""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    arquivo_trava = f"{os.path.normpath(caminho)}.lock"
+    pasta = os.path.dirname(arquivo_trava)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    with open(arquivo_trava, "a+") as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusiva else fcntl.LOCK_SH)
+        yield  # fechar o arquivo libera o flock
+
+
+class HistoricoSerializado(HistoricoBackend):
+    """Envolve um backend: gravador único com group commit e trava de arquivo."""
+
+    def __init__(self, backend: HistoricoBackend):
+        self.backend = backend
+        self._fila = queue.Queue()
+        self._cond = threading.Condition()
+        self._enviados = 0
+        self._concluidos = 0
+        self._thread = None
+        self._lock_thread = threading.Lock()
+        self.lotes = 0  # nº de gravações feitas (para métricas e testes)
+
+    def __getattr__(self, nome):
+        # migrar_csv, caminho etc. vêm do backend envolvido.
+        if nome == "backend":
+            raise AttributeError(nome)
+        return getattr(self.backend, nome)
+
+    # ---------------- GRAVAÇÃO ----------------
+    def enviar(self, registros: list) -> Future:
+        """Enfileira a gravação e devolve um Future resolvido após o commit."""
+        futuro = Future()
+        if not registros:
+            futuro.set_result(0)
+            return futuro
+        self._iniciar()
+        with self._cond:
+            self._enviados += 1
+            self._fila.put((list(registros), futuro))
+        return futuro
+
+    def salvar_registros(self, registros: list):
+        self.enviar(registros).result()
+
+    def _iniciar(self):
+        with self._lock_thread:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._gravar_continuamente, name="gravador-historico", daemon=True
+                )
+                self._thread.start()
+
+    def _gravar_continuamente(self):
+        while True:
+            pedidos = [self._fila.get()]
+            if pedidos[0] is None:
+                return
+            # Tudo o que chegou durante a gravação anterior vai junto.
+            while len(pedidos) < MAX_PEDIDOS_POR_LOTE:
+                try:
+                    pedido = self._fila.get_nowait()
+                except queue.Empty:
+                    break
+                if pedido is None:
+                    self._fila.put(None)
+                    break
+                pedidos.append(pedido)
+            self._gravar_lote(pedidos)
+
+    def _gravar_lote(self, pedidos):
+        try:
+            with trava_arquivo(self.backend.caminho):
+                self.backend.salvar_registros([reg for regs, _ in pedidos for reg in regs])
+            self.lotes += 1
+            resultados = [(futuro, len(regs), None) for regs, futuro in pedidos]
+        except Exception as e:
+            # Só um backend transacional garante que nada do lote ficou
+            # gravado; nos outros (CSV anexado, parte Parquet escrita antes
+            # de a compactação falhar) refazer pedido a pedido duplicaria
+            # registros, e todos os pedidos do lote recebem o erro.
+            resultados = [(futuro, None, e) for _, futuro in pedidos]
+            if self.backend.gravacao_transacional:
+                resultados = []
+                for regs, futuro in pedidos:
+                    try:
+                        with trava_arquivo(self.backend.caminho):
+                            self.backend.salvar_registros(regs)
+                        self.lotes += 1
+                        resultados.append((futuro, len(regs), None))
+                    except Exception as erro:
+                        resultados.append((futuro, None, erro))
+        with self._cond:
+            self._concluidos += len(pedidos)
+            self._cond.notify_all()
+        for futuro, n, erro in resultados:
+            if erro is None:
+                futuro.set_result(n)
+            else:
+                futuro.set_exception(erro)
+
+    def compactar(self):
+        """Compacta depois das gravações pendentes, sob a mesma trava do gravador."""
+        self.aguardar_gravacoes()
+        self.backend.compactar()
+
+    def aguardar_gravacoes(self):
+        """Espera as gravações enviadas até agora (leitura após escrita)."""
+        with self._cond:
+            alvo = self._enviados
+            self._cond.wait_for(lambda: self._concluidos >= alvo)
+
+    def fechar(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._fila.put(None)
+            self._thread.join()
+
+    # ---------------- LEITURA ----------------
+    def _ler(self, metodo, *args, **kwargs):
+        self.aguardar_gravacoes()
+        if self.backend.leitura_exige_trava:
+            with trava_arquivo(self.backend.caminho, exclusiva=False):
+                return metodo(*args, **kwargs)
+        return metodo(*args, **kwargs)
+
+    def carregar(self, colunas=None) -> pd.DataFrame:
+        return self._ler(self.backend.carregar, colunas)
+
+    def versao(self):
+        return self._ler(self.backend.versao)
+
+    def opcoes_filtro(self) -> dict:
+        return self._ler(self.backend.opcoes_filtro)
+
+    def consultar(self, *args, **kwargs):
+        return self._ler(self.backend.consultar, *args, **kwargs)
+
+
+# ============================================================
+# BACKEND PADRÃO
+# ============================================================
+# ASSEUF_HIST_BACKEND escolhe o backend: sqlite (padrão), parquet ou csv
+# (comportamento antigo). Se existir um CSV antigo e o banco SQLite ainda
+# não tiver a marca csv_migrado, o CSV é migrado numa única transação que
+# também grava a marca (ver HistoricoSQLite.migrar_csv); uma migração
+# interrompida é refeita no próximo uso. obter_backend devolve o backend
+# já envolvido pelo gravador único; criar_backend, o backend "cru".
+_backend = None
+_lock_backend = threading.Lock()
+
+
+def criar_backend(tipo=None) -> HistoricoBackend:
+    tipo = (tipo or os.environ.get("ASSEUF_HIST_BACKEND", "sqlite")).lower()
+    if tipo == "csv":
+        return HistoricoCSV()
+    if tipo == "parquet":
+        return HistoricoParquet()
+    if tipo == "sqlite":
+        backend = HistoricoSQLite()
+        if os.path.exists(HIST_PATH) and not backend.csv_migrado():
+            backend.migrar_csv(HIST_PATH)
+        return backend
+    raise ValueError(f"Backend de histórico desconhecido: {tipo}")
+
+
+def obter_backend() -> HistoricoBackend:
+    global _backend
+    with _lock_backend:
+        if _backend is None:
+            _backend = HistoricoSerializado(criar_backend())
+            atexit.register(_backend.fechar)
+    return _backend
+
+
+def carregar_historico() -> pd.DataFrame:
+    return obter_backend().carregar()
+
+
+def salvar_historico(mes_ref, rota_nome, dados):
+    obter_backend().salvar(mes_ref, rota_nome, dados)
+
+
+def salvar_calculo(mes_ref, resultados: dict):
+    obter_backend().salvar_calculo(mes_ref, resultados)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    caminhos = {"csv": HIST_PATH, "sqlite": HIST_DB_PATH, "parquet": HIST_PARQUET_PATH}
+    classes = {"csv": HistoricoCSV, "sqlite": HistoricoSQLite, "parquet": HistoricoParquet}
+
+    parser = argparse.ArgumentParser(
+        description="Converte o histórico entre formatos (padrão: CSV -> SQLite)."
+    )
+    parser.add_argument("--de", choices=list(classes), default="csv")
+    parser.add_argument("--para", choices=list(classes), default="sqlite")
+    parser.add_argument("--origem", help="caminho de origem (padrão do formato)")
+    parser.add_argument("--destino", help="caminho de destino (padrão do formato)")
+    args = parser.parse_args()
+
+    origem_path = args.origem or caminhos[args.de]
+    destino_path = args.destino or caminhos[args.para]
+    destino = classes[args.para](destino_path)
+    if not destino.carregar(["rota"]).empty:
+        parser.error(f"{destino_path} já contém registros; conversão cancelada.")
+    total = converter_historico(classes[args.de](origem_path), destino)
+    print(f"{total} registros convertidos de {origem_path} para {destino_path}.")
@@ -0,0 +1,302 @@
+"""
+Importação em lote dos dados mensais das rotas (CSV ou Excel).
+
+O arquivo tem uma linha por registro e uma coluna "tipo":
+
+    tipo     colunas usadas
+    rota     mes_ref, rota, aux_total, passagens, alunos_integrais, diarias
+    veiculo  mes_ref, rota, veiculo, valor, dias
+    faixa    mes_ref, rota, pct, qtd
+
+aux_total é o auxílio do mês inteiro e deve ser igual em todas as rotas do
+mesmo mês. Números aceitam o formato brasileiro ("1.500,50", "1500,5");
+"1.500", que pode ser mil e quinhentos ou 1,5, é recusado como ambíguo.
+Excel só no formato .xlsx (openpyxl). O arquivo é lido e validado em blocos; qualquer erro é
+informado com o número da linha e nada é gravado. Sem erros, o auxílio é
+dividido e as rotas calculadas em lote, e todos os meses vão para o
+histórico numa única gravação.
+
+    python importacao.py dados.csv [--simular]
+"""
+import csv
+
+import numpy as np
+import pandas as pd
+
+from calculo import (
+    CENTAVOS_PADRAO,
+    calcular_rotas_centavos,
+    calcular_rotas_lote,
+    centavos_para_reais,
+    consolidar_descontos,
+    distribuir_auxilio_centavos,
+    distribuir_auxilio_rotas,
+    para_centavos,
+    para_reais,
+    resultados_lote_como_dicts,
+)
+from historico import montar_registro, obter_backend
+
+COLUNAS_IMPORTACAO = [
+    "tipo", "mes_ref", "rota", "aux_total", "passagens", "alunos_integrais",
+    "diarias", "veiculo", "valor", "dias", "pct", "qtd",
+]
+
+# Campos numéricos obrigatórios por tipo: (campo, inteiro?, mínimo, máximo)
+CAMPOS_POR_TIPO = {
+    "rota": [
+        ("aux_total", False, 0, None),
+        ("passagens", False, 0, None),
+        ("alunos_integrais", True, 0, None),
+        ("diarias", True, 0, None),
+    ],
+    "veiculo": [
+        ("valor", False, 0, None),
+        ("dias", True, 0, None),
+    ],
+    "faixa": [
+        ("pct", True, 0, 100),
+        ("qtd", True, 0, None),
+    ],
+}
+
+TAMANHO_BLOCO = 50_000
+MAX_ERROS = 1000
+
+# "1.500.000" e "1.500,50": pontos de milhar (a vírgula decimal é opcional).
+_MILHAR = r"[-+]?\d{1,3}(?:\.\d{3})+(?:,\d+)?"
+# "1.500": mil e quinhentos (pt-BR) ou 1,5 (ponto decimal)?
+_AMBIGUO = r"[-+]?\d{1,3}\.\d{3}"
+
+
+def modelo_csv() -> bytes:
+    exemplo = pd.DataFrame([
+        {"tipo": "rota", "mes_ref": "Janeiro/2026", "rota": "Sete Lagoas", "aux_total": 10000, "passagens": 1500, "alunos_integrais": 30, "diarias": 22},
+        {"tipo": "rota", "mes_ref": "Janeiro/2026", "rota": "Curvelo", "aux_total": 10000, "passagens": 900, "alunos_integrais": 20, "diarias": 18},
+        {"tipo": "veiculo", "mes_ref": "Janeiro/2026", "rota": "Sete Lagoas", "veiculo": "Micro-ônibus", "valor": 650, "dias": 22},
+        {"tipo": "veiculo", "mes_ref": "Janeiro/2026", "rota": "Curvelo", "veiculo": "Van", "valor": 480, "dias": 18},
+        {"tipo": "faixa", "mes_ref": "Janeiro/2026", "rota": "Sete Lagoas", "pct": 50, "qtd": 4},
+    ], columns=COLUNAS_IMPORTACAO)
+    return exemplo.to_csv(index=False).encode("utf-8")
+
+
+def converter_numeros(texto: pd.Series):
+    """
+    Texto -> número, no formato brasileiro ou com ponto decimal.
+    Retorna (números, ambíguos); inválidos e ambíguos viram NaN.
+    """
+    texto = texto.str.strip()
+    milhar = texto.str.fullmatch(_MILHAR)
+    ambiguo = texto.str.fullmatch(_AMBIGUO)
+    texto = texto.where(~milhar, texto.str.replace(".", "", regex=False))
+    numero = pd.to_numeric(texto.str.replace(",", ".", regex=False), errors="coerce")
+    numero[ambiguo] = np.nan
+    return numero, ambiguo
+
+
+def _celula_excel(valor):
+    """Célula numérica do Excel -> texto com vírgula decimal (nunca ambíguo)."""
+    if isinstance(valor, float) and not np.isnan(valor):
+        return repr(valor).replace(".", ",")
+    if isinstance(valor, (int, np.integer)) and not isinstance(valor, bool):
+        return str(valor)
+    return valor
+
+
+def ler_blocos(arquivo, nome=None, tamanho_bloco=TAMANHO_BLOCO):
+    """Gera DataFrames de texto com a coluna _linha (número da linha no arquivo)."""
+    nome = (nome or getattr(arquivo, "name", "") or "").lower()
+    if nome.endswith((".xlsx", ".xlsm")):
+        # Excel não tem leitura incremental no pandas: lê a planilha e
+        # valida em blocos do mesmo tamanho.
+        planilha = pd.read_excel(arquivo, dtype=object).map(_celula_excel)
+        blocos = (
+            planilha.iloc[i:i + tamanho_bloco]
+            for i in range(0, len(planilha), tamanho_bloco)
+        )
+    else:
+        blocos = pd.read_csv(
+            arquivo, dtype=str, chunksize=tamanho_bloco,
+            sep=None, engine="python", encoding="utf-8-sig",
+        )
+    inicio = 2  # a linha 1 é o cabeçalho
+    for bloco in blocos:
+        bloco = bloco.rename(columns=lambda c: str(c).strip().lower())
+        bloco = bloco.reindex(columns=COLUNAS_IMPORTACAO).fillna("").astype(str)
+        bloco.insert(0, "_linha", np.arange(inicio, inicio + len(bloco)))
+        inicio += len(bloco)
+        yield bloco
+
+
+def validar_bloco(bloco: pd.DataFrame):
+    """Retorna ({tipo: DataFrame válido}, lista de erros) de um bloco."""
+    erros = []
+    validos = {}
+    tipo = bloco["tipo"].str.strip().str.lower()
+    for coluna in ("mes_ref", "rota", "veiculo"):
+        bloco[coluna] = bloco[coluna].str.strip()
+
+    desconhecido = ~tipo.isin(list(CAMPOS_POR_TIPO))
+    for linha, valor in zip(bloco.loc[desconhecido, "_linha"], bloco.loc[desconhecido, "tipo"]):
+        erros.append({"linha": linha, "campo": "tipo", "erro": f"tipo inválido: {valor!r}"})
+
+    for nome_tipo, campos in CAMPOS_POR_TIPO.items():
+        parte = bloco[tipo == nome_tipo].copy()
+        if parte.empty:
+            continue
+        invalida = pd.Series(False, index=parte.index)
+        for coluna in ("mes_ref", "rota"):
+            vazio = parte[coluna] == ""
+            erros += [{"linha": l, "campo": coluna, "erro": "obrigatório"} for l in parte.loc[vazio, "_linha"]]
+            invalida |= vazio
+        for campo, inteiro, minimo, maximo in campos:
+            numero, ambiguo = converter_numeros(parte[campo])
+            ruim = numero.isna()
+            motivo = pd.Series("não é um número", index=parte.index)
+            motivo[ambiguo] = "ambíguo: escreva 1500 (milhar) ou 1,5 (decimal)"
+            motivo[parte[campo].str.strip() == ""] = "obrigatório"
+            if inteiro:
+                fracionario = ~ruim & (numero != np.floor(numero))
+                motivo[fracionario] = "deve ser inteiro"
+                ruim |= fracionario
+            if minimo is not None:
+                abaixo = ~ruim & (numero < minimo)
+                motivo[abaixo] = f"deve ser ≥ {minimo}"
+                ruim |= abaixo
+            if maximo is not None:
+                acima = ~ruim & (numero > maximo)
+                motivo[acima] = f"deve ser ≤ {maximo}"
+                ruim |= acima
+            erros += [
+                {"linha": l, "campo": campo, "erro": f"{m} ({v!r})" if v else m}
+                for l, m, v in zip(parte.loc[ruim, "_linha"], motivo[ruim], parte.loc[ruim, campo])
+            ]
+            invalida |= ruim
+            parte[campo] = numero.fillna(0).astype("int64" if inteiro else float)
+        validos[nome_tipo] = parte.loc[~invalida, ["_linha", "mes_ref", "rota", "veiculo"] + [c[0] for c in campos]]
+    return validos, erros
+
+
+def _tabela_vazia(tipo) -> pd.DataFrame:
+    colunas = {"_linha": "int64", "mes_ref": str, "rota": str, "veiculo": str}
+    for campo, inteiro, _, _ in CAMPOS_POR_TIPO[tipo]:
+        colunas[campo] = "int64" if inteiro else float
+    return pd.DataFrame({c: pd.Series(dtype=t) for c, t in colunas.items()})
+
+
+def _validar_conjunto(rotas, veiculos, faixas):
+    """Validações que dependem do arquivo inteiro."""
+    erros = []
+    repetidas = rotas.duplicated(["mes_ref", "rota"], keep="first")
+    erros += [
+        {"linha": l, "campo": "rota", "erro": "rota repetida no mesmo mês"}
+        for l in rotas.loc[repetidas, "_linha"]
+    ]
+    aux_por_mes = rotas.groupby("mes_ref")["aux_total"].transform("first")
+    divergente = rotas["aux_total"] != aux_por_mes
+    erros += [
+        {"linha": l, "campo": "aux_total", "erro": "aux_total diferente das outras rotas do mês"}
+        for l in rotas.loc[divergente, "_linha"]
+    ]
+    chaves = pd.MultiIndex.from_frame(rotas[["mes_ref", "rota"]])
+    for tabela in (veiculos, faixas):
+        orfa = ~pd.MultiIndex.from_frame(tabela[["mes_ref", "rota"]]).isin(chaves)
+        erros += [
+            {"linha": l, "campo": "rota", "erro": "sem linha do tipo 'rota' para este mês e rota"}
+            for l in tabela.loc[orfa, "_linha"]
+        ]
+    return erros
+
+
+def calcular_importacao(rotas, veiculos, faixas, centavos=CENTAVOS_PADRAO) -> pd.DataFrame:
+    """
+    Divide o auxílio de cada mês e calcula todas as rotas em lote; com
+    centavos=True usa o cálculo exato em centavos (ver calculo.py).
+    """
+    rotas = rotas.reset_index(drop=True)
+    meses, idx_mes = np.unique(rotas["mes_ref"].to_numpy(), return_inverse=True)
+    posicao = rotas.groupby("mes_ref", sort=False).cumcount().to_numpy()
+
+    # Matriz (meses, rotas) com zeros onde o mês não tem a rota: rotas sem
+    # diárias não recebem nem alteram o auxílio das demais.
+    diarias = np.zeros((len(meses), posicao.max() + 1), dtype=np.int64)
+    diarias[idx_mes, posicao] = rotas["diarias"].to_numpy()
+    aux_total = np.zeros(len(meses))
+    aux_total[idx_mes] = rotas["aux_total"].to_numpy()
+    if centavos:
+        auxilios = para_reais(distribuir_auxilio_centavos(para_centavos(aux_total), diarias))
+    else:
+        auxilios = distribuir_auxilio_rotas(aux_total, diarias)
+
+    rotas = rotas.assign(aux_recebido=auxilios[idx_mes, posicao])
+    if centavos:
+        return centavos_para_reais(calcular_rotas_centavos(rotas, veiculos, faixas))
+    return calcular_rotas_lote(rotas, veiculos, faixas)
+
+
+def importar(arquivo, nome=None, backend=None, gravar=True, tamanho_bloco=TAMANHO_BLOCO, centavos=CENTAVOS_PADRAO) -> dict:
+    """
+    Valida, calcula e (se não houver erros e gravar=True) grava no histórico.
+    Retorna {"erros": DataFrame, "resultados": DataFrame, "gravados": int}.
+    """
+    partes = {t: [] for t in CAMPOS_POR_TIPO}
+    erros = []
+    try:
+        for bloco in ler_blocos(arquivo, nome, tamanho_bloco):
+            validos, erros_bloco = validar_bloco(bloco)
+            erros += erros_bloco
+            for t, df in validos.items():
+                partes[t].append(df)
+    except (pd.errors.EmptyDataError, pd.errors.ParserError, csv.Error, ValueError) as e:
+        erros.append({"linha": None, "campo": None, "erro": f"arquivo ilegível: {e}"})
+    except ImportError as e:
+        erros.append({"linha": None, "campo": None, "erro": f"leitura de Excel indisponível ({e}); use CSV"})
+
+    tabelas = {
+        t: pd.concat(dfs, ignore_index=True) if dfs else _tabela_vazia(t)
+        for t, dfs in partes.items()
+    }
+    rotas, veiculos, faixas = tabelas["rota"], tabelas["veiculo"], tabelas["faixa"]
+    if rotas.empty and not erros:
+        erros.append({"linha": None, "campo": "tipo", "erro": "nenhuma linha do tipo 'rota' encontrada"})
+    erros += _validar_conjunto(rotas, veiculos, faixas)
+
+    relatorio_erros = pd.DataFrame(erros, columns=["linha", "campo", "erro"])
+    if not relatorio_erros.empty:
+        relatorio_erros = relatorio_erros.sort_values("linha", kind="stable").head(MAX_ERROS).reset_index(drop=True)
+        return {"erros": relatorio_erros, "resultados": pd.DataFrame(), "gravados": 0}
+
+    faixas = consolidar_descontos(faixas)
+
+    resultados = calcular_importacao(rotas, veiculos, faixas, centavos)
+    gravados = 0
+    if gravar:
+        registros = [
+            montar_registro(linha["mes_ref"], linha["rota"], dados)
+            for linha, dados in zip(
+                resultados[["mes_ref", "rota"]].to_dict("records"),
+                resultados_lote_como_dicts(resultados, faixas),
+            )
+        ]
+        (backend or obter_backend()).salvar_registros(registros)
+        gravados = len(registros)
+    return {"erros": relatorio_erros, "resultados": resultados, "gravados": gravados}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Importa dados mensais das rotas para o histórico.")
+    parser.add_argument("arquivo", help="CSV ou Excel no formato descrito em importacao.py")
+    parser.add_argument("--simular", action="store_true", help="valida e calcula sem gravar")
+    parser.add_argument(
+        "--centavos", action=argparse.BooleanOptionalAction, default=CENTAVOS_PADRAO,
+        help="cálculo exato em centavos (--no-centavos: em float)",
+    )
+    args = parser.parse_args()
+
+    saida = importar(args.arquivo, args.arquivo, gravar=not args.simular, centavos=args.centavos)
+    if not saida["erros"].empty:
+        print(saida["erros"].to_string(index=False))
+        raise SystemExit(f"{len(saida['erros'])} erro(s) encontrado(s); nada foi gravado.")
+    print(f"{len(saida['resultados'])} rota-mês calculadas; {saida['gravados']} gravadas no histórico.")
@@ -0,0 +1,230 @@
+import numpy as np
+import pandas as pd
+
+from calculo import (
+    CHAVE,
+    calcular_peso_alunos,
+    calcular_peso_alunos_lote,
+    calcular_rotas_centavos,
+    calcular_rotas_lote,
+    distribuir_auxilio_centavos,
+    distribuir_auxilio_rotas,
+    dividir_arredondado,
+    para_centavos,
+    para_reais,
+)
+
+# ============================================================
+# METAS DE MENSALIDADE (CÁLCULO INVERSO)
+# ============================================================
+# Dada a mensalidade média desejada em cada rota, encontra o valor de
+# uma entrada que a produz, mantendo as demais no último cálculo:
+#
+#   mensalidade = (bruto - passagens - aux_recebido) / peso_alunos
+#   aux_recebido = aux_total * cota(diárias)
+#
+# Para aux_total > 0 a divisão do auxílio é linear (a cota só depende das
+# diárias), então no cálculo em float tudo tem forma fechada:
+#   - auxílio total do mês: (bruto - passagens - meta·peso) / cota;
+#   - passagens: bruto - aux_recebido - meta·peso;
+#   - desconto único: percentual que, aplicado a todos os alunos com
+#     desconto, dá o peso valor_final / meta.
+# No cálculo exato em centavos os arredondamentos e o maior resto tornam
+# a mensalidade uma escada em aux_total; ali o auxílio é achado por
+# bissecção sobre os centavos, todos os meses ao mesmo tempo.
+#
+# Os arrays são (meses, rotas); rota ausente no mês = NaN nas entradas.
+# NaN na resposta = meta inatingível por aquela entrada (rota sem
+# diárias ou sem alunos, passagens ou percentual fora do possível).
+# Auxílio 0 = a rota já fica na meta, ou abaixo, sem auxílio.
+
+
+def _sem_aviso_nanmax(valores) -> np.ndarray:
+    maximo = np.where(np.isnan(valores), -np.inf, valores).max(axis=1)
+    return np.where(np.isneginf(maximo), np.nan, maximo)
+
+
+def aux_total_para_meta(bruto, passagens, peso, diarias, meta):
+    """
+    Retorna (por_rota, por_mes): o auxílio total do mês que leva cada rota
+    exatamente à meta e, por mês, o menor que deixa todas as rotas na
+    meta ou abaixo (o maior entre as rotas).
+    """
+    d = np.nan_to_num(np.asarray(diarias, dtype=float)).astype(np.int64)
+    cota = distribuir_auxilio_rotas(np.ones(d.shape[0]), d)
+    necessario = np.asarray(bruto) - np.asarray(passagens) - np.asarray(meta) * np.asarray(peso)
+
+    valida = (cota > 0) & (np.asarray(peso) > 0) & ~np.isnan(necessario)
+    por_rota = np.full(d.shape, np.nan)
+    por_rota[valida] = np.maximum(necessario[valida] / cota[valida], 0.0)
+    return por_rota, _sem_aviso_nanmax(por_rota)
+
+
+def passagens_para_meta(bruto, aux_recebido, peso, meta) -> np.ndarray:
+    passagens = np.asarray(bruto) - np.asarray(aux_recebido) - np.asarray(meta) * np.asarray(peso)
+    return np.where((np.asarray(peso) > 0) & (passagens >= 0), passagens, np.nan)
+
+
+def desconto_para_meta(valor_final, alunos_integrais, alunos_desconto, meta) -> np.ndarray:
+    """Percentual único (0–100) para todos os alunos com desconto."""
+    valor_final = np.asarray(valor_final, dtype=float)
+    integrais = np.asarray(alunos_integrais, dtype=float)
+    n_desc = np.asarray(alunos_desconto, dtype=float)
+    meta = np.asarray(meta, dtype=float)
+
+    pct = np.full(np.broadcast(valor_final, meta).shape, np.nan)
+    valido = (n_desc > 0) & (meta > 0)
+    np.divide(valor_final, meta, out=pct, where=valido)
+    np.subtract(pct, integrais, out=pct, where=valido)
+    np.divide(pct, n_desc, out=pct, where=valido)
+    pct = 100 * (1 - pct)
+    return np.where(valido & (pct >= 0) & (pct <= 100), pct, np.nan)
+
+
+def bisseccao_inteira(satisfaz, inferior, superior) -> np.ndarray:
+    """
+    Menor x inteiro em (inferior, superior] com satisfaz(x), linha a linha.
+    satisfaz recebe e devolve arrays (m,); exige satisfaz(superior)
+    verdadeiro e satisfaz(inferior) falso.
+    """
+    lo = np.asarray(inferior, dtype=np.int64).copy()
+    hi = np.asarray(superior, dtype=np.int64).copy()
+    while True:
+        aberto = hi - lo > 1
+        if not aberto.any():
+            return hi
+        meio = lo + (hi - lo) // 2
+        ok = satisfaz(meio)
+        hi = np.where(aberto & ok, meio, hi)
+        lo = np.where(aberto & ~ok, meio, lo)
+
+
+def aux_total_exato_para_meta(bruto, passagens, peso, diarias, meta, estimativa=None) -> np.ndarray:
+    """
+    Menor auxílio total do mês, em centavos (float, NaN se inatingível),
+    que deixa todas as rotas na meta ou abaixo no cálculo exato
+    (calcular_rotas_centavos). estimativa: por_mes de aux_total_para_meta.
+    """
+    if estimativa is None:
+        estimativa = aux_total_para_meta(bruto, passagens, peso, diarias, meta)[1]
+    d = np.nan_to_num(np.asarray(diarias, dtype=float)).astype(np.int64)
+    peso = np.nan_to_num(np.asarray(peso, dtype=float))
+    bruto_c = para_centavos(np.nan_to_num(bruto))
+    passagens_c = para_centavos(np.nan_to_num(passagens))
+    peso_100 = np.rint(peso * 100).astype(np.int64)
+    meta_c = para_centavos(np.nan_to_num(meta))
+    considerar = (d > 0) & (peso_100 > 0) & ~np.isnan(np.asarray(meta, dtype=float))
+
+    def satisfaz(aux_c):
+        aux_rotas = distribuir_auxilio_centavos(aux_c, d)
+        valor_final = bruto_c - passagens_c - aux_rotas
+        mensalidade = dividir_arredondado(valor_final * 100, np.maximum(peso_100, 1))
+        return ((mensalidade <= meta_c) | ~considerar).all(axis=1)
+
+    atingivel = ~np.isnan(estimativa)
+    # Folga de 1 real por rota sobre a estimativa em float cobre os
+    # arredondamentos; se não bastar, o teto dobra.
+    superior = para_centavos(np.nan_to_num(estimativa)) + 100 * d.shape[1]
+    for _ in range(8):
+        faltando = atingivel & ~satisfaz(superior)
+        if not faltando.any():
+            break
+        superior = np.where(faltando, superior * 2, superior)
+    else:
+        atingivel &= satisfaz(superior)
+
+    zero_basta = satisfaz(np.zeros(len(superior), dtype=np.int64))
+    resposta = bisseccao_inteira(satisfaz, np.full(len(superior), -1), superior)
+    resposta = np.where(zero_basta, 0, resposta)
+    return np.where(atingivel, resposta.astype(float), np.nan)
+
+
+def resolver_metas(m: dict, meta, exato=False) -> dict:
+    """
+    m: arrays (meses, rotas) bruto, passagens, aux_recebido, peso,
+    diarias, valor_final, alunos_integrais, alunos_desconto e, para o
+    modo exato, opcionalmente bruto_exato (o bruto de
+    calcular_rotas_centavos, em R$, que arredonda veículo a veículo).
+    Retorna arrays (meses, rotas), exceto os auxílios do mês (meses,).
+    """
+    meta = np.broadcast_to(np.asarray(meta, dtype=float), np.shape(m["bruto"]))
+    aux_rota, aux_mes = aux_total_para_meta(m["bruto"], m["passagens"], m["peso"], m["diarias"], meta)
+    resposta = {
+        "aux_total_rota": aux_rota,
+        "aux_total": aux_mes,
+        "passagens": passagens_para_meta(m["bruto"], m["aux_recebido"], m["peso"], meta),
+        "desconto_pct": desconto_para_meta(m["valor_final"], m["alunos_integrais"], m["alunos_desconto"], meta),
+    }
+    if exato:
+        bruto = m.get("bruto_exato", m["bruto"])
+        centavos = aux_total_exato_para_meta(bruto, m["passagens"], m["peso"], m["diarias"], meta, aux_mes)
+        resposta["aux_total_exato"] = centavos / 100
+    return resposta
+
+# ============================================================
+# TABELAS
+# ============================================================
+def metas_lote(rotas, veiculos, descontos, meta, exato=False, chave=CHAVE) -> pd.DataFrame:
+    """
+    Mesmas tabelas de calcular_rotas_lote; o primeiro campo da chave é o
+    mês e o segundo a rota. meta: escalar, array por linha ou
+    {rota: meta}. Uma linha por rota-mês com a mensalidade atual, a meta
+    e as entradas que a atingem (aux_total_exato com exato=True).
+    """
+    mes, rota = chave
+    res = calcular_rotas_lote(rotas, veiculos, descontos, chave)
+    if isinstance(meta, dict):
+        meta = res[rota].map(meta).to_numpy(dtype=float)
+    meta = np.broadcast_to(np.asarray(meta, dtype=float), (len(res),))
+
+    i, meses = pd.factorize(res[mes])
+    j, nomes = pd.factorize(res[rota])
+
+    def matriz(valores):
+        saida = np.full((len(meses), len(nomes)), np.nan)
+        saida[i, j] = valores
+        return saida
+
+    m = {campo: matriz(res[campo].to_numpy(dtype=float)) for campo in (
+        "bruto", "passagens", "aux_recebido", "diarias", "valor_final", "alunos_integrais",
+    )}
+    m["alunos_desconto"] = matriz(res["alunos_desconto_total"].to_numpy(dtype=float))
+    m["peso"] = matriz(calcular_peso_alunos_lote(rotas, descontos, chave))
+    if exato:
+        m["bruto_exato"] = matriz(para_reais(calcular_rotas_centavos(rotas, veiculos, descontos, chave)["bruto"]))
+    resposta = resolver_metas(m, matriz(meta), exato)
+
+    tabela = res[[mes, rota, "mensalidade_media"]].assign(
+        meta=meta,
+        aux_total_atual=np.bincount(i, weights=res["aux_recebido"].to_numpy(dtype=float))[i],
+    )
+    for campo, valores in resposta.items():
+        tabela[campo] = valores[i, j] if np.ndim(valores) == 2 else valores[i]
+    return tabela
+
+
+def metas_do_resultado(r: dict, meta, exato=False) -> pd.DataFrame:
+    """Metas para o resultado guardado na sessão (um mês, todas as rotas)."""
+    nomes = list(r["rotas"])
+    if isinstance(meta, dict):
+        meta = [meta[n] for n in nomes]
+    rotas = r["rotas"].values()
+    m = {
+        campo: np.array([[res[campo] for res in rotas]], dtype=float)
+        for campo in ("bruto", "passagens", "aux_recebido", "diarias", "valor_final", "alunos_integrais")
+    }
+    m["alunos_desconto"] = np.array([[res["alunos_desconto_total"] for res in rotas]], dtype=float)
+    m["peso"] = np.array(
+        [[calcular_peso_alunos(res["alunos_integrais"], res.get("descontos", {})) for res in rotas]]
+    )
+    resposta = resolver_metas(m, np.asarray(meta, dtype=float).reshape(1, -1), exato)
+
+    tabela = pd.DataFrame({
+        "rota": nomes,
+        "mensalidade_media": [res["mensalidade_media"] for res in rotas],
+        "meta": np.broadcast_to(np.asarray(meta, dtype=float), (len(nomes),)),
+        "aux_total_atual": sum(res["aux_recebido"] for res in rotas),
+    })
+    for campo, valores in resposta.items():
+        tabela[campo] = valores[0]
+    return tabela
@@ -0,0 +1,203 @@
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# ============================================================
+# MÉTRICAS DE TEMPO POR ETAPA
+# ============================================================
+# Cada etapa instrumentada (cálculo, histórico, gráficos, QR Code, PDF)
+# acumula suas durações num histograma de baldes fixos, no estilo do
+# Prometheus. Os histogramas são do processo: todas as sessões do
+# Streamlit somam nos mesmos. Os processos da fila de PDF devolvem as
+# medições junto com o resultado (executar_e_drenar / mesclar).
+#
+# Exportação para o coletor local: com ASSEUF_METRICAS_ARQUIVO definido,
+# o arquivo é regravado no máximo a cada ASSEUF_METRICAS_INTERVALO
+# segundos. Extensão .prom gera o formato texto do Prometheus (regravado
+# por inteiro, de forma atômica); qualquer outra acrescenta linhas JSON.
+BALDES = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+ARQUIVO = os.environ.get("ASSEUF_METRICAS_ARQUIVO")
+INTERVALO = float(os.environ.get("ASSEUF_METRICAS_INTERVALO", 15))
+
+_lock = threading.Lock()
+_histogramas = {}
+_ultima_exportacao = 0.0
+
+
+def _novo_histograma() -> dict:
+    # contagens[i] conta as durações <= BALDES[i]; a última posição é o +Inf.
+    return {"contagens": [0] * (len(BALDES) + 1), "soma": 0.0, "contagem": 0, "min": None, "max": None}
+
+
+def registrar(etapa: str, segundos: float):
+    with _lock:
+        h = _histogramas.get(etapa)
+        if h is None:
+            h = _histogramas[etapa] = _novo_histograma()
+        i = 0
+        while i < len(BALDES) and segundos > BALDES[i]:
+            i += 1
+        h["contagens"][i] += 1
+        h["soma"] += segundos
+        h["contagem"] += 1
+        h["min"] = segundos if h["min"] is None else min(h["min"], segundos)
+        h["max"] = segundos if h["max"] is None else max(h["max"], segundos)
+    if ARQUIVO:
+        _exportar_se_preciso()
+
+
+@contextmanager
+def medir(etapa: str):
+    """Mede o bloco (ou a função, se usado como decorador) na etapa dada."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(etapa, time.perf_counter() - inicio)
+
+
+def instantaneo() -> dict:
+    """Cópia dos histogramas: {etapa: histograma}."""
+    with _lock:
+        return {etapa: {**h, "contagens": list(h["contagens"])} for etapa, h in _histogramas.items()}
+
+
+def zerar():
+    with _lock:
+        _histogramas.clear()
+
+
+def drenar() -> dict:
+    """Devolve os histogramas e zera os do processo."""
+    with _lock:
+        dados = dict(_histogramas)
+        _histogramas.clear()
+    return dados
+
+
+def mesclar(dados: dict):
+    """Soma histogramas vindos de outro processo (ver drenar)."""
+    with _lock:
+        for etapa, outro in dados.items():
+            h = _histogramas.get(etapa)
+            if h is None:
+                h = _histogramas[etapa] = _novo_histograma()
+            h["contagens"] = [a + b for a, b in zip(h["contagens"], outro["contagens"])]
+            h["soma"] += outro["soma"]
+            h["contagem"] += outro["contagem"]
+            for campo, escolher in (("min", min), ("max", max)):
+                if outro[campo] is not None:
+                    h[campo] = outro[campo] if h[campo] is None else escolher(h[campo], outro[campo])
+
+
+def executar_e_drenar(funcao, *args):
+    """Para pools de processos: retorna (resultado, medições do job)."""
+    global ARQUIVO
+    ARQUIVO = None  # quem exporta é o processo que recebe as medições
+    drenar()
+    resultado = funcao(*args)
+    return resultado, drenar()
+
+
+def percentil(h: dict, q: float):
+    """
+    Estimativa do percentil q (0–1) pelos baldes, com interpolação linear
+    dentro do balde, como o histogram_quantile do Prometheus.
+    """
+    if not h["contagem"]:
+        return None
+    alvo = q * h["contagem"]
+    acumulado = 0
+    for i, contagem in enumerate(h["contagens"]):
+        if contagem and acumulado + contagem >= alvo:
+            if i == len(BALDES):
+                return h["max"]
+            inferior = BALDES[i - 1] if i > 0 else 0.0
+            valor = inferior + (BALDES[i] - inferior) * (alvo - acumulado) / contagem
+            return min(max(valor, h["min"]), h["max"])
+        acumulado += contagem
+    return h["max"]
+
+
+def resumo() -> list:
+    """Uma linha por etapa, em segundos, para exibição."""
+    linhas = []
+    for etapa, h in sorted(instantaneo().items()):
+        linhas.append({
+            "etapa": etapa,
+            "contagem": h["contagem"],
+            "total_s": h["soma"],
+            "media_s": h["soma"] / h["contagem"],
+            "p50_s": percentil(h, 0.50),
+            "p90_s": percentil(h, 0.90),
+            "p99_s": percentil(h, 0.99),
+            "max_s": h["max"],
+        })
+    return linhas
+
+# ============================================================
+# EXPORTAÇÃO
+# ============================================================
+def exportar_prometheus() -> str:
+    nome = "asseuf_etapa_segundos"
+    linhas = [
+        f"# HELP {nome} Duração de cada etapa do sistema de rotas, em segundos.",
+        f"# TYPE {nome} histogram",
+    ]
+    pid = os.getpid()
+    for etapa, h in sorted(instantaneo().items()):
+        rotulos = f'etapa="{etapa}",pid="{pid}"'
+        acumulado = 0
+        for limite, contagem in zip([*map(repr, BALDES), "+Inf"], h["contagens"]):
+            acumulado += contagem
+            linhas.append(f'{nome}_bucket{{{rotulos},le="{limite}"}} {acumulado}')
+        linhas.append(f"{nome}_sum{{{rotulos}}} {h['soma']!r}")
+        linhas.append(f"{nome}_count{{{rotulos}}} {h['contagem']}")
+    return "\n".join(linhas) + "\n"
+
+
+def exportar_jsonl() -> str:
+    ts = time.time()
+    pid = os.getpid()
+    return "".join(
+        json.dumps({"ts": ts, "pid": pid, "etapa": etapa, "baldes": list(BALDES), **h}) + "\n"
+        for etapa, h in sorted(instantaneo().items())
+    )
+
+
+def gravar_metricas(caminho=None):
+    caminho = caminho or ARQUIVO
+    if caminho.endswith(".prom"):
+        tmp = f"{caminho}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(exportar_prometheus())
+        os.replace(tmp, caminho)
+    else:
+        with open(caminho, "a", encoding="utf-8") as f:
+            f.write(exportar_jsonl())
+
+
+def _exportar_se_preciso():
+    global _ultima_exportacao
+    agora = time.monotonic()
+    with _lock:
+        if agora - _ultima_exportacao < INTERVALO:
+            return
+        _ultima_exportacao = agora
+    try:
+        gravar_metricas()
+    except OSError:
+        pass  # métricas nunca derrubam o cálculo
+
+
+@atexit.register
+def _exportar_ao_sair():
+    if ARQUIVO and _histogramas:
+        try:
+            gravar_metricas()
+        except OSError:
+            pass
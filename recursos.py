@@ -0,0 +1,137 @@
+import hashlib
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+
+# ============================================================
+# RECURSOS ESTÁTICOS (LOGO, CSS E FONTES)
+# ============================================================
+# Tudo é preparado uma vez por processo e reaproveitado por todas as
+# sessões e renderizações; nada depende de rede ao abrir o app ou gerar
+# um PDF.
+#   - Logo: lida e reduzida uma vez (2x a largura exibida, para telas de
+#     alta densidade) e guardada como bytes.
+#   - CSS do app: static/app.css, servido pelo próprio Streamlit
+#     (server.enableStaticServing em .streamlit/config.toml) e referenciado
+#     por <link> com a versão no endereço, então o navegador o guarda em
+#     cache. Sem o static serving, o conteúdo é embutido na página.
+#   - Fontes: arquivos OFL versionados em static/fontes (Inter, recortada
+#     para o alfabeto latino, em woff2; licença em Inter-OFL.txt). O mesmo
+#     conjunto vira @font-face para o app (static/fontes/fontes.css, gerado
+#     com `python recursos.py --gerar-css`) e para o PDF (caminhos file://,
+#     com um FontConfiguration do WeasyPrint reutilizado entre relatórios).
+RAIZ = Path(__file__).parent
+PASTA_ESTATICA = RAIZ / "static"
+PASTA_FONTES = PASTA_ESTATICA / "fontes"
+ARQUIVO_CSS = PASTA_ESTATICA / "app.css"
+ARQUIVO_CSS_FONTES = PASTA_FONTES / "fontes.css"
+ARQUIVO_LOGO = RAIZ / "logo.png"
+URL_ESTATICA = "app/static"
+
+LARGURA_LOGO = 220
+
+# (família, pesos, arquivo em static/fontes)
+FONTES = [
+    ("Inter", "300 700", "Inter.woff2"),
+]
+
+
+@lru_cache(maxsize=4)
+def logo_bytes(largura=LARGURA_LOGO * 2):
+    """
+    Logo reduzida para `largura` px, em bytes (None se não houver).
+    Sem transparência vira JPEG, bem menor que PNG para uma foto; com
+    transparência, PNG.
+    """
+    from PIL import Image
+
+    if not ARQUIVO_LOGO.exists():
+        return None
+    with Image.open(ARQUIVO_LOGO) as img:
+        img.thumbnail((largura, largura * 4))
+        buf = BytesIO()
+        if img.mode in ("RGBA", "LA", "P"):
+            img.save(buf, format="PNG", optimize=True)
+        else:
+            img.convert("RGB").save(buf, format="JPEG", quality=90, optimize=True, progressive=True)
+    return buf.getvalue()
+
+
+@lru_cache(maxsize=1)
+def fontes_disponiveis() -> tuple:
+    """Entradas de FONTES cujos arquivos existem em static/fontes."""
+    return tuple(f for f in FONTES if (PASTA_FONTES / f[2]).exists())
+
+
+def css_font_face(url_base: str) -> str:
+    """Regras @font-face das fontes disponíveis, com url_base + arquivo."""
+    return "".join(
+        f"@font-face {{ font-family: '{familia}'; font-weight: {pesos}; font-style: normal; "
+        f"font-display: swap; src: url('{url_base}{arquivo}') format('woff2'); }}\n"
+        for familia, pesos, arquivo in fontes_disponiveis()
+    )
+
+
+@lru_cache(maxsize=1)
+def css_app() -> str:
+    """
+    Conteúdo do CSS do app, para embutir quando não há static serving.
+    Sem static serving as fontes locais não são alcançáveis e valem as do
+    sistema, listadas em app.css.
+    """
+    return ARQUIVO_CSS.read_text(encoding="utf-8")
+
+
+@lru_cache(maxsize=1)
+def versao_css() -> str:
+    """Muda quando o CSS ou as fontes mudam; vai na URL para furar o cache."""
+    conteudo = ARQUIVO_CSS.read_bytes() + repr(fontes_disponiveis()).encode()
+    return hashlib.sha256(conteudo).hexdigest()[:12]
+
+
+def links_css() -> str:
+    """Tags <link> dos CSS estáticos (fontes e app)."""
+    v = versao_css()
+    return (
+        f'<link rel="stylesheet" href="{URL_ESTATICA}/fontes/fontes.css?v={v}">'
+        f'<link rel="stylesheet" href="{URL_ESTATICA}/app.css?v={v}">'
+    )
+
+# ============================================================
+# FONTES DO PDF (WEASYPRINT)
+# ============================================================
+@lru_cache(maxsize=1)
+def configuracao_fontes():
+    from weasyprint.text.fonts import FontConfiguration
+
+    return FontConfiguration()
+
+
+@lru_cache(maxsize=1)
+def folha_fontes_pdf():
+    """CSS do WeasyPrint com as @font-face locais, já ligado a configuracao_fontes()."""
+    from weasyprint import CSS
+
+    return CSS(string=css_font_face(PASTA_FONTES.as_uri() + "/"), font_config=configuracao_fontes())
+
+# ============================================================
+# CSS DAS FONTES DO APP
+# ============================================================
+def gerar_css_fontes():
+    """Regrava static/fontes/fontes.css a partir de FONTES (após trocar as fontes)."""
+    fontes_disponiveis.cache_clear()
+    # Relativo ao próprio fontes.css, que fica na mesma pasta.
+    ARQUIVO_CSS_FONTES.write_text(css_font_face(""), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recursos estáticos do app.")
+    parser.add_argument("--gerar-css", action="store_true", help="regrava static/fontes/fontes.css")
+    args = parser.parse_args()
+    if args.gerar_css:
+        gerar_css_fontes()
+    for familia, pesos, arquivo in FONTES:
+        status = "ok" if (PASTA_FONTES / arquivo).exists() else "ausente"
+        print(f"{familia:15s} {pesos:8s} {arquivo:22s} {status}")
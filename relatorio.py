@@ -0,0 +1,135 @@
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from cache_pdf import CachePDF, chave_relatorio
+from metricas import medir
+from recursos import configuracao_fontes, folha_fontes_pdf
+
+# qrcode, Jinja2 e WeasyPrint são importados dentro das funções: importar
+# este módulo (app, fila de PDF, scripts) não carrega as bibliotecas de
+# renderização até o primeiro relatório.
+
+# ============================================================
+# QR CODE
+# ============================================================
+# Os códigos são memoizados pelo texto: relatórios repetidos (reruns,
+# geração em lote) não refazem a codificação. O SVG é embutido direto no
+# HTML do relatório, sem ida e volta por PNG. Só as codificações de fato
+# (não os acertos do cache) entram nas métricas.
+@lru_cache(maxsize=256)
+@medir("gerar_qr_svg")
+def gerar_qr_svg(texto: str) -> str:
+    import qrcode
+    import qrcode.image.svg
+
+    qr = qrcode.QRCode(box_size=4, border=1, image_factory=qrcode.image.svg.SvgPathImage)
+    qr.add_data(texto)
+    qr.make(fit=True)
+    return qr.make_image().to_string(encoding="unicode")
+
+# ============================================================
+# RELATÓRIO PDF
+# ============================================================
+# Altere TEMPLATE_VERSAO sempre que o layout do relatório mudar: ela faz
+# parte da chave do cache, então PDFs antigos deixam de ser servidos.
+TEMPLATE_VERSAO = "2026.10-3"
+
+# O HTML vem do template Jinja2 templates/relatorio.html, compilado uma
+# vez por processo; o CSS (templates/relatorio.css) é interpretado uma
+# vez num objeto CSS do WeasyPrint e reaproveitado, junto com as fontes
+# e a configuração de fontes de recursos.py, por todos os relatórios.
+# As colunas seguem as rotas do resultado (r["rotas"]); resultados
+# antigos, só com r["sete"] e r["cur"], usam as ROTAS.
+PASTA_TEMPLATES = Path(__file__).parent / "templates"
+
+# (rótulo, campo, destaque) das linhas do resumo financeiro
+ETAPAS_RELATORIO = [
+    ("Custo bruto", "bruto", False),
+    ("Passagens arrecadadas", "passagens", False),
+    ("(-) 10% das passagens", "dez_porcento", False),
+    ("Custo após 10%", "bruto_aj_10", False),
+    ("(-) Auxílio recebido", "aux_recebido", False),
+    ("Valor após auxílio", "pos_aux", False),
+    ("(-) 90% das passagens", "noventa_porcento", False),
+    ("Valor final", "valor_final", True),
+]
+CAMPOS_TOTAIS = [campo for _, campo, _ in ETAPAS_RELATORIO] + [
+    "alunos_integrais",
+    "alunos_desconto_total",
+    "veiculos_qtd",
+    "diarias",
+]
+
+
+def fmt_brl(val):
+    try:
+        return f"R$ {float(val):,.2f}"
+    except Exception:
+        return "R$ 0,00"
+
+
+@lru_cache(maxsize=1)
+def _template():
+    from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+    ambiente = Environment(
+        loader=FileSystemLoader(PASTA_TEMPLATES),
+        autoescape=select_autoescape(["html"]),
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+    ambiente.filters["brl"] = fmt_brl
+    return ambiente.get_template("relatorio.html")
+
+
+@lru_cache(maxsize=1)
+def _folha_relatorio():
+    from weasyprint import CSS
+
+    return CSS(filename=str(PASTA_TEMPLATES / "relatorio.css"), font_config=configuracao_fontes())
+
+
+def rotas_do_resultado(r: dict) -> dict:
+    """{nome: dados_de_calcular_rota}, na ordem do cálculo."""
+    if r.get("rotas"):
+        return r["rotas"]
+    from calculo import ROTAS
+
+    return {rota["nome"]: r[rota["chave"]] for rota in ROTAS if rota["chave"] in r}
+
+
+def html_relatorio(r: dict) -> str:
+    rotas = rotas_do_resultado(r)
+    mes_ref = r.get("mes_ref", "")
+    resumo_qr = " | ".join(
+        [f"ASSEUF - {mes_ref or 'Mês não informado'}"]
+        + [f"{nome}: R$ {dados['valor_final']:,.2f}" for nome, dados in rotas.items()]
+    )
+    return _template().render(
+        mes_ref=mes_ref,
+        qr_svg=gerar_qr_svg(resumo_qr),
+        rotas=rotas,
+        etapas=ETAPAS_RELATORIO,
+        totais={campo: sum(dados[campo] for dados in rotas.values()) for campo in CAMPOS_TOTAIS},
+        gerado_em=datetime.now().strftime("%d/%m/%Y %H:%M"),
+    )
+
+
+@medir("gerar_pdf_profissional")
+def gerar_pdf_profissional(r: dict) -> bytes:
+    from weasyprint import HTML
+
+    return HTML(string=html_relatorio(r)).write_pdf(
+        stylesheets=[folha_fontes_pdf(), _folha_relatorio()],
+        font_config=configuracao_fontes(),
+    )
+
+
+cache_relatorios = CachePDF()
+
+
+def gerar_pdf_em_cache(r: dict) -> bytes:
+    """Igual a gerar_pdf_profissional, reaproveitando PDFs já gerados."""
+    chave = chave_relatorio(r, TEMPLATE_VERSAO)
+    return cache_relatorios.obter_ou_gerar(chave, lambda: gerar_pdf_profissional(r))
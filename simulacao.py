@@ -0,0 +1,272 @@
+"""
+Simulação de Monte Carlo da mensalidade do próximo mês.
+
+    python simulacao.py --amostras 1000000 --semente 2026
+    python simulacao.py --aux-total 12000 --workers 4
+
+Para cada rota, distribuições são ajustadas ao histórico (um registro por
+mês, o mais recente):
+    passagens          log-normal (média e desvio do log)
+    diárias            normal arredondada, truncada em zero
+    alunos integrais   normal arredondada, truncada em zero
+    alunos c/ desconto normal arredondada, truncada em zero
+As variáveis são sorteadas de forma independente. O custo dos veículos
+acompanha as diárias (custo por diária do último mês) e o peso de cada
+aluno com desconto é o do último mês (valor_final / mensalidade_media).
+Com menos de dois meses de histórico, a variável fica fixa no último valor.
+
+As amostras são geradas em blocos de tamanho fixo, cada um com a sua
+semente derivada por numpy.random.SeedSequence(semente).spawn: o
+resultado depende só da semente, do número de amostras e do tamanho do
+bloco, não do número de processos. Cada bloco passa, vetorizado, pela
+divisão do auxílio (distribuir_auxilio_rotas) e pelo cálculo da rota. Os
+processos são criados uma vez e reaproveitados entre simulações.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from calculo import distribuir_auxilio_rotas
+from historico import periodo_mes_ref
+
+AMOSTRAS_PADRAO = 100_000
+TAMANHO_BLOCO = 50_000
+SEMENTE_PADRAO = 2026
+PERCENTIS = (5, 25, 50, 75, 95)
+SIM_WORKERS = int(os.environ.get("ASSEUF_SIM_WORKERS", os.cpu_count() or 1))
+
+# ============================================================
+# AJUSTE DAS DISTRIBUIÇÕES
+# ============================================================
+def _normal(valores) -> tuple:
+    v = np.asarray(valores, dtype=float)
+    return (float(v.mean()), float(v.std(ddof=1)) if len(v) > 1 else 0.0)
+
+
+def ajustar_modelo(historico: pd.DataFrame) -> dict:
+    """
+    {rota: parâmetros} a partir do histórico (colunas de historico.COLUNAS).
+    Rotas sem nenhum registro não entram.
+    """
+    if historico.empty:
+        return {}
+    # Recalcular um mês gera outra linha: vale a mais recente. Depois, ordem
+    # cronológica, para que o último registro de cada rota seja o último
+    # mês (meses em formato não reconhecido vão para o começo).
+    mensal = historico.drop_duplicates(subset=["mes_ref", "rota"], keep="last")
+    mensal = mensal.assign(_periodo=mensal["mes_ref"].map(periodo_mes_ref))
+    mensal = mensal.sort_values("_periodo", na_position="first", kind="stable")
+    modelo = {}
+    for rota, h in mensal.groupby("rota", sort=False):
+        ultimo = h.iloc[-1]
+        passagens = h["passagens"].to_numpy(dtype=float)
+        if len(passagens) > 1 and (passagens > 0).all():
+            log = np.log(passagens)
+            dist_passagens = ("lognormal", float(log.mean()), float(log.std(ddof=1)))
+        else:
+            dist_passagens = ("fixo", float(ultimo["passagens"]), 0.0)
+
+        custo_diaria = ultimo["bruto"] / ultimo["diarias"] if ultimo["diarias"] > 0 else 0.0
+        fator_desconto = 1.0
+        if ultimo["alunos_desconto_total"] > 0 and ultimo["mensalidade_media"] != 0:
+            peso = ultimo["valor_final"] / ultimo["mensalidade_media"]
+            fator_desconto = (peso - ultimo["alunos_integrais"]) / ultimo["alunos_desconto_total"]
+            fator_desconto = float(np.clip(fator_desconto, 0.0, 1.0))
+
+        modelo[rota] = {
+            "passagens": dist_passagens,
+            "diarias": _normal(h["diarias"]),
+            "alunos_integrais": _normal(h["alunos_integrais"]),
+            "alunos_desconto": _normal(h["alunos_desconto_total"]),
+            "custo_diaria": float(custo_diaria),
+            "fator_desconto": fator_desconto,
+            "aux_recebido": float(ultimo["aux_recebido"]),
+            "meses": len(h),
+        }
+    return modelo
+
+
+def tabela_modelo(modelo: dict) -> pd.DataFrame:
+    """Parâmetros ajustados, uma linha por rota (para exibir e auditar)."""
+    linhas = []
+    for rota, p in modelo.items():
+        tipo, a, b = p["passagens"]
+        linhas.append({
+            "rota": rota,
+            "meses": p["meses"],
+            "passagens": f"log-normal(μ={a:.3f}, σ={b:.3f})" if tipo == "lognormal" else f"fixo {a:,.2f}",
+            "diarias": "normal(%.1f, %.1f)" % p["diarias"],
+            "alunos_integrais": "normal(%.1f, %.1f)" % p["alunos_integrais"],
+            "alunos_desconto": "normal(%.1f, %.1f)" % p["alunos_desconto"],
+            "custo_diaria": p["custo_diaria"],
+            "fator_desconto": p["fator_desconto"],
+        })
+    return pd.DataFrame(linhas)
+
+# ============================================================
+# SIMULAÇÃO
+# ============================================================
+_executor = None
+_executor_workers = 0
+_lock_executor = threading.Lock()
+
+
+def _obter_executor(workers: int) -> ProcessPoolExecutor:
+    """Pool compartilhado; só é recriado se mudar o nº de processos."""
+    global _executor, _executor_workers
+    with _lock_executor:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            # "spawn" pelo mesmo motivo da fila de PDF: não herdar as
+            # threads do servidor Streamlit.
+            _executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+            _executor_workers = workers
+        return _executor
+
+
+def _descartar_executor(executor):
+    global _executor
+    with _lock_executor:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def _contagem(rng, parametros, n) -> np.ndarray:
+    media, desvio = parametros
+    return np.maximum(np.rint(rng.normal(media, desvio, n)), 0).astype(np.int64)
+
+
+def simular_bloco(semente, n: int, modelo: dict, aux_total: float) -> dict:
+    """Sorteia n meses e calcula todas as rotas; {rota: {campo: array (n,)}}."""
+    rng = np.random.default_rng(semente)
+    rotas = list(modelo)
+    passagens, diarias, integrais, desconto = [], [], [], []
+    for rota in rotas:
+        p = modelo[rota]
+        tipo, a, b = p["passagens"]
+        passagens.append(rng.lognormal(a, b, n) if tipo == "lognormal" else np.full(n, a))
+        diarias.append(_contagem(rng, p["diarias"], n))
+        integrais.append(_contagem(rng, p["alunos_integrais"], n))
+        desconto.append(_contagem(rng, p["alunos_desconto"], n))
+    passagens = np.column_stack(passagens)
+    diarias = np.column_stack(diarias)
+    integrais = np.column_stack(integrais)
+    desconto = np.column_stack(desconto)
+
+    custo_diaria = np.array([modelo[r]["custo_diaria"] for r in rotas])
+    fator = np.array([modelo[r]["fator_desconto"] for r in rotas])
+
+    # Mesma sequência de operações de calcular_rota.
+    aux_recebido = distribuir_auxilio_rotas(np.full(n, aux_total), diarias)
+    bruto = diarias * custo_diaria
+    dez_porcento = passagens * 0.10
+    bruto_aj_10 = bruto - dez_porcento
+    pos_aux = bruto_aj_10 - aux_recebido
+    noventa_porcento = passagens * 0.90
+    valor_final = pos_aux - noventa_porcento
+    peso = integrais + desconto * fator
+    mensalidade = np.zeros_like(valor_final)
+    np.divide(valor_final, peso, out=mensalidade, where=peso > 0)
+
+    return {
+        rota: {
+            "passagens": passagens[:, i],
+            "aux_recebido": aux_recebido[:, i],
+            "valor_final": valor_final[:, i],
+            "mensalidade_media": mensalidade[:, i],
+        }
+        for i, rota in enumerate(rotas)
+    }
+
+
+def simular(
+    modelo: dict,
+    aux_total: float,
+    amostras=AMOSTRAS_PADRAO,
+    semente=SEMENTE_PADRAO,
+    workers=None,
+    tamanho_bloco=TAMANHO_BLOCO,
+) -> dict:
+    """Retorna {rota: {campo: array (amostras,)}}, na ordem dos blocos."""
+    if not modelo:
+        return {}
+    tamanhos = [tamanho_bloco] * (amostras // tamanho_bloco)
+    if amostras % tamanho_bloco:
+        tamanhos.append(amostras % tamanho_bloco)
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+    args = [(s, n, modelo, aux_total) for s, n in zip(sementes, tamanhos)]
+
+    workers = workers or SIM_WORKERS
+    if min(workers, len(args)) <= 1:
+        blocos = [simular_bloco(*a) for a in args]
+    else:
+        executor = _obter_executor(workers)
+        try:
+            blocos = list(executor.map(simular_bloco, *zip(*args)))
+        except BrokenProcessPool:
+            # Um processo morreu: troca o pool e repete (o resultado só
+            # depende das sementes).
+            _descartar_executor(executor)
+            blocos = list(_obter_executor(workers).map(simular_bloco, *zip(*args)))
+
+    return {
+        rota: {campo: np.concatenate([b[rota][campo] for b in blocos]) for campo in blocos[0][rota]}
+        for rota in modelo
+    }
+
+
+def faixas_percentis(amostras: dict, campo="mensalidade_media", percentis=PERCENTIS) -> pd.DataFrame:
+    """Uma linha por rota com média, desvio e os percentis do campo."""
+    linhas = []
+    for rota, campos in amostras.items():
+        valores = campos[campo]
+        linha = {"rota": rota, "media": valores.mean(), "desvio": valores.std()}
+        linha.update({f"p{p}": v for p, v in zip(percentis, np.percentile(valores, percentis))})
+        linhas.append(linha)
+    return pd.DataFrame(linhas).set_index("rota")
+
+
+def simular_do_historico(historico: pd.DataFrame, aux_total=None, **kwargs):
+    """
+    Atalho: ajusta o modelo e simula. aux_total padrão = soma do auxílio
+    recebido pelas rotas no último mês. Retorna (modelo, amostras).
+    """
+    modelo = ajustar_modelo(historico)
+    if aux_total is None:
+        aux_total = sum(p["aux_recebido"] for p in modelo.values())
+    return modelo, simular(modelo, aux_total, **kwargs)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from historico import criar_backend
+
+    parser = argparse.ArgumentParser(description="Simulação de Monte Carlo da mensalidade.")
+    parser.add_argument("--amostras", type=int, default=AMOSTRAS_PADRAO)
+    parser.add_argument("--semente", type=int, default=SEMENTE_PADRAO)
+    parser.add_argument("--aux-total", type=float, default=None, help="auxílio do mês (padrão: o do último mês)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--backend", choices=["sqlite", "parquet", "csv"], default=None)
+    args = parser.parse_args()
+
+    modelo, amostras = simular_do_historico(
+        criar_backend(args.backend).carregar(),
+        args.aux_total,
+        amostras=args.amostras,
+        semente=args.semente,
+        workers=args.workers,
+    )
+    if not modelo:
+        raise SystemExit("Histórico vazio: nada para simular.")
+    print(tabela_modelo(modelo).to_string(index=False))
+    print()
+    print(f"Mensalidade média ({args.amostras} amostras, semente {args.semente}):")
+    print(faixas_percentis(amostras).round(2).to_string())
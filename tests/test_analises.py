@@ -0,0 +1,41 @@
+import threading
+import time
+
+import pandas as pd
+
+import analises
+
+
+class HistoricoLento:
+    """Backend falso cuja leitura completa demora (uma exportação grande)."""
+
+    def __init__(self):
+        self.versao_atual = 1
+        self.exportando = threading.Event()
+
+    def versao(self):
+        return self.versao_atual
+
+    def carregar(self, colunas=None):
+        if colunas is None:
+            self.exportando.set()
+            time.sleep(0.5)
+        return pd.DataFrame({"mes_ref": ["01/2026"], "rota": ["A"], "mensalidade_media": [1.0]})
+
+    def opcoes_filtro(self):
+        return {"rotas": ["A"], "periodos": ["2026-01"]}
+
+
+def test_exportacao_csv_nao_bloqueia_as_analises():
+    backend = HistoricoLento()
+    dados = analises.obter_analises(backend)
+    exportacao = threading.Thread(target=analises.csv_historico, args=(dados,))
+    exportacao.start()
+    backend.exportando.wait()
+
+    backend.versao_atual = 2  # força obter_analises a recalcular sob _lock
+    inicio = time.perf_counter()
+    analises.obter_analises(backend)
+    assert time.perf_counter() - inicio < 0.25
+    exportacao.join()
+    assert analises.csv_historico(dados).startswith(b"mes_ref,rota,mensalidade_media")
@@ -0,0 +1,175 @@
+import asyncio
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+import fila_pdf
+import historico
+from api import app
+from benchmark import gerar_registros
+from calculo import CENTAVOS_PADRAO, calcular_rota
+from importacao import importar
+
+
+def chamar(metodo, caminho, corpo=None, consulta=""):
+    """Chama a aplicação ASGI diretamente; retorna (status, corpo decodificado)."""
+    dados = json.dumps(corpo).encode() if corpo is not None else b""
+    escopo = {
+        "type": "http", "http_version": "1.1", "method": metodo, "scheme": "http",
+        "path": caminho, "raw_path": caminho.encode(), "query_string": consulta.encode(),
+        "headers": [(b"content-type", b"application/json")], "server": ("teste", 80),
+        "client": ("teste", 1234), "root_path": "",
+    }
+    recebidas = [{"type": "http.request", "body": dados, "more_body": False}]
+    enviadas = []
+
+    async def receber():
+        return recebidas.pop(0) if recebidas else {"type": "http.disconnect"}
+
+    async def enviar(mensagem):
+        enviadas.append(mensagem)
+
+    asyncio.run(app(escopo, receber, enviar))
+    status = enviadas[0]["status"]
+    resposta = b"".join(m.get("body", b"") for m in enviadas[1:])
+    return status, json.loads(resposta)
+
+
+def entrada(mes="Janeiro/2026", rota="A", diarias=20, **extra):
+    return {
+        "mes_ref": mes, "rota": rota, "veiculos": [{"valor": 500, "dias": diarias}],
+        "passagens": 1000, "alunos_integrais": 20, "diarias": diarias, "aux_recebido": 2000, **extra,
+    }
+
+
+@pytest.mark.parametrize("corpo", [
+    {"entradas": [entrada()], "aux_total": "9000"},
+    {"entradas": [entrada()], "aux_total": [9000]},
+    {"entradas": [entrada()], "aux_total": True},
+    {"entradas": [entrada()], "aux_total": {"Janeiro/2026": "abc"}},
+    {"entradas": [entrada()], "aux_total": {"Janeiro/2026": None}},
+    {"entradas": [entrada()], "aux_total": {"Fevereiro/2026": 9000}},
+    {"entradas": [entrada()], "aux_total": -1},
+    {"entradas": [entrada(mes=202601)], "aux_total": {"202601": 9000}},
+    {"entradas": [entrada(mes=["Janeiro/2026"])]},
+    {"entradas": [entrada(rota={"nome": "A"})]},
+    {"entradas": [entrada(descontos={"metade": 2})]},
+    {"entradas": [entrada(descontos={"50": -2})]},
+    {"entradas": [entrada(descontos={"150": 2})]},
+    {"entradas": [entrada(passagens=-1)]},
+    {"entradas": [entrada(aux_recebido=float("nan"))]},
+    {"entradas": [entrada(diarias=-3)]},
+    {"entradas": [entrada(alunos_integrais=float("inf"))]},
+    {"entradas": [entrada(veiculos=[{"valor": float("inf"), "dias": 20}])]},
+    {"entradas": [entrada(veiculos=[{"valor": 500, "dias": -1}])]},
+    {"entradas": ["rota"]},
+    {"entradas": []},
+])
+def test_calcular_recusa_corpos_invalidos_com_400(corpo):
+    status, resposta = chamar("POST", "/calcular", corpo)
+    assert status == 400 and "erro" in resposta
+
+
+def test_calcular_aceita_aux_total_unico_e_por_mes():
+    entradas = [entrada(rota="A", diarias=20), entrada(rota="B", diarias=10)]
+    _, unico = chamar("POST", "/calcular", {"entradas": entradas, "aux_total": 9000})
+    _, por_mes = chamar("POST", "/calcular", {"entradas": entradas, "aux_total": {"Janeiro/2026": 9000}})
+    assert unico == por_mes
+    assert sum(r["aux_recebido"] for r in unico["resultados"]) == pytest.approx(9000)
+
+
+def test_calcular_ignora_faixas_vazias_como_o_app():
+    descontos = {"50": 4, "0": 3, "30": 0}
+    status, resposta = chamar("POST", "/calcular", {"entradas": [entrada(descontos=descontos)], "centavos": False})
+    assert status == 200
+    esperado = calcular_rota({"v": {"valor": 500, "dias": 20}}, 1000, 20, {50: 4}, 2000, 20)
+    r = resposta["resultados"][0]
+    assert r["alunos_desconto_total"] == 4
+    assert r["mensalidade_media"] == pytest.approx(esperado["mensalidade_media"])
+
+
+@pytest.mark.parametrize("corpo", [
+    {"aux_total": [9000, 1000], "diarias": [20, 10]},
+    {"aux_total": [[9000]], "diarias": [[20, 10]]},
+    {"aux_total": [9000, 1000], "diarias": [[20, 10]]},
+    {"aux_total": "abc", "diarias": [20, 10]},
+    {"aux_total": 9000, "diarias": [[20, 10], [5]]},
+    {"aux_total": 9000, "diarias": [20, -1]},
+    {"aux_total": -5, "diarias": [20, 10]},
+    {"diarias": [20, 10]},
+])
+def test_distribuir_recusa_corpos_invalidos_com_400(corpo):
+    status, resposta = chamar("POST", "/distribuir", corpo)
+    assert status == 400 and "erro" in resposta
+
+
+def test_distribuir_um_e_varios_meses():
+    status, um = chamar("POST", "/distribuir", {"aux_total": 9000, "diarias": [20, 10]})
+    assert status == 200 and sum(um["aux_recebido"]) == pytest.approx(9000)
+    status, varios = chamar("POST", "/distribuir", {"aux_total": [9000, 100], "diarias": [[20, 10], [1, 1]]})
+    assert status == 200 and varios["aux_recebido"][0] == um["aux_recebido"]
+
+
+def test_modo_padrao_igual_no_app_na_importacao_e_na_api(tmp_path, monkeypatch):
+    from streamlit.testing.v1 import AppTest
+
+    monkeypatch.chdir(tmp_path)
+    tela = AppTest.from_file(str(Path(__file__).parents[1] / "app.py"), default_timeout=60).run()
+    tela.button[1].click().run()  # Cadastro e Cálculo
+    assert [c.value for c in tela.checkbox if c.label == "Cálculo exato em centavos"] == [CENTAVOS_PADRAO]
+
+    # Auxílio que não divide em centavos: float e centavos dão valores diferentes.
+    csv = (
+        "tipo;mes_ref;rota;aux_total;passagens;alunos_integrais;diarias;veiculo;valor;dias;pct;qtd\n"
+        "rota;Janeiro/2026;A;1000;100;7;22;;;;;\n"
+        "rota;Janeiro/2026;B;1000;100;3;7;;;;;\n"
+        "veiculo;Janeiro/2026;A;;;;;Van;333,33;22;;\n"
+        "veiculo;Janeiro/2026;B;;;;;Van;111,11;7;;\n"
+    )
+    importados = importar(io.BytesIO(csv.encode()), "dados.csv", gravar=False)["resultados"]
+    corpo = {
+        "entradas": [
+            {"mes_ref": "Janeiro/2026", "rota": "A", "veiculos": [{"valor": 333.33, "dias": 22}],
+             "passagens": 100, "alunos_integrais": 7, "diarias": 22},
+            {"mes_ref": "Janeiro/2026", "rota": "B", "veiculos": [{"valor": 111.11, "dias": 7}],
+             "passagens": 100, "alunos_integrais": 3, "diarias": 7},
+        ],
+        "aux_total": 1000,
+    }
+    _, padrao = chamar("POST", "/calcular", corpo)
+    _, explicito = chamar("POST", "/calcular", {**corpo, "centavos": CENTAVOS_PADRAO})
+    _, outro = chamar("POST", "/calcular", {**corpo, "centavos": not CENTAVOS_PADRAO})
+    assert padrao == explicito != outro
+    for campo in ("aux_recebido", "mensalidade_media"):
+        assert [r[campo] for r in padrao["resultados"]] == importados[campo].tolist()
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    backend = historico.HistoricoSQLite(str(tmp_path / "h.db"))
+    backend.salvar_registros(gerar_registros(10))
+    monkeypatch.setattr(historico, "_backend", backend)
+    return backend
+
+
+@pytest.mark.parametrize("consulta, limite", [("limite=0", 1), ("limite=-5", 1), ("limite=5000", 1000), ("", 50)])
+def test_historico_limita_o_tamanho_da_pagina(backend, consulta, limite):
+    status, resposta = chamar("GET", "/historico", consulta=consulta)
+    assert status == 200
+    assert resposta["limite"] == limite
+    assert len(resposta["registros"]) == min(limite, 10)
+
+
+@pytest.mark.parametrize("consulta", ["deslocamento=-1", "limite=abc", "faixa=bruto:1", "ordenar_por=senha"])
+def test_historico_recusa_parametros_invalidos(backend, consulta):
+    status, resposta = chamar("GET", "/historico", consulta=consulta)
+    assert status == 400 and "erro" in resposta
+
+
+def test_pdf_pronto_fora_do_cache_responde_410(monkeypatch):
+    monkeypatch.setattr(fila_pdf, "status_pdf", lambda chave: fila_pdf.STATUS_PRONTO)
+    monkeypatch.setattr(fila_pdf, "obter_pdf", lambda chave: None)
+    status, resposta = chamar("GET", "/pdf/abc")
+    assert status == 410 and "erro" in resposta
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from calculo import (
+    CAMPOS_RESULTADO,
+    calcular_rota,
+    calcular_rotas_lote,
+    distribuir_auxilio_centavos,
+    distribuir_auxilio_por_diarias,
+    distribuir_auxilio_rotas,
+    montar_tabelas_lote,
+    ratear,
+    resultados_lote_como_dicts,
+)
+
+
+def entradas_aleatorias(rng, meses=20, rotas=("Sete Lagoas", "Curvelo", "Sete Lagoas 2")):
+    entradas = []
+    for m in range(meses):
+        for rota in rotas:
+            veiculos = {
+                f"v{j}": {"valor": round(float(rng.uniform(0, 1500)), 2), "dias": int(rng.integers(0, 31))}
+                for j in range(rng.integers(0, 5))
+            }
+            pcts = rng.choice(np.arange(5, 101, 5), rng.integers(0, 5), replace=False)
+            entradas.append({
+                "mes_ref": f"{m + 1:02d}/2026",
+                "rota": rota,
+                "veiculos": veiculos,
+                "passagens": float(rng.uniform(0, 5000)),
+                "alunos_integrais": int(rng.integers(0, 80)),
+                "descontos": {int(p): int(rng.integers(1, 15)) for p in pcts},
+                "aux_recebido": float(rng.uniform(0, 10000)),
+                "diarias": int(rng.integers(0, 60)),
+            })
+    return entradas
+
+
+def escalar(e):
+    return calcular_rota(
+        e["veiculos"], e["passagens"], e["alunos_integrais"],
+        e["descontos"], e["aux_recebido"], e["diarias"],
+    )
+
+
+@pytest.mark.parametrize("semente", range(10))
+def test_lote_igual_ao_caminho_escalar(semente):
+    rng = np.random.default_rng(semente)
+    entradas = entradas_aleatorias(rng)
+    rotas, veiculos, descontos = montar_tabelas_lote(entradas)
+    # Rotas fora de ordem e veículos agrupados de outro jeito: só a ordem
+    # dentro de cada rota-mês precisa ser a do caminho escalar.
+    veiculos = veiculos.sort_values("rota", kind="stable")
+    lote = calcular_rotas_lote(rotas.sample(frac=1, random_state=semente), veiculos, descontos)
+    lote = lote.set_index(["mes_ref", "rota"]).loc[list(zip(rotas["mes_ref"], rotas["rota"]))].reset_index()
+
+    for e, dados in zip(entradas, resultados_lote_como_dicts(lote, descontos)):
+        esperado = escalar(e)
+        for campo in CAMPOS_RESULTADO:
+            assert dados[campo] == esperado[campo], (e["mes_ref"], e["rota"], campo)
+        assert dados["descontos"] == esperado["descontos"]
+
+
+def test_lote_sem_veiculos_nem_descontos():
+    rotas, veiculos, descontos = montar_tabelas_lote([
+        {"mes_ref": "01/2026", "rota": "A", "veiculos": {}, "passagens": 100.0,
+         "alunos_integrais": 0, "descontos": {}, "aux_recebido": 0.0, "diarias": 0},
+    ])
+    lote = calcular_rotas_lote(rotas, veiculos, descontos)
+    assert lote["bruto"].tolist() == [0.0]
+    assert lote["mensalidade_media"].tolist() == [0.0]
+    assert lote["veiculos_qtd"].tolist() == [0]
+
+
+def test_lote_rejeita_chave_repetida_e_linha_orfa():
+    rotas = pd.DataFrame({
+        "mes_ref": ["01/2026", "01/2026"], "rota": ["A", "B"],
+        "passagens": 0.0, "alunos_integrais": 1, "aux_recebido": 0.0, "diarias": 1,
+    })
+    veiculos = pd.DataFrame({"mes_ref": ["01/2026"], "rota": ["C"], "valor": [1.0], "dias": [1]})
+    descontos = pd.DataFrame(columns=["mes_ref", "rota", "pct", "qtd"])
+    with pytest.raises(ValueError, match="sem rota correspondente"):
+        calcular_rotas_lote(rotas, veiculos, descontos)
+    with pytest.raises(ValueError, match="chaves repetidas"):
+        calcular_rotas_lote(pd.concat([rotas, rotas]), veiculos.iloc[:0], descontos)
+
+
+# ============================================================
+# DISTRIBUIÇÃO DO AUXÍLIO
+# ============================================================
+def test_duas_rotas_igual_a_regra_original_bit_a_bit():
+    rng = np.random.default_rng(3)
+    aux = rng.uniform(0, 20000, 2000).round(2)
+    diarias = rng.integers(0, 45, (2000, 2))
+    diarias[rng.random((2000, 2)) < 0.1] = 0
+    aux[:50] = 0
+    vetorizado = distribuir_auxilio_rotas(aux, diarias)
+    for a, (d1, d2), linha in zip(aux.tolist(), diarias.tolist(), vetorizado):
+        assert tuple(linha.tolist()) == distribuir_auxilio_por_diarias(a, d1, d2)
+
+
+@pytest.mark.parametrize("n_rotas", [1, 2, 3, 5, 8])
+def test_auxilio_de_n_rotas_soma_o_total(n_rotas):
+    rng = np.random.default_rng(n_rotas)
+    aux = rng.uniform(0, 20000, 500)
+    diarias = rng.integers(0, 45, (500, n_rotas))
+    diarias[rng.random((500, n_rotas)) < 0.2] = 0
+    resultado = distribuir_auxilio_rotas(aux, diarias)
+    rodou = diarias.sum(axis=1) > 0
+    np.testing.assert_allclose(resultado.sum(axis=1), np.where(rodou, aux, 0.0), rtol=1e-12)
+    assert (resultado[diarias == 0] == 0).all()
+    assert (resultado >= 0).all()
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_ratear_soma_exatamente_o_total(semente):
+    rng = np.random.default_rng(semente)
+    total = rng.integers(0, 10**9, 300)
+    pesos = rng.integers(0, 1000, (300, int(rng.integers(1, 9))))
+    pesos[rng.random(pesos.shape) < 0.3] = 0
+    partes = ratear(total, pesos)
+    tem_peso = pesos.sum(axis=1) > 0
+    assert (partes.sum(axis=1) == np.where(tem_peso, total, 0)).all()
+    assert (partes[pesos == 0] == 0).all()
+    # Cada parte difere da cota exata em menos de um centavo.
+    cota = total[:, None] * pesos / np.maximum(pesos.sum(axis=1, keepdims=True), 1)
+    assert (np.abs(partes - cota) < 1).all()
+
+
+def test_auxilio_em_centavos_soma_o_total_e_segue_a_regra_70_30():
+    rng = np.random.default_rng(11)
+    aux = rng.integers(0, 2_000_000, 1000)
+    diarias = rng.integers(0, 45, (1000, 3))
+    diarias[rng.random((1000, 3)) < 0.1] = 0
+    centavos = distribuir_auxilio_centavos(aux, diarias)
+    rodou = diarias.sum(axis=1) > 0
+    assert (centavos.sum(axis=1) == np.where(rodou, aux, 0)).all()
+    # Cada rota fica a menos de um centavo da cota do cálculo em float.
+    assert (np.abs(centavos - distribuir_auxilio_rotas(aux, diarias)) < 1 + 1e-6).all()
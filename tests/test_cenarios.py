@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from calculo import (
+    calcular_rota,
+    calcular_rotas_centavos,
+    centavos_para_reais,
+    distribuir_auxilio_centavos,
+    distribuir_auxilio_rotas,
+    montar_resultado,
+    montar_tabelas_lote,
+    para_centavos,
+    para_reais,
+)
+from cenarios import base_do_resultado, nome_eixo, varrer_cenarios
+
+ROTAS_TESTE = {
+    "Sete Lagoas": {
+        "veiculos": {"Ônibus": {"valor": 850.35, "dias": 21}, "Van": {"valor": 420.1, "dias": 19}},
+        "passagens": 1234.57, "alunos_integrais": 37, "descontos": {50: 4, 30: 3}, "diarias": 40,
+    },
+    "Curvelo": {
+        "veiculos": {"Micro": {"valor": 610.0, "dias": 22}},
+        "passagens": 987.65, "alunos_integrais": 21, "descontos": {25: 2}, "diarias": 22,
+    },
+}
+
+
+def calcular(aux_total, passagens_curvelo, exato):
+    """Cadastro de referência: o mesmo cálculo que a página faz."""
+    nomes = list(ROTAS_TESTE)
+    entradas = {n: dict(ROTAS_TESTE[n]) for n in nomes}
+    entradas["Curvelo"]["passagens"] = passagens_curvelo
+    diarias = [entradas[n]["diarias"] for n in nomes]
+    if exato:
+        auxilios = para_reais(distribuir_auxilio_centavos(para_centavos(aux_total), diarias))
+        tabelas = montar_tabelas_lote([
+            {"mes_ref": "01/2026", "rota": n, **e, "aux_recebido": a}
+            for (n, e), a in zip(entradas.items(), auxilios)
+        ])
+        lote = centavos_para_reais(calcular_rotas_centavos(*tabelas))
+        return {n: {**linha, "descontos": entradas[n]["descontos"]} for n, linha in zip(nomes, lote.to_dict("records"))}
+    auxilios = distribuir_auxilio_rotas(aux_total, diarias)
+    return {
+        n: calcular_rota(e["veiculos"], e["passagens"], e["alunos_integrais"], e["descontos"], a, e["diarias"])
+        for (n, e), a in zip(entradas.items(), auxilios)
+    }
+
+
+@pytest.mark.parametrize("exato", [False, True])
+def test_cada_ponto_da_grade_bate_com_o_cadastro(exato):
+    base = base_do_resultado(montar_resultado("01/2026", calcular(9876.54, 987.65, exato), exato))
+    assert base["exato"] is exato
+    eixo = nome_eixo("passagens", "Curvelo")
+    grade = varrer_cenarios(base, {
+        "aux_total": np.linspace(0, 20000, 13).round(2),
+        eixo: np.linspace(0, 3000, 7).round(2),
+    })
+    for linha in grade.to_dict("records"):
+        esperado = calcular(linha["aux_total"], linha[eixo], exato)
+        for nome, res in esperado.items():
+            assert linha[nome_eixo("aux_recebido", nome)] == res["aux_recebido"]
+            assert linha[nome_eixo("mensalidade_media", nome)] == res["mensalidade_media"]
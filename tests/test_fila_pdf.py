@@ -0,0 +1,61 @@
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import fila_pdf
+from cache_pdf import CachePDF
+from calculo import calcular_rota
+
+
+def gerar_resultado(semente=0):
+    sete, cur = (
+        calcular_rota({"v": {"valor": 450.0 + semente, "dias": d}}, 900.0, 25, {50: 2}, aux, d)
+        for d, aux in ((22, 3000.0), (18, 2000.0))
+    )
+    return {"mes_ref": "Janeiro/2026", "rotas": {"Sete Lagoas": sete, "Curvelo": cur}, "sete": sete, "cur": cur}
+
+
+@pytest.fixture
+def fila(monkeypatch, tmp_path):
+    monkeypatch.setattr(fila_pdf, "cache_relatorios", CachePDF(tmp_path))
+    monkeypatch.setattr(fila_pdf, "_jobs", {})
+    monkeypatch.setattr(fila_pdf, "_falhas", {})
+    yield fila_pdf
+    fila_pdf._descartar_executor()
+
+
+def aguardar(fila, chave, limite=60):
+    fim = time.monotonic() + limite
+    while fila.status_pdf(chave) not in (fila.STATUS_PRONTO, fila.STATUS_ERRO):
+        assert time.monotonic() < fim, "o job não terminou"
+        time.sleep(0.05)
+
+
+def test_pool_quebrado_e_substituido_no_proximo_envio(fila):
+    # Um worker que morre quebra o pool inteiro.
+    with pytest.raises(BrokenProcessPool):
+        fila._obter_executor().submit(os._exit, 1).result()
+
+    chave = fila.enviar_pdf(gerar_resultado())
+    aguardar(fila, chave)
+    # Sem WeasyPrint o job pode falhar, mas não por causa do pool antigo.
+    assert not isinstance(fila.erro_pdf(chave), BrokenProcessPool)
+
+
+def test_jobs_com_erro_sao_esquecidos_apos_o_ttl(fila, monkeypatch):
+    monkeypatch.setattr(fila, "gerar_pdf_profissional", None)  # o job falha no worker
+    chave = fila.enviar_pdf(gerar_resultado())
+    aguardar(fila, chave)
+    assert fila.status_pdf(chave) == fila.STATUS_ERRO
+    while chave not in fila._falhas:  # o callback do job roda logo após o resultado
+        time.sleep(0.01)
+
+    fila.enviar_pdf(gerar_resultado(semente=7))
+    assert chave in fila._jobs  # ainda dentro do TTL
+
+    monkeypatch.setattr(fila, "PDF_ERRO_TTL", 0)
+    fila.enviar_pdf(gerar_resultado(semente=8))
+    assert chave not in fila._jobs and chave not in fila._falhas
+    assert fila.status_pdf(chave) is None
@@ -0,0 +1,162 @@
+import os
+import sqlite3
+from concurrent.futures import Future
+from datetime import datetime
+
+import pytest
+
+import historico
+from calculo import calcular_rota
+from historico import COLUNAS, HistoricoCSV, HistoricoParquet, HistoricoSerializado, HistoricoSQLite
+
+
+def gerar_registros(n):
+    return [
+        {**dict.fromkeys(COLUNAS, 1), "mes_ref": f"Janeiro/{2000 + i}", "rota": f"Rota {i}",
+         "data_registro": "01/01/2026 10:00"}
+        for i in range(n)
+    ]
+
+
+def calcular_uma_rota():
+    return calcular_rota({"v": {"valor": 500.0, "dias": 20}}, 1000.0, 20, {}, 2000.0, 20)
+
+
+def test_compactacao_substitui_antes_de_apagar(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    backend = HistoricoParquet(str(tmp_path / "h.parquet"))
+    for _ in range(5):
+        backend.salvar_registros(gerar_registros(2))
+    esperado = backend.carregar()
+
+    # Queda logo após o os.replace: nada foi apagado, e nada é lido em dobro.
+    def cair(_):
+        raise OSError("queda simulada")
+
+    monkeypatch.setattr(historico.os, "remove", cair)
+    with pytest.raises(OSError):
+        backend.compactar()
+    assert len(os.listdir(backend.caminho)) == 6
+    assert backend.carregar().equals(esperado)
+
+    monkeypatch.undo()
+    backend.salvar_registros(gerar_registros(2))
+    backend.compactar()
+    assert [os.path.basename(p)[:9] for p in backend._partes()] == ["compacto-"]
+    assert len(os.listdir(backend.caminho)) == 1
+    assert len(backend.carregar()) == len(esperado) + 2
+
+
+def test_compactacao_automatica_acima_do_limite(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(historico, "MAX_PARTES_PARQUET", 3)
+    backend = HistoricoSerializado(HistoricoParquet(str(tmp_path / "h.parquet")))
+    for _ in range(7):
+        backend.salvar_registros(gerar_registros(2))
+    assert len(backend._partes()) <= 3
+    assert len(backend.carregar()) == 14
+    backend.compactar()
+    assert len(backend._partes()) == 1
+    backend.fechar()
+
+
+def test_lote_parquet_que_falha_apos_gravar_a_parte_nao_e_refeito(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+
+    def falhar(self):
+        raise OSError("queda simulada na compactação")
+
+    monkeypatch.setattr(historico, "MAX_PARTES_PARQUET", 0)  # toda gravação compacta
+    monkeypatch.setattr(HistoricoParquet, "_compactar", falhar)
+    backend = HistoricoSerializado(HistoricoParquet(str(tmp_path / "h.parquet")))
+    pedidos = [(gerar_registros(2), Future()), (gerar_registros(3), Future())]
+    backend._gravar_lote(pedidos)
+    assert all(isinstance(futuro.exception(), OSError) for _, futuro in pedidos)
+    # A parte do lote ficou gravada uma única vez, sem as regravações por pedido.
+    assert len(backend.carregar()) == 5 and len(backend._partes()) == 1
+
+
+def test_lote_sqlite_que_falha_e_refeito_por_pedido(tmp_path):
+    backend = HistoricoSerializado(HistoricoSQLite(str(tmp_path / "h.db")))
+    ruim = gerar_registros(1)
+    ruim[0]["mes_ref"] = None  # NOT NULL: a transação do lote inteiro é desfeita
+    pedidos = [(gerar_registros(2), Future()), (ruim, Future()), (gerar_registros(3), Future())]
+    backend._gravar_lote(pedidos)
+    assert [futuro.exception() is None for _, futuro in pedidos] == [True, False, True]
+    assert len(backend.carregar()) == 5
+
+
+@pytest.mark.parametrize("classe, nome", [
+    (HistoricoCSV, "h.csv"), (HistoricoSQLite, "h.db"), (HistoricoParquet, "h.parquet"),
+])
+def test_data_registro_tem_o_mesmo_formato_em_todos_os_backends(tmp_path, classe, nome):
+    if classe is HistoricoParquet:
+        pytest.importorskip("pyarrow")
+    backend = classe(str(tmp_path / nome))
+    registro = historico.montar_registro("Março/2026", "A", calcular_uma_rota(), "05/03/2026 14:30")
+    backend.salvar_registros([registro])
+    assert backend.carregar()["data_registro"].tolist() == ["05/03/2026 14:30"]
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    ("05/03/2026 14:30", "05/03/2026 14:30"),
+    (" 2026-03-05 14:30:59 ", "05/03/2026 14:30"),
+    (datetime(2026, 3, 5, 14, 30), "05/03/2026 14:30"),
+])
+def test_data_registro_normalizada(valor, esperado):
+    assert historico.montar_registro("Março/2026", "A", calcular_uma_rota(), valor)["data_registro"] == esperado
+
+
+@pytest.mark.parametrize("valor", ["05/03/2026", "2026-13-01 10:00", "ontem", 20260305])
+def test_data_registro_invalida_e_recusada(valor):
+    with pytest.raises(ValueError, match="data_registro"):
+        historico.montar_registro("Março/2026", "A", calcular_uma_rota(), valor)
+
+
+def test_migracao_do_csv_e_atomica_e_nao_se_repete(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    HistoricoCSV().salvar_registros(gerar_registros(6))
+
+    # Falha depois da inserção, antes do commit: nenhuma linha e nenhuma marca ficam.
+    inserir = HistoricoSQLite._inserir
+
+    def inserir_e_cair(conn, registros):
+        inserir(conn, registros)
+        raise RuntimeError("queda simulada")
+
+    monkeypatch.setattr(HistoricoSQLite, "_inserir", staticmethod(inserir_e_cair))
+    with pytest.raises(RuntimeError):
+        historico.criar_backend("sqlite")
+    monkeypatch.undo()
+    monkeypatch.chdir(tmp_path)
+    banco = HistoricoSQLite()
+    assert banco.carregar().empty and not banco.csv_migrado()
+
+    # O próximo uso refaz a migração inteira, uma única vez.
+    assert len(historico.criar_backend("sqlite").carregar()) == 6
+    assert len(historico.criar_backend("sqlite").carregar()) == 6
+    assert banco.csv_migrado() and banco.migrar_csv() == 0
+
+
+@pytest.mark.parametrize("conteudo", [
+    "mes_ref,rota,bruto\nJaneiro/2026,A,100\nJaneiro/2026,B,200,9,9\n",
+    "isto não é um histórico\n",
+])
+def test_csv_corrompido_aborta_a_migracao_sem_marca(tmp_path, monkeypatch, conteudo):
+    monkeypatch.chdir(tmp_path)
+    with open(historico.HIST_PATH, "w", encoding="utf-8") as f:
+        f.write(conteudo)
+    with pytest.raises(ValueError):  # ParserError é um ValueError
+        historico.criar_backend("sqlite")
+    banco = HistoricoSQLite()
+    assert banco.carregar().empty and not banco.csv_migrado()
+
+
+def test_banco_antigo_com_registros_nao_recebe_o_csv(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    HistoricoCSV().salvar_registros(gerar_registros(6))
+    antigo = HistoricoSQLite()
+    antigo.salvar_registros(gerar_registros(2))
+    with sqlite3.connect(historico.HIST_DB_PATH) as conn:
+        conn.execute("DROP TABLE meta")  # como um banco de antes da marca
+    assert len(historico.criar_backend("sqlite").carregar()) == 2
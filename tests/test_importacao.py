@@ -0,0 +1,90 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import importacao
+from importacao import _celula_excel, converter_numeros, importar
+
+
+class HistoricoMemoria:
+    def __init__(self):
+        self.registros = []
+
+    def salvar_registros(self, registros):
+        self.registros += registros
+
+
+def arquivo(texto):
+    return io.BytesIO(texto.encode("utf-8"))
+
+
+CABECALHO = "tipo;mes_ref;rota;aux_total;passagens;alunos_integrais;diarias;veiculo;valor;dias;pct;qtd\n"
+
+
+def test_numeros_no_formato_brasileiro():
+    texto = pd.Series(["1.500,50", "1500,5", "1.500.000", "1500.5", "0,75", "-2", "1.500", "1,500.50", "abc", ""])
+    numero, ambiguo = converter_numeros(texto)
+    assert numero[:6].tolist() == [1500.5, 1500.5, 1500000.0, 1500.5, 0.75, -2.0]
+    assert numero[6:].isna().all()
+    assert ambiguo.tolist() == [False] * 6 + [True] + [False] * 3
+
+
+def test_celula_numerica_do_excel_nunca_e_ambigua():
+    celulas = pd.Series([_celula_excel(v) for v in (1.5, 1500, 1.505, np.int64(22), "1.500,00", np.nan)])
+    numero, ambiguo = converter_numeros(celulas.fillna(""))
+    assert numero[:5].tolist() == [1.5, 1500.0, 1.505, 22.0, 1500.0]
+    assert not ambiguo.any()
+
+
+def test_importacao_aceita_milhar_e_recusa_ambiguo():
+    backend = HistoricoMemoria()
+    saida = importar(arquivo(
+        CABECALHO
+        + "rota;Janeiro/2026;A;10.000,00;1.500;30;22;;;;;\n"
+    ), "dados.csv", backend=backend)
+    assert saida["gravados"] == 0 and backend.registros == []
+    assert saida["erros"][["linha", "campo"]].values.tolist() == [[2, "passagens"]]
+    assert saida["erros"]["erro"][0].startswith("ambíguo")
+
+    saida = importar(arquivo(
+        CABECALHO
+        + "rota;Janeiro/2026;A;10.000,00;1.500,00;30;22;;;;;\n"
+        + "rota;Janeiro/2026;B;10.000,00;900;20;18;;;;;\n"
+        + "veiculo;Janeiro/2026;A;;;;;Van;1.200,50;22;;\n"
+    ), "dados.csv", backend=backend)
+    assert saida["erros"].empty
+    assert backend.registros[0]["passagens"] == 1500.0
+    assert sum(r["aux_recebido"] for r in backend.registros) == pytest.approx(10000, abs=0.005)
+    assert saida["resultados"].loc[0, "bruto"] == pytest.approx(1200.5 * 22)
+
+
+@pytest.mark.parametrize("linhas, campo, erro", [
+    ("rota;Janeiro/2026;A;100;10;1;2;;;;;\nrota;Janeiro/2026;A;100;10;1;2;;;;;\n", "rota", "rota repetida no mesmo mês"),
+    ("rota;Janeiro/2026;A;100;10;1;2;;;;;\nrota;Janeiro/2026;B;200;10;1;2;;;;;\n", "aux_total", "aux_total diferente das outras rotas do mês"),
+    ("rota;Janeiro/2026;A;100;10;1;2;;;;;\nveiculo;Janeiro/2026;B;;;;;Van;10;2;;\n", "rota", "sem linha do tipo 'rota' para este mês e rota"),
+    ("rota;Janeiro/2026;A;100;10;1,5;2;;;;;\n", "alunos_integrais", "deve ser inteiro ('1,5')"),
+    ("faixa;Janeiro/2026;A;;;;;;;;150;1\nrota;Janeiro/2026;A;100;10;1;2;;;;;\n", "pct", "deve ser ≤ 100 ('150')"),
+    ("onibus;Janeiro/2026;A;;;;;;;;;\nrota;Janeiro/2026;A;100;10;1;2;;;;;\n", "tipo", "tipo inválido: 'onibus'"),
+])
+def test_erros_de_validacao_nao_gravam_nada(linhas, campo, erro):
+    backend = HistoricoMemoria()
+    saida = importar(arquivo(CABECALHO + linhas), "dados.csv", backend=backend)
+    assert backend.registros == [] and saida["gravados"] == 0
+    assert (saida["erros"]["campo"] == campo).any()
+    assert erro in saida["erros"]["erro"].tolist()
+
+
+def test_arquivo_vazio():
+    saida = importar(arquivo(""), "dados.csv", backend=HistoricoMemoria())
+    assert saida["erros"]["erro"][0].startswith("arquivo ilegível")
+
+
+def test_excel_sem_openpyxl_vira_erro(monkeypatch):
+    def sem_openpyxl(*args, **kwargs):
+        raise ImportError("Missing optional dependency 'openpyxl'")
+
+    monkeypatch.setattr(importacao.pd, "read_excel", sem_openpyxl)
+    saida = importar(io.BytesIO(b""), "dados.xlsx", backend=HistoricoMemoria())
+    assert saida["erros"]["erro"][0].startswith("leitura de Excel indisponível")
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from benchmark import gerar_entradas
+from calculo import (
+    ROTAS,
+    calcular_peso_alunos_lote,
+    calcular_rotas_lote,
+    montar_resultado,
+    montar_tabelas_lote,
+    para_centavos,
+    resultados_lote_como_dicts,
+)
+from importacao import calcular_importacao
+from metas import metas_do_resultado, metas_lote
+
+
+def mensalidades_com_aux(rotas, veiculos, descontos, aux_total_por_mes, centavos):
+    """Cálculo direto (o mesmo da importação) com o auxílio total de cada mês."""
+    rotas = rotas.assign(aux_total=rotas["mes_ref"].map(aux_total_por_mes).fillna(0.0))
+    res = calcular_importacao(rotas, veiculos, descontos, centavos)
+    return res.set_index(["mes_ref", "rota"])["mensalidade_media"]
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_auxilio_exato_e_o_menor_que_atinge_a_meta(semente):
+    rotas, veiculos, descontos = montar_tabelas_lote(gerar_entradas(60, semente))
+    meta = np.random.default_rng(semente).uniform(-50, 300, len(rotas)).round(2)
+    tabela = metas_lote(rotas, veiculos, descontos, meta, exato=True)
+
+    considerar = ((rotas["diarias"] > 0) & (calcular_peso_alunos_lote(rotas, descontos) > 0)).to_numpy()
+    meta_c = para_centavos(tabela["meta"])
+    aux = tabela.groupby("mes_ref")["aux_total_exato"].first()
+    atingivel = aux.dropna()
+    assert len(atingivel) > 0
+
+    def acima_da_meta(aux_total_por_mes):
+        mensalidade = mensalidades_com_aux(rotas, veiculos, descontos, aux_total_por_mes, centavos=True)
+        mensalidade = para_centavos(mensalidade.loc[list(zip(tabela["mes_ref"], tabela["rota"]))])
+        acima = (mensalidade > meta_c) & considerar
+        return tabela.assign(acima=acima).groupby("mes_ref")["acima"].any()
+
+    assert not acima_da_meta(atingivel.to_dict()).loc[atingivel.index].any()
+    positivos = atingivel[atingivel > 0]
+    um_centavo_a_menos = (positivos - 0.01).round(2)
+    assert acima_da_meta(um_centavo_a_menos.to_dict()).loc[positivos.index].all()
+
+
+def test_auxilio_em_float_leva_a_pior_rota_exatamente_a_meta():
+    rotas, veiculos, descontos = montar_tabelas_lote(gerar_entradas(60, 7))
+    tabela = metas_lote(rotas, veiculos, descontos, 120.0)
+    aux = tabela.groupby("mes_ref")["aux_total"].first()
+    positivos = aux[aux > 0]
+
+    mensalidade = mensalidades_com_aux(rotas, veiculos, descontos, positivos.to_dict(), centavos=False)
+    considerar = ((rotas["diarias"] > 0) & (calcular_peso_alunos_lote(rotas, descontos) > 0)).to_numpy()
+    pior = (
+        tabela.assign(m=mensalidade.loc[list(zip(tabela["mes_ref"], tabela["rota"]))].to_numpy())
+        [considerar & tabela["mes_ref"].isin(positivos.index).to_numpy()]
+        .groupby("mes_ref")["m"].max()
+    )
+    assert len(pior) > 0
+    np.testing.assert_allclose(pior.to_numpy(), 120.0, atol=1e-6)
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_metas_do_resultado_em_float_batem_com_o_calculo_direto(semente):
+    # O resultado da sessão de um cálculo em float (sem "exato"), como no app.
+    rotas, veiculos, descontos = montar_tabelas_lote(gerar_entradas(len(ROTAS), semente))
+    rotas = rotas.assign(diarias=rotas["diarias"].clip(lower=1))
+    dicts = resultados_lote_como_dicts(calcular_rotas_lote(rotas, veiculos, descontos), descontos)
+    resultado = montar_resultado(rotas["mes_ref"][0], dict(zip(rotas["rota"], dicts)))
+    meta = 0.5 * max(d["mensalidade_media"] for d in dicts)
+
+    tabela = metas_do_resultado(resultado, meta, exato=resultado.get("exato", False))
+    assert "aux_total_exato" not in tabela
+    aux = tabela["aux_total"].iloc[0]
+    assert aux > 0
+    mensalidade = mensalidades_com_aux(rotas, veiculos, descontos, {resultado["mes_ref"]: aux}, centavos=False)
+    considerar = calcular_peso_alunos_lote(rotas, descontos) > 0
+    assert mensalidade.to_numpy()[considerar].max() == pytest.approx(meta, abs=1e-6)
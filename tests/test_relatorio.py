@@ -0,0 +1,16 @@
+import pytest
+
+try:
+    import weasyprint  # noqa: F401  (sem pango, a importação levanta OSError)
+except (ImportError, OSError) as e:
+    pytest.skip(f"WeasyPrint indisponível: {e}", allow_module_level=True)
+
+from benchmark import gerar_resultado
+from benchmarks.pdf_original import gerar_pdf_original
+from relatorio import gerar_pdf_profissional
+
+
+@pytest.mark.parametrize("gerar", [gerar_pdf_profissional, gerar_pdf_original])
+def test_relatorio_renderiza(gerar):
+    pdf = gerar(gerar_resultado())
+    assert pdf.startswith(b"%PDF-") and pdf.rstrip().endswith(b"%%EOF")
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+import simulacao
+from simulacao import ajustar_modelo, simular
+
+
+def historico_rota(meses):
+    """Um registro por (mes_ref, aux_recebido), na ordem dada."""
+    return pd.DataFrame([
+        {
+            "mes_ref": mes, "rota": "A", "bruto": 1000.0, "passagens": 100.0 + i,
+            "aux_recebido": aux, "valor_final": 500.0, "mensalidade_media": 50.0,
+            "alunos_integrais": 10, "alunos_desconto_total": 0, "diarias": 20,
+        }
+        for i, (mes, aux) in enumerate(meses)
+    ])
+
+
+def test_ultimo_registro_e_o_do_ultimo_mes_e_nao_o_ultimo_gravado():
+    # Março gravado antes de um recálculo de janeiro.
+    historico = historico_rota([
+        ("Janeiro/2026", 100.0), ("Março/2026", 300.0), ("Fevereiro/2026", 200.0), ("Janeiro/2026", 150.0),
+    ])
+    modelo = ajustar_modelo(historico)
+    assert modelo["A"]["aux_recebido"] == 300.0
+    assert modelo["A"]["meses"] == 3
+
+
+def test_pool_reaproveitado_e_resultado_igual_ao_sequencial():
+    modelo = ajustar_modelo(historico_rota([("Janeiro/2026", 100.0), ("Fevereiro/2026", 200.0)]))
+    sequencial = simular(modelo, 1000.0, amostras=300, workers=1, tamanho_bloco=100)
+    try:
+        primeira = simular(modelo, 1000.0, amostras=300, workers=2, tamanho_bloco=100)
+        executor = simulacao._executor
+        segunda = simular(modelo, 1000.0, amostras=300, workers=2, tamanho_bloco=100)
+        assert simulacao._executor is executor
+    finally:
+        if simulacao._executor is not None:
+            simulacao._descartar_executor(simulacao._executor)
+    for amostras in (primeira, segunda):
+        assert np.array_equal(amostras["A"]["mensalidade_media"], sequencial["A"]["mensalidade_media"])